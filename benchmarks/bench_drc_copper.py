@@ -0,0 +1,58 @@
+"""Benchmark the geometric copper clearance check.
+
+Run from the repository root::
+
+    python benchmarks/bench_drc_copper.py
+
+Each board is a bus of parallel bent traces running between two rows of
+pads, with a ground pour along one edge.  The work done should grow roughly
+linearly with the number of traces.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from boardforge import Board, tracing
+from boardforge.drc import _copper_clearance_violations
+
+PITCH = 0.5
+WIDTH = 0.2
+
+
+def build_board(trace_count):
+    """Return a board with ``trace_count`` bent traces between pad rows."""
+    height = trace_count * PITCH + 10
+    board = Board(width=60, height=height)
+    board.set_layer_stack(["GTL", "GBL"])
+    for index in range(trace_count):
+        y = 5 + index * PITCH
+        left = board.add_component("TP", ref=f"L{index}", at=(2, y))
+        left.add_pin("A", dx=0, dy=0)
+        left.add_pad("A", dx=0, dy=0, w=0.3, h=0.3)
+        right = board.add_component("TP", ref=f"R{index}", at=(58, y + 2))
+        right.add_pin("A", dx=0, dy=0)
+        right.add_pad("A", dx=0, dy=0, w=0.3, h=0.3)
+        board.trace_path(
+            [left.pin("A"), (20, y), (22, y + 2), right.pin("A")], width=WIDTH
+        )
+    board.fill([(0, 0), (60, 0), (60, 3), (0, 3)], layer="GTL", net="GND")
+    return board
+
+
+def main(sizes=(1_000, 5_000, 10_000, 20_000), min_clearance=0.15):
+    tracing.set_level(tracing.OFF)
+    print(f"{'traces':>8} {'seconds':>9} {'us/trace':>9}")
+    for trace_count in sizes:
+        board = build_board(trace_count)
+        start = time.perf_counter()
+        list(_copper_clearance_violations(board, min_clearance))
+        elapsed = time.perf_counter() - start
+        print(f"{trace_count:>8} {elapsed:>9.3f} {elapsed / trace_count * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
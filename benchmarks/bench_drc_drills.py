@@ -0,0 +1,59 @@
+"""Benchmark the DRC drill clearance check on dense via stitching.
+
+Run from the repository root::
+
+    python benchmarks/bench_drc_drills.py
+
+Vias are placed on a square 0.8mm stitching grid with a sprinkling of
+mounting holes, mimicking a ground pour stitched across the whole board.
+The second column adds one 10mm hole, which must not coarsen the grid
+used for the small drills.
+"""
+
+import math
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from boardforge import Board, tracing
+from boardforge.drc import _drill_clearance_violations
+
+PITCH = 0.8
+
+
+def build_board(via_count, large_hole=None):
+    """Return a board stitched with ``via_count`` vias and a few holes.
+
+    ``large_hole`` adds one hole of that diameter in the middle of the board.
+    """
+    side = math.ceil(math.sqrt(via_count))
+    board = Board(width=side * PITCH, height=side * PITCH)
+    for index in range(via_count):
+        board.add_via((index % side) * PITCH, (index // side) * PITCH, hole=0.3)
+    for index in range(0, side, 10):
+        board.hole((index * PITCH + PITCH / 2, index * PITCH + PITCH / 2), diameter=1.0)
+    if large_hole:
+        board.hole((board.width / 2 + PITCH / 2, board.height / 2 + PITCH / 2), diameter=large_hole)
+    return board
+
+
+def _time(board, min_clearance):
+    start = time.perf_counter()
+    list(_drill_clearance_violations(board, min_clearance))
+    return time.perf_counter() - start
+
+
+def main(sizes=(1_000, 10_000, 50_000, 100_000), min_clearance=0.127):
+    tracing.set_level(tracing.OFF)
+    print(f"{'vias':>8} {'seconds':>9} {'us/via':>8} {'+10mm hole':>11}")
+    for via_count in sizes:
+        elapsed = _time(build_board(via_count), min_clearance)
+        large = _time(build_board(via_count, large_hole=10.0), min_clearance)
+        print(f"{via_count:>8} {elapsed:>9.3f} {elapsed / via_count * 1e6:>8.2f} {large:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Compare full and incremental DRC after a small placement tweak.
+
+Run from the repository root::
+
+    python benchmarks/bench_drc_incremental.py
+
+A synthetic board of two-pad components, traces and stitching vias is
+checked once, then a single pad is nudged and the board is checked again,
+both from scratch and incrementally.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from boardforge import DRCCache, check_board, tracing
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bench_drc_pads import build_board  # noqa: E402
+
+RULES = dict(
+    min_trace_width=0.15,
+    min_clearance=0.15,
+    hole_to_hole_clearance=0.127,
+    copper_clearance=0.15,
+)
+
+
+def main(sizes=(10_000, 50_000, 100_000)):
+    tracing.set_level(tracing.OFF)
+    print(f"{'pads':>8} {'full s':>8} {'incr s':>8}")
+    for pad_count in sizes:
+        board = build_board(pad_count)
+        for index in range(0, pad_count // 2, 10):
+            comp = board.components[index]
+            board.add_via(comp.at[0], comp.at[1] + 1.27, diameter=0.6, hole=0.3)
+        cache = DRCCache()
+        check_board(board, cache=cache, **RULES)
+
+        pad = board.components[len(board.components) // 2].pads[0]
+        pad.x += 0.3
+
+        start = time.perf_counter()
+        full = check_board(board, **RULES)
+        full_time = time.perf_counter() - start
+        start = time.perf_counter()
+        incremental = check_board(board, cache=cache, **RULES)
+        incremental_time = time.perf_counter() - start
+        assert incremental == full
+        print(f"{pad_count:>8} {full_time:>8.3f} {incremental_time:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark the DRC pad clearance check on synthetic boards.
+
+Run from the repository root::
+
+    python benchmarks/bench_drc_pads.py
+
+Each board is a square grid of two-pad components at a 2.54mm pitch, so the
+number of nearby pad pairs grows linearly with the pad count.  The reported
+time per pad should stay roughly constant as the board grows.
+"""
+
+import math
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from boardforge import Board, tracing
+from boardforge.drc import _pad_clearance_violations
+
+PITCH = 2.54
+
+
+def build_board(pad_count):
+    """Return a board holding ``pad_count`` pads on two-pad components."""
+    side = math.ceil(math.sqrt(pad_count / 2))
+    board = Board(width=side * PITCH, height=side * PITCH)
+    for index in range(pad_count // 2):
+        x = (index % side) * PITCH
+        y = (index // side) * PITCH
+        comp = board.add_component("RES", ref=f"R{index}", at=(x, y))
+        comp.add_pad("A", dx=-0.5, dy=0, w=0.8, h=0.8)
+        comp.add_pad("B", dx=0.5, dy=0, w=0.8, h=0.8)
+    return board
+
+
+def main(sizes=(1_000, 10_000, 50_000, 100_000), min_clearance=0.15):
+    tracing.set_level(tracing.OFF)
+    print(f"{'pads':>8} {'seconds':>9} {'us/pad':>8}")
+    for pad_count in sizes:
+        board = build_board(pad_count)
+        start = time.perf_counter()
+        list(_pad_clearance_violations(board, min_clearance))
+        elapsed = time.perf_counter() - start
+        print(f"{pad_count:>8} {elapsed:>9.3f} {elapsed / pad_count * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
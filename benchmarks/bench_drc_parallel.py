@@ -0,0 +1,62 @@
+"""Compare serial and tiled parallel DRC on a synthetic 50k-pad board.
+
+Run from the repository root::
+
+    python benchmarks/bench_drc_parallel.py
+
+The board from ``bench_drc_pads.py`` gets a stitching via next to every
+tenth component and a trace between neighbouring components.  It is then
+checked with 1, 2, 4 and 8 worker processes.  Speed-ups depend on the number
+of available CPU cores.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from boardforge import check_board, tracing
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bench_drc_pads import build_board  # noqa: E402
+
+RULES = dict(
+    min_trace_width=0.15,
+    min_clearance=0.15,
+    hole_to_hole_clearance=0.127,
+    copper_clearance=0.15,
+)
+
+
+def main(pad_count=50_000, worker_counts=(1, 2, 4, 8)):
+    tracing.set_level(tracing.OFF)
+    board = build_board(pad_count)
+    board.set_layer_stack(["GTL", "GBL"])
+    components = board.components
+    for index in range(0, len(components), 10):
+        comp = components[index]
+        board.add_via(comp.at[0], comp.at[1] + 1.27, diameter=0.6, hole=0.3)
+    for left, right in zip(components[::7], components[1::7]):
+        start = (left.pads[1].x, left.pads[1].y)
+        end = (right.pads[0].x, right.pads[0].y)
+        board.trace_path([start, end], width=0.2)
+
+    print(f"{os.cpu_count()} CPUs, {pad_count} pads")
+    print(f"{'workers':>8} {'seconds':>9} {'speed-up':>9}")
+    baseline = None
+    expected = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        warnings = check_board(board, workers=workers, **RULES)
+        elapsed = time.perf_counter() - start
+        if expected is None:
+            baseline, expected = elapsed, warnings
+        assert warnings == expected
+        print(f"{workers:>8} {elapsed:>9.3f} {baseline / elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
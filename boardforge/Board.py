@@ -1,33 +1,39 @@
 from .Component import Component
-from .GerberExporter import export_gerbers
-from .drc import check_board
-from .rules import LAYER_SERVICE_RULES
+from .GerberExporter import export_gerbers, region_contours
+from .gerberformat import DEFAULT_FORMAT
+from .drc import check_board, DRCCache
+from .flatten import DEFAULT_TOLERANCE, flat_trace
+from .rules import service_rules
 from .Pin import Pin
+from .primitives import LayerStore, layer_objects
 from .Via import Via
 from .Zone import Zone
-from .svgtools import render_text_ttf, render_svg_element
+from .svgtools import add_strokes, svg_element_strokes, text_contours
+from . import strokefont, tracing
 from shapely.geometry import Polygon, box
+from shapely.ops import unary_union
 import xml.etree.ElementTree as ET
+import io
+import zipfile
 import math
 import os
-import re
 
 TOP_SILK = "GTO"
 BOTTOM_SILK = "GBO"
 
-import datetime
-import pprint
-def log(msg, obj=None):
-    with open('boardforge.log', 'a', encoding='utf-8') as f:
-        f.write(f"{datetime.datetime.now().isoformat()} {msg}\n")
-        if obj is not None:
-            f.write(pprint.pformat(obj) + "\n")
+# Text renderers accepted by Board.add_text_ttf and Board.annotate.
+TEXT_BACKENDS = ("ttf", "stroke")
+
+
+def _streams(out_path, *args, **kwargs):
+    # Exports into a file object stay off disk, trace log included.
+    return not isinstance(out_path, (str, os.PathLike))
+
 
 class Board:
 
+    @tracing.traced
     def __init__(self, name="Board", width=100, height=80, layer_service="2 Layer"):
-        log('ENTER __init__', locals())
-        log("Board __init__ called")
         self.name = name
         self.width = width
         self.height = height
@@ -41,10 +47,13 @@ class Board:
         self.zones = []
         self.holes = []
         self.outline_geom = box(0, 0, width, height)
-        self.layers = {"GTO": [], "GBO": []}
+        self.layers = {"GTO": LayerStore(), "GBO": LayerStore()}
+        # Maximum chordal error in mm when curves are flattened to lines
+        self.curve_tolerance = DEFAULT_TOLERANCE
         self._svg_text_calls = []
         self._svg_graphics_calls = []
-        log('EXIT __init__', {'self': self.__dict__})
+        # Results of the last design rule check, reused by incremental checks
+        self._drc_cache = DRCCache()
 
     @staticmethod
     def _arc_params(start, end, radius, sweep):
@@ -71,21 +80,17 @@ class Board:
         end_ang = start_ang + sweep
         return (cx, cy, start_ang, end_ang)
 
+    @tracing.traced
     def set_layer_stack(self, layers):
-        log('ENTER set_layer_stack', locals())
-        log("set_layer_stack called")
         for layer in layers:
             if layer not in self.layers:
-                self.layers[layer] = []
-        log('EXIT set_layer_stack', {'self': self.__dict__})
+                self.layers[layer] = LayerStore()
 
+    @tracing.traced
     def add_component(self, type, ref, at, rotation=0):
-        log('ENTER add_component', locals())
-        log("add_component called")
         comp = Component(ref, type, at, rotation)
         self.components.append(comp)
         self._ref_map[ref] = comp
-        log('EXIT add_component', {'self': self.__dict__})
         return comp
 
     def trace(self, pin1, pin2, layer="GTL", width=1.0):
@@ -224,11 +229,7 @@ class Board:
         poly = Polygon(points)
         zone = Zone(net, layer, geometry=poly)
         self.zones.append(zone)
-        cmds = []
-        for i, (x, y) in enumerate(poly.exterior.coords):
-            code = "D02*" if i == 0 else "D01*"
-            cmds.append(f"X{int(x*1000):07d}Y{int(y*1000):07d}{code}")
-        self.layers.setdefault(layer, []).extend(cmds)
+        self.layers.setdefault(layer, LayerStore()).add_regions(region_contours(zone.geometry))
         return zone
 
     def hole(self, xy, diameter, annulus=None):
@@ -246,116 +247,160 @@ class Board:
         self.holes.append((xy[0], xy[1], diameter, annulus))
         return (xy[0], xy[1], diameter, annulus)
 
+    @tracing.traced
     def add_svg_graphic(self, svg_path, layer, scale=1.0, at=(0, 0)):
-        log('ENTER add_svg_graphic', locals())
-        log("add_svg_graphic called")
         self._svg_graphics_calls.append((svg_path, layer, scale, at))
         try:
             tree = ET.parse(svg_path)
             root = tree.getroot()
             for el in root.iter():
-                cmds = render_svg_element(el, scale, *at)
-                self.layers[layer].extend(cmds)
+                strokes = svg_element_strokes(el, scale, *at, self.curve_tolerance)
+                add_strokes(self.layers[layer], strokes)
         except Exception as e:
             print(f"Error adding SVG graphic {svg_path}: {e}")
-        log('EXIT add_svg_graphic', {'self': self.__dict__})
 
-    def add_text_ttf(self, text, font_path, at=(0, 0), size=1.0, layer="GTO"):
-        log('ENTER add_text_ttf', locals())
-        log("add_text_ttf called")
+    @tracing.traced
+    def add_text_ttf(self, text, font_path, at=(0, 0), size=1.0, layer="GTO", backend="ttf", stroke_width=None):
+        """Add ``text`` to ``layer``.
+
+        Parameters
+        ----------
+        text : str
+            Text to draw; ``at`` is the left end of its baseline.
+        font_path : str
+            TrueType font for the ``"ttf"`` backend.
+        backend : {"ttf", "stroke"}
+            ``"ttf"`` fills the glyph outlines of ``font_path``.
+            ``"stroke"`` draws the built-in single-stroke font as lines of
+            ``stroke_width`` and ignores ``font_path``; it needs no font
+            file and writes about a quarter of the Gerber commands.
+        stroke_width : float, optional
+            Line width in mm for the ``"stroke"`` backend.  Defaults to
+            :func:`~boardforge.strokefont.stroke_width` of ``size``.
+        """
+        if backend not in TEXT_BACKENDS:
+            raise ValueError(f"unknown text backend {backend!r}; expected one of {', '.join(TEXT_BACKENDS)}")
         self._svg_text_calls.append((text, at, size, layer))
+        if backend == "stroke":
+            width = strokefont.stroke_width(size) if stroke_width is None else stroke_width
+            for points in strokefont.text_strokes(text, at, size):
+                self.layers[layer].add_path(points, width=width)
+            return
         try:
-            gerber = render_text_ttf(text, font_path, at, size)
-            self.layers[layer].extend(gerber)
+            self.layers[layer].add_regions(text_contours(text, font_path, at, size))
         except Exception as e:
             print(f"TTF render error: {e}")
-        log('EXIT add_text_ttf', {'self': self.__dict__})
 
-    def annotate(self, x, y, text, size=1.0, layer=TOP_SILK):
-        """Add an annotation using the bundled RobotoMono font."""
+    def annotate(self, x, y, text, size=1.0, layer=TOP_SILK, backend="ttf"):
+        """Add an annotation using the bundled RobotoMono font.
+
+        ``backend="stroke"`` uses the built-in single-stroke font instead;
+        see :meth:`add_text_ttf`.
+        """
         font_path = os.path.join(os.path.dirname(__file__), "..", "fonts", "RobotoMono.ttf")
         if hasattr(layer, "value"):
             layer = layer.value
-        self.add_text_ttf(text, font_path=font_path, at=(x, y), size=size, layer=layer)
+        self.add_text_ttf(text, font_path=font_path, at=(x, y), size=size, layer=layer, backend=backend)
 
     def logo(self, x, y, image, scale=1.0, layer=TOP_SILK):
-        """Render a Pillow image onto ``layer`` as a simple bitmap graphic."""
+        """Render a Pillow image onto ``layer`` as filled bitmap regions."""
         if hasattr(layer, "value"):
             layer = layer.value
         img = image.convert("RGBA")
         width, height = img.size
+        pixels = []
         for j in range(height):
             for i in range(width):
                 r, g, b, a = img.getpixel((i, j))
                 if a > 0 and (r, g, b) != (255, 255, 255):
                     sx = x + i * scale
                     sy = y + j * scale
-                    cmds = [
-                        f"X{int(sx*1000):07d}Y{int(sy*1000):07d}D02*",
-                        f"X{int((sx+scale)*1000):07d}Y{int(sy*1000):07d}D01*",
-                        f"X{int((sx+scale)*1000):07d}Y{int((sy+scale)*1000):07d}D01*",
-                        f"X{int(sx*1000):07d}Y{int((sy+scale)*1000):07d}D01*",
-                        f"X{int(sx*1000):07d}Y{int(sy*1000):07d}D01*",
-                    ]
-                    self.layers[layer].extend(cmds)
+                    pixels.append(box(sx, sy, sx + scale, sy + scale))
+        # Adjacent pixels merge into a few filled regions.
+        self.layers[layer].add_regions(region_contours(unary_union(pixels)))
 
+    def changes_since_check(self):
+        """Return ``{family: [objects]}`` changed since the last design rule check.
 
-    def design_rule_check(self, min_trace_width=None, min_clearance=None):
+        Families are ``"trace"``, ``"pad"``, ``"via"``, ``"hole"``, ``"zone"``
+        and ``"text"``.  Added, moved, resized and removed objects are listed.
+        """
+        return self._drc_cache.changes(self)
+
+    def design_rule_check(
+        self,
+        min_trace_width=None,
+        min_clearance=None,
+        full=False,
+        rules=None,
+        max_violations=None,
+        workers=None,
+        profile=None,
+    ):
         """Check design rules and raise :class:`~boardforge.drc.DRCError` on failures.
 
-        If ``min_trace_width`` or ``min_clearance`` are not provided, values
-        from :data:`LAYER_SERVICE_RULES` corresponding to ``self.layer_service``
-        will be used when available.
-        """
+        Thresholds come from ``rules`` if given, otherwise from the compiled
+        :func:`~boardforge.rules.service_rules` of ``self.layer_service``.
+        ``min_trace_width`` and ``min_clearance`` override those values; the
+        clearance also applies to copper-to-copper gaps.
 
-        def _parse(value):
-            if isinstance(value, (int, float)):
-                return float(value)
-            if isinstance(value, str):
-                lowered = value.lower()
-                if lowered in {"any", "user preference"}:
-                    return 0.0
-                m = re.search(r"([0-9.]+)mm", value)
-                if m:
-                    return float(m.group(1))
-            return 0.0
-
-        extra = {}
-        if self.layer_service in LAYER_SERVICE_RULES:
-            rules = LAYER_SERVICE_RULES[self.layer_service]
-            if min_trace_width is None:
-                min_trace_width = _parse(rules.get("Minimum track Width", 0))
-            if min_clearance is None:
-                min_clearance = _parse(rules.get("Minimum Clearance", 0))
-            extra["min_annular_ring"] = _parse(rules.get("Minimum Annular Ring", 0))
-            extra["min_via_diameter"] = _parse(rules.get("Minimum Via Diameter", 0))
-            extra["min_through_hole"] = _parse(rules.get("Minimum Through Hole", 0))
-            extra["hole_to_hole_clearance"] = _parse(rules.get("Hole to hole clearance", 0))
-            extra["min_text_height"] = _parse(rules.get("Silkscreen Min Text Height", 0))
-            extra["min_text_thickness"] = _parse(rules.get("Silkscreen Min Text Thickness", 0))
-
-        if min_trace_width is None:
-            min_trace_width = 0.15
-        if min_clearance is None:
-            min_clearance = 0.15
+        Checks are incremental: only objects changed since the previous check
+        are re-examined and the remaining results are reused.  Pass
+        ``full=True`` to discard the cached results and check everything.
 
+        ``max_violations`` stops the check once that many violations have
+        been found; ``1`` fails on the first violation.  ``workers`` checks
+        large boards in that many processes and ``profile`` collects a
+        :class:`~boardforge.drc.DRCProfile`, see
+        :func:`~boardforge.drc.check_board`.
+        """
+        if rules is None:
+            rules = service_rules(self.layer_service)
+        if min_trace_width is not None:
+            rules = rules.replace(min_trace_width=min_trace_width)
+        if min_clearance is not None:
+            rules = rules.replace(min_clearance=min_clearance, copper_clearance=min_clearance or None)
+
+        if full:
+            self._drc_cache = DRCCache()
+
+        # Ask for one violation more than the limit, so a board with exactly
+        # ``max_violations`` violations is not reported as truncated.
         warnings = check_board(
             self,
-            min_trace_width=min_trace_width,
-            min_clearance=min_clearance,
-            **{k: v for k, v in extra.items() if v}
+            rules=rules,
+            cache=self._drc_cache,
+            max_violations=None if max_violations is None else max_violations + 1,
+            workers=workers,
+            profile=profile,
         )
         if warnings:
             from .drc import DRCError
-            raise DRCError(warnings)
+            truncated = max_violations is not None and len(warnings) > max_violations
+            raise DRCError(warnings[:max_violations], truncated=truncated)
         return []
 
+    @tracing.traced
     def save_svg_previews(self, outdir="."):
-        log('ENTER save_svg_previews', locals())
-        log("save_svg_previews called")
+        """Write the SVG previews (and PNG renders, when available) to ``outdir``."""
+        os.makedirs(outdir, exist_ok=True)
+        for name, data in self.render_svg_previews().items():
+            output_path = os.path.join(outdir, name)
+            try:
+                with open(output_path, "wb") as f:
+                    f.write(data)
+            except Exception as e:
+                print(f"Error writing SVG preview to {output_path}: {e}")
+
+    def render_svg_previews(self):
+        """Return ``{filename: bytes}`` for the top and bottom previews.
+
+        Each side yields ``preview_<side>.svg`` and, when CairoSVG and Pillow
+        are installed, an RGBA ``preview_<side>.png`` rendered from it.
+        """
+        previews = {}
         width_px = int(self.width * 10)
         height_px = int(self.height * 10)
-        log('EXIT save_svg_previews', {'self': self.__dict__})
 
         colors = {
             "board": "#5d2292",  # OSH Park purple
@@ -405,7 +450,7 @@ class Board:
                 )
 
             # Traces (placeholder: draws a line for each trace)
-            for trace in self.layers.get("GTL" if side == "GTO" else "GBL", []):
+            for trace in layer_objects(self.layers.get("GTL" if side == "GTO" else "GBL", [])):
                 if isinstance(trace, tuple) and trace[0] == "TRACE":
                     pin1, pin2 = trace[1], trace[2]
                     x1, y1 = int(pin1.x * 10), int(pin1.y * 10)
@@ -568,29 +613,25 @@ class Board:
             svg_content.extend(f'  {el}' for el in svg_elements)
             svg_content.append('</svg>')
 
-            # Write to file
-            os.makedirs(outdir, exist_ok=True)
-            output_path = os.path.join(outdir, f"preview_{suffix}.svg")
+            svg_text = '\n'.join(svg_content)
+            previews[f"preview_{suffix}.svg"] = svg_text.encode("utf-8")
+            # Convert the SVG preview to PNG for easier visual inspection
             try:
-                with open(output_path, "w", encoding="utf-8") as f:
-                    f.write('\n'.join(svg_content))
-                # Convert the SVG preview to PNG for easier visual inspection
-                try:
-                    from cairosvg import svg2png
-                    from PIL import Image
-                    png_path = os.path.join(outdir, f"preview_{suffix}.png")
-                    svg2png(bytes('\n'.join(svg_content), 'utf-8'), write_to=png_path)
-                    with Image.open(png_path) as im2:
-                        if im2.mode != "RGBA":
-                            im2.convert("RGBA").save(png_path)
-                    # Simple verification: ensure the file was written and is not empty
-                    if os.path.getsize(png_path) == 0:
-                        os.remove(png_path)
-                        raise ValueError("Generated PNG is empty")
-                except Exception as e:
-                    print(f"Error converting SVG to PNG: {e}")
+                from cairosvg import svg2png
+                from PIL import Image
+                png = svg2png(bytes(svg_text, 'utf-8'))
+                with Image.open(io.BytesIO(png)) as im2:
+                    if im2.mode != "RGBA":
+                        buffer = io.BytesIO()
+                        im2.convert("RGBA").save(buffer, format="PNG")
+                        png = buffer.getvalue()
+                # Simple verification: ensure the PNG is not empty
+                if not png:
+                    raise ValueError("Generated PNG is empty")
+                previews[f"preview_{suffix}.png"] = png
             except Exception as e:
-                print(f"Error writing SVG preview to {output_path}: {e}")
+                print(f"Error converting SVG to PNG: {e}")
+        return previews
 
     def save_png_previews(self, outdir=".", scale=10):
         """Render high-quality PNG previews using Pillow.
@@ -631,7 +672,7 @@ class Board:
             draw.polygon([(x * scale, y * scale) for x, y in poly.exterior.coords], fill=colors["board"])
 
             layer = "GTL" if side == "GTO" else "GBL"
-            for trace in self.layers.get(layer, []):
+            for trace in layer_objects(self.layers.get(layer, [])):
                 if isinstance(trace, tuple) and trace[0] == "TRACE":
                     p1, p2, w = trace[1], trace[2], trace[3]
                     draw.line(
@@ -642,7 +683,7 @@ class Board:
                 elif isinstance(trace, tuple) and trace[0] == "TRACE_PATH":
                     segments = trace[1]
                     w = trace[2]
-                    for seg in segments:
+                    for index, seg in enumerate(segments):
                         if seg[0] == "LINE":
                             s, e = seg[1], seg[2]
                             draw.line(
@@ -663,13 +704,9 @@ class Board:
                                 ]
                                 draw.arc(bbox, start=a1, end=a2, fill=colors["trace"], width=max(1, int(w * scale)))
                         elif seg[0] == "BEZIER":
-                            from svg.path import CubicBezier
-                            s, c1, c2, e = seg[1], seg[2], seg[3], seg[4]
-                            cb = CubicBezier(complex(*s), complex(*c1), complex(*c2), complex(*e))
-                            steps = 20
-                            pts = [cb.point(t / steps) for t in range(steps + 1)]
+                            pts = flat_trace(self, segments, self.curve_tolerance).parts[index]
                             draw.line(
-                                [(pt.real * scale, pt.imag * scale) for pt in pts],
+                                [(x * scale, y * scale) for x, y in pts.tolist()],
                                 fill=colors["trace"],
                                 width=max(1, int(w * scale)),
                             )
@@ -735,11 +772,69 @@ class Board:
             im.save(png_path)
 
 
-    def export_gerbers(self, out_path):
-        log('ENTER export_gerbers', locals())
-        log("export_gerbers called")
-        self.design_rule_check()
-        export_gerbers(self, out_path)
+    @tracing.traced(unless=_streams)
+    def export_gerbers(
+        self,
+        out_path,
+        max_violations=None,
+        exploded=True,
+        workers=None,
+        coordinate_format=None,
+        cache=None,
+    ):
+        """Run the design rule check and write Gerber files to ``out_path``.
+
+        ``out_path`` is a ZIP file path or a writable binary file object such
+        as :class:`io.BytesIO`.  ``max_violations`` bounds the check as in
+        :meth:`design_rule_check`; pass ``1`` to fail fast on the first
+        violation.  ``exploded`` controls the loose copy of the files next to
+        the archive, ``workers`` renders the layers in a process pool,
+        ``coordinate_format`` selects the :class:`CoordinateFormat` and
+        ``cache`` reuses unchanged layers from an :class:`ExportCache`, see
+        :func:`~boardforge.GerberExporter.export_gerbers`.  Exports into a
+        file object are not traced, so they write nothing to disk.
+        """
+        self.design_rule_check(max_violations=max_violations)
+        export_gerbers(
+            self,
+            out_path,
+            exploded=exploded,
+            workers=workers,
+            coordinate_format=coordinate_format or DEFAULT_FORMAT,
+            cache=cache,
+        )
+
+    def export_gerbers_bytes(
+        self,
+        compression=zipfile.ZIP_DEFLATED,
+        compresslevel=None,
+        max_violations=None,
+        workers=None,
+        coordinate_format=None,
+        cache=None,
+    ):
+        """Run the design rule check and return the fab package as ZIP bytes.
+
+        The archive is built in memory; no temporary, exploded or trace log
+        files are written.  ``compression`` and ``compresslevel`` trade CPU for size,
+        for example ``zipfile.ZIP_STORED`` or a ``compresslevel`` of ``1``.
+        The other arguments are those of :meth:`export_gerbers`.  To stream
+        into an open binary file or socket instead, pass it to
+        :meth:`export_gerbers` as ``out_path``.
+        """
+        self.design_rule_check(max_violations=max_violations)
+        buffer = io.BytesIO()
+        export_gerbers(
+            self,
+            buffer,
+            exploded=False,
+            compression=compression,
+            compresslevel=compresslevel,
+            workers=workers,
+            coordinate_format=coordinate_format or DEFAULT_FORMAT,
+            cache=cache,
+        )
+        return buffer.getvalue()
 
     def export_all(self, out_path):
         """Convenience method mirroring the pseudocode API."""
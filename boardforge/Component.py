@@ -14,6 +14,9 @@ class Pad:
         self.castellated = False
         self.plated = True
         self.edge = None
+        self.shape = None
+        # Drill diameter of a through-hole pad; None for surface-mount pads
+        self.drill = None
 
 class Component:
     def __init__(self, ref, type, at, rotation=0):
@@ -24,11 +27,13 @@ class Component:
         self.pads = []
         self.pins = {}
 
-    def add_pad(self, name, dx, dy, w, h, castellated=False, plated=True, edge=None):
+    def add_pad(self, name, dx, dy, w, h, castellated=False, plated=True, edge=None, shape=None, drill=None):
         pad = Pad(name, self, dx, dy, w, h, self.rotation)
         pad.castellated = castellated
         pad.plated = plated
         pad.edge = edge
+        pad.shape = shape
+        pad.drill = drill
         self.pads.append(pad)
         return pad
 
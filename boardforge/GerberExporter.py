@@ -1,137 +1,550 @@
+import contextlib
+import io
 import os
+import uuid
 import zipfile
-import shutil
-import math
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
-def export_gerbers(board, output_zip_path):
+import numpy as np
+from shapely.geometry.polygon import orient
+
+from .apertures import DEFAULT_LINE_WIDTH, ApertureTable, pad_aperture
+from .copper import copper_layer_names, pad_layers
+from .flatten import DEFAULT_TOLERANCE
+from .gerberformat import ARC_CODE, DEFAULT_FORMAT, DRAW_CODE, FLASH_CODE, MOVE_CODE
+from .pathopt import chain_paths, order_paths, trace_pieces, write_paths
+from .primitives import LayerStore
+
+def _write_header(f, title, apertures, fmt=DEFAULT_FORMAT):
+    """Write the comment, format, unit and aperture definitions that open a file."""
+    f.write(f"G04 {title} *\n")
+    for line in fmt.header():
+        f.write(f"{line}\n")
+    # Multi-quadrant arcs; lines until a G02/G03 says otherwise.
+    f.write("G75*\n")
+    f.write("G01*\n")
+    for definition in apertures.definitions():
+        f.write(f"{definition}\n")
+
+
+def arc_commands(start, end, center, clockwise=False, fmt=DEFAULT_FORMAT):
+    """Return Gerber commands stroking an arc from ``start`` to ``end``.
+
+    The arc is drawn with native circular interpolation around ``center``
+    (``G02`` clockwise, ``G03`` counter-clockwise) and the commands restore
+    linear mode afterwards.  ``start == end`` draws a full circle, which
+    requires the ``G75`` multi-quadrant mode set in every file header.
     """
-    Export board layers as Gerber files and compress them into a ZIP archive.
-    
+    (sx, sy), (ex, ey), (cx, cy) = start, end, center
+    move, arc = fmt.command_lines(
+        [sx, ex], [sy, ey], [MOVE_CODE, ARC_CODE], [0.0, cx - sx], [0.0, cy - sy]
+    )
+    return [move, "G02*" if clockwise else "G03*", arc, "G01*"]
+
+
+def circle_commands(cx, cy, radius, fmt=DEFAULT_FORMAT):
+    """Return Gerber commands stroking a full circle of ``radius`` around ``(cx, cy)``."""
+    start = (cx + radius, cy)
+    return arc_commands(start, start, (cx, cy), fmt=fmt)
+
+
+def _polygons(geometry):
+    """Yield the non-empty polygons in ``geometry``."""
+    if geometry.is_empty:
+        return
+    if geometry.geom_type == "Polygon":
+        yield geometry
+    else:
+        for part in getattr(geometry, "geoms", ()):
+            yield from _polygons(part)
+
+
+def _in_sector(vertex, before, after, direction):
+    """Return ``True`` if ``direction`` points into the interior at ``vertex``.
+
+    ``before`` and ``after`` are the neighbouring vertices of a
+    counter-clockwise ring, whose interior lies to the left of each edge.
+    """
+    ax, ay = after[0] - vertex[0], after[1] - vertex[1]
+    bx, by = before[0] - vertex[0], before[1] - vertex[1]
+    dx, dy = direction
+    leaves = ax * dy - ay * dx > 0
+    enters = dx * by - dy * bx > 0
+    return (leaves and enters) if ax * by - ay * bx >= 0 else (leaves or enters)
+
+
+def cut_in_ring(polygon):
+    """Return the boundary of ``polygon`` as one closed ring with cut-ins.
+
+    Each interior ring is joined to the outline by a horizontal cut-in from
+    its rightmost vertex, which is traversed once in each direction.
+    Interiors are merged from right to left, so every cut-in runs to the
+    nearest edge of the exterior or of an interior merged before it and
+    crosses no other edge.  Filling the ring as one Gerber region
+    therefore leaves the interiors open without clear polarity.
+    """
+    polygon = orient(polygon, 1.0)
+    ring = list(polygon.exterior.coords)[:-1]
+    holes = [list(interior.coords)[:-1] for interior in polygon.interiors]
+    holes.sort(key=lambda hole: max(hole)[0], reverse=True)
+    for hole in holes:
+        start = hole.index(max(hole))
+        px, py = hole[start]
+        points = np.array(ring)
+        following = np.roll(points, -1, axis=0)
+        (x1, y1), (x2, y2) = points.T, following.T
+        # Edges crossing the horizontal ray from the hole's rightmost vertex.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing = (np.minimum(y1, y2) <= py) & (py <= np.maximum(y1, y2)) & (y1 != y2)
+            xs = np.where(crossing, x1 + (py - y1) * (x2 - x1) / (y2 - y1), np.inf)
+        # Rays through a vertex meet it exactly.
+        xs = np.where(crossing & (y1 == py), x1, np.where(crossing & (y2 == py), x2, xs))
+        xs[xs < px] = np.inf
+        nearest = xs.min()
+        if not np.isfinite(nearest):
+            continue
+        hit = (float(nearest), py)
+        bridge = hole[start:] + hole[: start + 1]
+        candidates = [k for k, point in enumerate(ring) if point == hit]
+        if candidates:
+            # The ray meets a vertex; cut in where the interior faces the hole.
+            direction = (px - hit[0], 0.0)
+            at = next(
+                (k for k in candidates if _in_sector(hit, ring[k - 1], ring[(k + 1) % len(ring)], direction)),
+                candidates[0],
+            )
+            ring[at + 1 : at + 1] = bridge + [hit]
+        else:
+            edge = int(np.argmin(xs))
+            ring[edge + 1 : edge + 1] = [hit] + bridge + [hit]
+    return ring + ring[:1]
+
+
+def region_contours(geometry):
+    """Return one closed ``(n, 2)`` contour per polygon of a shapely ``geometry``.
+
+    Every polygon becomes one dark region.  Holes and letter counters stay
+    open through cut-ins joining them to the outline (see
+    :func:`cut_in_ring`), so nothing drawn earlier on the layer is erased.
+    Pass the result to :meth:`~boardforge.primitives.LayerStore.add_regions`.
+    """
+    return [
+        np.asarray(cut_in_ring(poly) if poly.interiors else poly.exterior.coords, dtype=float)
+        for poly in _polygons(geometry)
+    ]
+
+
+def region_commands(geometry, fmt=DEFAULT_FORMAT):
+    """Return ``G36``/``G37`` region commands filling a shapely ``geometry``.
+
+    The contours are those of :func:`region_contours`, formatted in ``fmt``.
+    """
+    cmds = []
+    for contour in region_contours(geometry):
+        cmds.append("G36*")
+        cmds.extend(fmt.path_lines(contour))
+        cmds.append("G37*")
+    return cmds
+
+
+def _write_layer(f, board, layer_name, content, flashes=(), fmt=DEFAULT_FORMAT, tolerance=DEFAULT_TOLERANCE):
+    """Write the Gerber commands of one board layer to the text stream ``f``.
+
+    ``board`` only needs an ``_arc_params`` method; the ``Board`` class
+    itself is enough, which keeps the arguments cheap to pickle.
+
     Args:
-        board: Object containing layer data with 'layers' attribute (dict) and save_svg_previews method
-        output_zip_path: Path where the ZIP file will be saved
+        f: Text stream to write to
+        board: Board or Board class providing ``_arc_params``
+        layer_name: Name written in the file's comment line
+        content: LayerStore or list of layer entries; traces are stroked
+            with a circular aperture of their width and other primitives
+            with DEFAULT_LINE_WIDTH
+        flashes: ``(x, y, shape)`` tuples flashed with D03, where ``shape``
+            comes from ``apertures.pad_aperture``
+        fmt: CoordinateFormat of the file
+        tolerance: Maximum chordal error in mm of flattened Bezier traces
     """
+    store = content if isinstance(content, LayerStore) else LayerStore(content or ())
+    flashes = list(flashes)
+    apertures = ApertureTable(fmt.unit_scale)
+    # Aperture definitions precede the image, so collect them first, in
+    # order of first use.
+    widths = np.nan_to_num(store.column("width"), nan=DEFAULT_LINE_WIDTH)
+    unique, first, inverse = np.unique(widths, return_index=True, return_inverse=True)
+    unique_codes = np.empty(len(unique), dtype=np.int64)
+    for index in np.argsort(first):
+        unique_codes[index] = apertures.circle(float(unique[index]))
+    codes = unique_codes[inverse.ravel()]
+    flash_codes = np.array([apertures.get(shape) for _, _, shape in flashes], dtype=np.int64)
+
+    def write_strokes(f, traces):
+        # Consecutive traces are chained and reordered together.
+        write_paths(f, order_paths(chain_paths(trace_pieces(board, traces, fmt, tolerance))), fmt)
+
+    def write_objects(f, items):
+        traces = []
+        for item in items:
+            if isinstance(item, tuple) and item[0] in ("TRACE", "TRACE_PATH"):
+                traces.append(item)
+                continue
+            write_strokes(f, traces)
+            traces = []
+            f.write(f"{item}\n")
+        write_strokes(f, traces)
+
+    _write_header(f, layer_name, apertures, fmt)
+    store.write(f, codes, write_objects, fmt)
+    if flashes:
+        xs = np.array([x for x, _, _ in flashes], dtype=float)
+        ys = np.array([y for _, y, _ in flashes], dtype=float)
+        current = int(codes[-1]) if len(codes) else None
+        breaks = np.flatnonzero(np.diff(flash_codes, prepend=-1)).tolist()
+        for start, end in zip(breaks, breaks[1:] + [len(flashes)]):
+            code = int(flash_codes[start])
+            if code != current:
+                f.write(f"D{code}*\n")
+                current = code
+            f.write(fmt.commands(xs[start:end], ys[start:end], FLASH_CODE))
+    f.write("M02*\n")
+
+
+def _write_outline(f, outline_geom, fmt=DEFAULT_FORMAT):
+    """Write the board outline layer to ``f``."""
+    apertures = ApertureTable(fmt.unit_scale)
+    code = apertures.circle(DEFAULT_LINE_WIDTH)
+    _write_header(f, "GKO", apertures, fmt)
+    f.write(f"D{code}*\n")
+    for line in fmt.path_lines(outline_geom.exterior.coords):
+        f.write(f"{line}\n")
+    f.write("M02*\n")
+
+
+def _write_holes(f, holes, fmt=DEFAULT_FORMAT):
+    """Write the drill/hole layer to ``f``."""
+    apertures = ApertureTable(fmt.unit_scale)
+    code = apertures.circle(DEFAULT_LINE_WIDTH)
+    _write_header(f, "holes", apertures, fmt)
+    f.write(f"D{code}*\n")
+    # Each hole is a full counter-clockwise circle starting on its +X side.
+    f.write("G03*\n")
+    for hx, hy, dia, ann in holes:
+        r = dia / 2.0
+        if ann is not None:
+            # Filled annular ring: one region around the outer circle, in
+            # along a cut-in, back around the hole the other way and out.
+            outer = r + ann
+            f.write("G36*\n")
+            _write_circle(f, hx, hy, outer, fmt)
+            f.write("G01*\n")
+            f.write(fmt.commands([hx + r], [hy], DRAW_CODE))
+            f.write("G02*\n")
+            f.write(fmt.commands([hx + r], [hy], ARC_CODE, [-r], [0.0]))
+            f.write("G01*\n")
+            f.write(fmt.commands([hx + outer], [hy], DRAW_CODE))
+            f.write("G37*\nG03*\n")
+        _write_circle(f, hx, hy, r, fmt)
+    f.write("G01*\n")
+    f.write("M02*\n")
+
+
+def _write_circle(f, cx, cy, r, fmt):
+    """Write a full circle as a move and one arc; circular mode must be active."""
+    x = cx + r
+    f.write(fmt.commands([x, x], [cy, cy], [MOVE_CODE, ARC_CODE], [0.0, -r], [0.0, 0.0]))
+
+
+def layer_flashes(board):
+    """Return ``{layer_name: [(x, y, shape), ...]}`` for the pads and vias of ``board``.
+
+    Pads are flashed on the layers of :func:`~boardforge.copper.pad_layers`:
+    their ``layer`` (top copper by default), or every copper layer for
+    through-hole pads.  Vias are flashed on both of the layers they connect.
+    """
+    flashes = {}
+    copper = copper_layer_names(getattr(board, "layers", {}))
+    for comp in getattr(board, "components", []):
+        for pad in comp.pads:
+            for layer in pad_layers(pad, copper):
+                flashes.setdefault(layer, []).append((pad.x, pad.y, pad_aperture(pad)))
+    for via in getattr(board, "vias", []):
+        for layer in dict.fromkeys((via.from_layer, via.to_layer)):
+            flashes.setdefault(layer, []).append((via.x, via.y, ("circle", via.diameter)))
+    return flashes
+
+
+def gerber_layers(board, fmt=DEFAULT_FORMAT):
+    """Yield ``(filename, writer, args)`` for every Gerber file of ``board``.
+
+    ``writer(f, *args)`` writes the file's text to the stream ``f``.  Writers
+    are module functions and ``args`` hold plain layer data, so a file can be
+    rendered in another process.  The board outline and the hole layer are
+    written last and replace board layers of the same name.  Pads and vias
+    are flashed on the copper layers that exist in ``board.layers``.
+    Coordinates are written in the CoordinateFormat ``fmt`` and curves are
+    flattened to the board's ``curve_tolerance``.
+    """
+    tolerance = getattr(board, "curve_tolerance", DEFAULT_TOLERANCE)
+    has_outline = getattr(board, "outline_geom", None) is not None
+    has_holes = bool(getattr(board, "holes", None))
+    flashes = layer_flashes(board)
+    for layer_name, content in board.layers.items():
+        if (has_outline and layer_name == "GKO") or (has_holes and layer_name == "holes"):
+            continue
+        args = (type(board), layer_name, content, flashes.get(layer_name, ()), fmt, tolerance)
+        yield f"{layer_name}.gbr", _write_layer, args
+    if has_outline:
+        yield "GKO.gbr", _write_outline, (board.outline_geom, fmt)
+    if has_holes:
+        yield "holes.gbr", _write_holes, (board.holes, fmt)
+
+
+def render_layer(writer, args):
+    """Return the text that ``writer(f, *args)`` writes, as a string."""
+    f = io.StringIO()
+    writer(f, *args)
+    return f.getvalue()
+
+
+@contextlib.contextmanager
+def _atomic_file(path):
+    """Open ``path`` for binary writing through a uniquely named temporary file.
+
+    The temporary file lives next to ``path`` and replaces it only once
+    writing succeeds, so concurrent jobs never see or remove each other's
+    partial output.
+    """
+    path = Path(path)
+    temp = path.with_name(f".{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
     try:
-        # Convert to Path object for better path handling
-        output_zip_path = Path(output_zip_path)
-        # Ensure parent directory exists
-        output_zip_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Create temporary directory for Gerber files
-        temp_dir = output_zip_path.parent / "temp_gerbers"
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Generate Gerber files for each layer
-        for layer_name, content in board.layers.items():
-            filename = temp_dir / f"{layer_name}.gbr"
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(f"G04 {layer_name} *\n")
-                # Ensure content is iterable and handle potential None values
-                if content:
-                    for line in content:
-                        if isinstance(line, tuple) and line[0] == "TRACE":
-                            pin1, pin2 = line[1], line[2]
-                            # Optional width stored at line[3]
-                            x1 = int(pin1.x * 1000)
-                            y1 = int(pin1.y * 1000)
-                            x2 = int(pin2.x * 1000)
-                            y2 = int(pin2.y * 1000)
-                            f.write(f"X{x1:07d}Y{y1:07d}D02*\n")
-                            f.write(f"X{x2:07d}Y{y2:07d}D01*\n")
-                        elif isinstance(line, tuple) and line[0] == "TRACE_PATH":
-                            segments = line[1]
-                            for seg in segments:
-                                if seg[0] == "LINE":
-                                    s, e = seg[1], seg[2]
-                                    x1 = int(s[0] * 1000)
-                                    y1 = int(s[1] * 1000)
-                                    x2 = int(e[0] * 1000)
-                                    y2 = int(e[1] * 1000)
-                                    f.write(f"X{x1:07d}Y{y1:07d}D02*\n")
-                                    f.write(f"X{x2:07d}Y{y2:07d}D01*\n")
-                                elif seg[0] == "ARC":
-                                    s, e, r, ang = seg[1], seg[2], seg[3], seg[4]
-                                    params = board._arc_params(s, e, r, ang)
-                                    if params is not None:
-                                        cx, cy, a1, a2 = params
-                                        steps = max(8, int(abs(ang) / 10))
-                                        for i in range(steps + 1):
-                                            t = a1 + (a2 - a1) * i / steps
-                                            rad = math.radians(t)
-                                            x = cx + r * math.cos(rad)
-                                            y = cy + r * math.sin(rad)
-                                            code = "D02*" if i == 0 else "D01*"
-                                            f.write(f"X{int(x*1000):07d}Y{int(y*1000):07d}{code}\n")
-                                elif seg[0] == "BEZIER":
-                                    from svg.path import CubicBezier
-                                    s, c1, c2, e = seg[1], seg[2], seg[3], seg[4]
-                                    cb = CubicBezier(complex(*s), complex(*c1), complex(*c2), complex(*e))
-                                    steps = 20
-                                    prev = cb.point(0)
-                                    for i in range(1, steps + 1):
-                                        pt = cb.point(i / steps)
-                                        x1 = int(prev.real * 1000)
-                                        y1 = int(prev.imag * 1000)
-                                        x2 = int(pt.real * 1000)
-                                        y2 = int(pt.imag * 1000)
-                                        f.write(f"X{x1:07d}Y{y1:07d}D02*\n")
-                                        f.write(f"X{x2:07d}Y{y2:07d}D01*\n")
-                                        prev = pt
-                        else:
-                            f.write(f"{line}\n")
-
-        # Board outline layer
-        if getattr(board, "outline_geom", None) is not None:
-            outline_path = temp_dir / "GKO.gbr"
-            with open(outline_path, "w", encoding="utf-8") as f:
-                f.write("G04 GKO *\n")
-                coords = list(board.outline_geom.exterior.coords)
-                for i, (x, y) in enumerate(coords):
-                    code = "D02*" if i == 0 else "D01*"
-                    f.write(f"X{int(x*1000):07d}Y{int(y*1000):07d}{code}\n")
-
-        # Drill/hole file
-        if getattr(board, "holes", None):
-            holes_path = temp_dir / "holes.gbr"
-            with open(holes_path, "w", encoding="utf-8") as f:
-                f.write("G04 holes *\n")
-                for hx, hy, dia, ann in board.holes:
-                    r = dia / 2.0
-                    for i in range(13):
-                        a = 2 * math.pi * i / 12
-                        x = hx + r * math.cos(a)
-                        y = hy + r * math.sin(a)
-                        code = "D02*" if i == 0 else "D01*"
-                        f.write(f"X{int(x*1000):07d}Y{int(y*1000):07d}{code}\n")
-                    if ann is not None:
-                        rr = r + ann
-                        for i in range(13):
-                            a = 2 * math.pi * i / 12
-                            x = hx + rr * math.cos(a)
-                            y = hy + rr * math.sin(a)
-                            code = "D02*" if i == 0 else "D01*"
-                            f.write(f"X{int(x*1000):07d}Y{int(y*1000):07d}{code}\n")
-        
-        # Save SVG previews if the method exists
-        if hasattr(board, 'save_svg_previews'):
-            board.save_svg_previews(str(temp_dir))
-        
-        # Prepare exploded output directory and ZIP archive
-        exploded_dir = output_zip_path.parent / output_zip_path.stem
+        with open(temp, "xb") as handle:
+            yield handle
+        os.replace(temp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temp)
+        raise
+
+
+class _Tee(io.RawIOBase):
+    """Binary sink that forwards every write to several streams."""
+
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        for stream in self.streams:
+            stream.write(data)
+        return len(data)
+
+
+def write_gerbers(
+    board,
+    archive,
+    exploded_dir=None,
+    previews=True,
+    workers=None,
+    processes=True,
+    coordinate_format=DEFAULT_FORMAT,
+    cache=None,
+):
+    """Stream every Gerber file of ``board`` into the open ``archive``.
+
+    Each layer is generated once and written straight into its ZIP entry;
+    nothing is staged on disk.  If ``exploded_dir`` is given, the same bytes
+    are also written to a file of the same name in that directory.
+
+    Parameters
+    ----------
+    board : Board
+        Board to export.
+    archive : zipfile.ZipFile
+        Archive opened for writing.
+    exploded_dir : str or Path, optional
+        Directory that receives a loose copy of every file.
+    previews : bool
+        Add the SVG (and PNG) previews from ``board.render_svg_previews``.
+    workers : int, optional
+        Render the layers in a pool of this many workers.  The archive is
+        still assembled in layer order and is byte-identical to a serial
+        export.
+    processes : bool
+        Use a process pool for ``workers``; ``False`` uses threads.
+    coordinate_format : CoordinateFormat
+        ``%FS`` format and unit of the Gerber files.
+    cache : ExportCache, optional
+        Reuse files whose content fingerprint is unchanged and store the
+        others.  Only the missing files are rendered; every file is still
+        compressed into the archive.
+    """
+    if exploded_dir is not None:
+        exploded_dir = Path(exploded_dir)
         exploded_dir.mkdir(parents=True, exist_ok=True)
 
-        with zipfile.ZipFile(output_zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-            for file_path in temp_dir.glob("*"):
-                if file_path.is_file():
-                    zipf.write(file_path, file_path.name)
-                    shutil.copy(file_path, exploded_dir / file_path.name)
-    
+    with contextlib.ExitStack() as pool_stack:
+        layers = list(gerber_layers(board, coordinate_format))
+        cached = [None] * len(layers)
+        if cache is not None:
+            keys = [cache.key(name, writer, args) for name, writer, args in layers]
+            cached = [cache.get(key) for key in keys]
+        misses = [index for index, entry in enumerate(cached) if entry is None]
+
+        texts = {}
+        if workers and workers > 1 and len(misses) > 1:
+            pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+            executor = pool_stack.enter_context(pool(max_workers=workers))
+            texts = {index: executor.submit(render_layer, *layers[index][1:]) for index in misses}
+
+        for index, (name, writer, args) in enumerate(layers):
+            if cache is not None:
+                content = cached[index]
+                if content is None:
+                    text = texts[index].result() if texts else render_layer(writer, args)
+                    content = text.encode("utf-8")
+                    cache.put(keys[index], content)
+                with archive.open(name, "w") as sink:
+                    sink.write(content)
+                if exploded_dir is not None:
+                    with _atomic_file(exploded_dir / name) as handle:
+                        handle.write(content)
+                continue
+            with contextlib.ExitStack() as stack:
+                sink = stack.enter_context(archive.open(name, "w"))
+                if exploded_dir is not None:
+                    sink = _Tee(sink, stack.enter_context(_atomic_file(exploded_dir / name)))
+                with io.TextIOWrapper(io.BufferedWriter(sink), encoding="utf-8") as f:
+                    if not texts:
+                        writer(f, *args)
+                    else:
+                        f.write(texts[index].result())
+
+    if previews and hasattr(board, "render_svg_previews"):
+        for name, data in board.render_svg_previews().items():
+            archive.writestr(name, data)
+            if exploded_dir is not None:
+                with _atomic_file(exploded_dir / name) as handle:
+                    handle.write(data)
+
+
+def export_gerbers(
+    board,
+    output_zip_path,
+    exploded=True,
+    compression=zipfile.ZIP_DEFLATED,
+    workers=None,
+    processes=True,
+    coordinate_format=DEFAULT_FORMAT,
+    cache=None,
+    compresslevel=None,
+):
+    """
+    Export board layers as Gerber files and compress them into a ZIP archive.
+
+    Layers are streamed directly into the archive without temporary
+    directories.  A ZIP path is first written under a unique temporary name
+    and then renamed into place, so several boards can be exported into the
+    same directory concurrently from threads or processes.
+
+    Args:
+        board: Object containing layer data with 'layers' attribute (dict) and
+            an optional render_svg_previews method
+        output_zip_path: Path where the ZIP file will be saved, or a writable
+            binary file object such as io.BytesIO
+        exploded: True to also copy every file into a directory named after
+            the ZIP file next to it, False to skip the copy, or a directory path
+        compression: zipfile compression method for the archive entries,
+            e.g. ZIP_STORED to skip compression entirely
+        workers: Render layers in parallel with this many workers; the
+            archive is byte-identical to a serial export
+        processes: Use processes rather than threads for ``workers``
+        coordinate_format: CoordinateFormat giving the ``%FSLA`` integer and
+            decimal digits and the unit of the files; layer geometry is
+            kept in millimetres and rounded only when it is written
+        cache: ExportCache whose stored files are added to the archive
+            for layers that have not changed; this skips rendering them,
+            not compressing them
+        compresslevel: zlib level (0-9) for ZIP_DEFLATED; ``None`` uses the
+            zlib default
+    """
+    try:
+        exploded_dir = None
+        if isinstance(output_zip_path, (str, os.PathLike)):
+            # Convert to Path object for better path handling
+            output_zip_path = Path(output_zip_path)
+            # Ensure parent directory exists
+            output_zip_path.parent.mkdir(parents=True, exist_ok=True)
+            if exploded is True:
+                exploded_dir = output_zip_path.parent / output_zip_path.stem
+        if exploded not in (True, False, None):
+            exploded_dir = Path(exploded)
+
+        if isinstance(output_zip_path, Path):
+            with _atomic_file(output_zip_path) as handle:
+                with zipfile.ZipFile(handle, "w", compression, compresslevel=compresslevel) as zipf:
+                    write_gerbers(
+                        board,
+                        zipf,
+                        exploded_dir,
+                        workers=workers,
+                        processes=processes,
+                        coordinate_format=coordinate_format,
+                        cache=cache,
+                    )
+        else:
+            with zipfile.ZipFile(output_zip_path, "w", compression, compresslevel=compresslevel) as zipf:
+                write_gerbers(
+                    board,
+                    zipf,
+                    exploded_dir,
+                    workers=workers,
+                    processes=processes,
+                    coordinate_format=coordinate_format,
+                    cache=cache,
+                )
+
     except Exception as e:
         print(f"Error during Gerber export: {str(e)}")
         raise
-    
-    finally:
-        # Clean up temporary directory
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+BatchResult = namedtuple("BatchResult", ["path", "error"])
+
+
+def _export_job(board, path, kwargs):
+    try:
+        if hasattr(board, "export_gerbers"):
+            board.export_gerbers(path, **kwargs)
+        else:
+            export_gerbers(board, path, **kwargs)
+    except Exception as e:
+        return BatchResult(path, e)
+    return BatchResult(path, None)
+
+
+def export_gerbers_batch(jobs, workers=None, processes=False, **kwargs):
+    """Export many boards concurrently.
+
+    Each board is exported with its own ``export_gerbers`` method, so the
+    design rule check runs first, exactly as for a single export.  A board
+    must not appear in more than one job.
+
+    Args:
+        jobs: Iterable of ``(board, output_zip_path)`` pairs
+        workers: Size of the worker pool; defaults to the executor's default
+        processes: Use a process pool instead of a thread pool.  Boards and
+            their results must then be picklable
+        **kwargs: Extra arguments for each ``export_gerbers`` call
+
+    Returns:
+        A list of ``BatchResult(path, error)`` in job order.  ``error`` is
+        ``None`` on success or the exception raised by that job.
+    """
+    pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with pool(max_workers=workers) as executor:
+        futures = [executor.submit(_export_job, board, path, kwargs) for board, path in jobs]
+        return [future.result() for future in futures]
@@ -8,8 +8,20 @@ from .Board import Board
 # Expose useful Board helper methods at module level
 chamfer_outline = Board.chamfer_outline
 from .Zone import Zone
-from .drc import check_board, DRCError
-from .rules import LAYER_SERVICE_RULES
+from .drc import (
+    check_board,
+    cluster_violations,
+    iter_violations,
+    DRCError,
+    DRCCache,
+    DRCProfile,
+    RuleStats,
+    Violation,
+    ViolationCluster,
+)
+from .gerberformat import CoordinateFormat
+from .exportcache import CacheStats, ExportCache
+from .rules import LAYER_SERVICE_RULES, RuleSet, load_rules, service_rules
 from .circuits import (
     create_voltage_divider,
     create_led_indicator,
@@ -68,5 +80,18 @@ __all__ = [
     "BOTTOM_SILK",
     "check_board",
     "DRCError",
+    "DRCCache",
+    "DRCProfile",
+    "RuleStats",
+    "Violation",
+    "ViolationCluster",
+    "iter_violations",
+    "cluster_violations",
     "LAYER_SERVICE_RULES",
+    "RuleSet",
+    "load_rules",
+    "service_rules",
+    "CoordinateFormat",
+    "ExportCache",
+    "CacheStats",
 ]
@@ -0,0 +1,135 @@
+"""Gerber aperture table.
+
+An :class:`ApertureTable` hands out D codes for the shapes used in one
+Gerber file and renders the matching ``%AM`` macro and ``%ADD`` definitions.
+Identical shapes share a code, so a board with thousands of identical pads
+defines a single aperture and flashes it with ``D03``.
+"""
+
+import math
+
+from .copper import pad_is_round
+
+# First D code available for apertures; D00-D09 are reserved.
+FIRST_CODE = 10
+
+# Stroke width for preformatted outlines such as fills, logos, text and the
+# board outline, which carry no width of their own.
+DEFAULT_LINE_WIDTH = 0.1
+
+# Rectangle rotated about its centre: width, height, rotation in degrees.
+ROTATED_RECT_MACRO = "%AMROTRECT*21,1,$1,$2,0,0,$3*%"
+
+# Obround as a round-capped line: cap diameter, then both cap centres.
+ROTATED_OBROUND_MACRO = "%AMROTOBROUND*1,1,$1,$2,$3*1,1,$1,$4,$5*20,1,$1,$2,$3,$4,$5,0*%"
+
+_MACROS = {"ROTRECT": ROTATED_RECT_MACRO, "ROTOBROUND": ROTATED_OBROUND_MACRO}
+
+
+def format_number(value, places=4):
+    """Format ``value`` with up to ``places`` decimals and no trailing zeros."""
+    text = f"{value:.{places}f}".rstrip("0").rstrip(".")
+    return "0" if text in ("", "-0") else text
+
+
+def _quarter_turns(angle):
+    """Return the number of quarter turns in ``angle``, or ``None`` if it is not a multiple of 90."""
+    angle = angle % 360
+    for turns in range(4):
+        if abs(angle - 90 * turns) < 1e-9:
+            return turns
+    if abs(angle - 360) < 1e-9:
+        return 0
+    return None
+
+
+def pad_aperture(pad):
+    """Return the aperture shape of ``pad`` as ``(kind, *params)``.
+
+    Pads with an explicit ``shape`` of ``"circle"``, ``"rect"`` or
+    ``"obround"`` use it.  Otherwise round and castellated pads are circles
+    of their width and all other pads are rectangles.  Pads are rotated with
+    their component.
+    """
+    rotation = getattr(getattr(pad, "component", None), "rotation", 0) or 0
+    shape = getattr(pad, "shape", None)
+    if shape is None:
+        shape = "circle" if pad_is_round(pad) else "rect"
+    if shape == "circle":
+        return ("circle", pad.w)
+    if shape == "obround":
+        return ("obround", pad.w, pad.h, rotation)
+    return ("rect", pad.w, pad.h, rotation)
+
+
+class ApertureTable:
+    """D codes for the apertures used in one Gerber file.
+
+    Shapes are requested with :meth:`circle`, :meth:`rect`, :meth:`obround`
+    or :meth:`get`, each of which returns the D code to select.  Axis-aligned
+    shapes use the standard ``C``, ``R`` and ``O`` templates; rectangles and
+    obrounds at other angles use the ``ROTRECT`` and ``ROTOBROUND`` macros.
+
+    Sizes are given in millimetres and written in the file's unit, which
+    is ``unit_scale`` file units per millimetre.
+    """
+
+    def __init__(self, unit_scale=1.0):
+        self._codes = {}
+        self.unit_scale = unit_scale
+        # Inch files need more decimals to keep micrometre sizes.
+        self._places = 4 if unit_scale == 1.0 else 6
+
+    def __len__(self):
+        return len(self._codes)
+
+    def _code(self, template, *params):
+        key = (template, *(format_number(p, self._places) for p in params))
+        if key not in self._codes:
+            self._codes[key] = FIRST_CODE + len(self._codes)
+        return self._codes[key]
+
+    def circle(self, diameter):
+        """Return the D code of a circle of ``diameter`` mm."""
+        return self._code("C", diameter * self.unit_scale)
+
+    def rect(self, width, height, rotation=0.0):
+        """Return the D code of a ``width`` x ``height`` rectangle rotated by ``rotation`` degrees."""
+        width, height = width * self.unit_scale, height * self.unit_scale
+        turns = _quarter_turns(rotation)
+        if turns is None:
+            return self._code("ROTRECT", width, height, rotation % 360)
+        if turns % 2:
+            width, height = height, width
+        return self._code("R", width, height)
+
+    def obround(self, width, height, rotation=0.0):
+        """Return the D code of a ``width`` x ``height`` obround rotated by ``rotation`` degrees."""
+        width, height = width * self.unit_scale, height * self.unit_scale
+        turns = _quarter_turns(rotation)
+        if turns is not None:
+            if turns % 2:
+                width, height = height, width
+            return self._code("O", width, height)
+        diameter = min(width, height)
+        half = (max(width, height) - diameter) / 2
+        angle = math.radians(rotation + (0 if width >= height else 90))
+        dx, dy = half * math.cos(angle), half * math.sin(angle)
+        return self._code("ROTOBROUND", diameter, -dx, -dy, dx, dy)
+
+    def get(self, shape):
+        """Return the D code for a ``(kind, *params)`` shape from :func:`pad_aperture`."""
+        kind, *params = shape
+        return getattr(self, kind)(*params)
+
+    def definitions(self):
+        """Return the macro and ``%ADD`` lines for every aperture handed out."""
+        lines = []
+        used = {key[0] for key in self._codes}
+        for name, macro in _MACROS.items():
+            if name in used:
+                lines.append(macro)
+        for key, code in self._codes.items():
+            template, params = key[0], key[1:]
+            lines.append(f"%ADD{code}{template},{'X'.join(params)}*%")
+        return lines
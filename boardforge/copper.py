@@ -0,0 +1,353 @@
+"""Per-layer copper geometry model used by design rule checks.
+
+Traces, pads, vias and filled zones are converted to shapely geometry and
+indexed per layer in an :class:`~shapely.STRtree` of their buffered bounding
+boxes.  Queries then only measure shapes whose boxes lie within the
+requested distance of each other.
+"""
+
+import re
+
+import numpy as np
+import shapely
+from shapely import STRtree
+
+from .flatten import DEFAULT_TOLERANCE, flat_trace
+from .primitives import layer_objects
+
+# Default copper layer for component pads, which carry no layer of their own.
+PAD_LAYER = "GTL"
+
+# Gerber names of inner copper layers: G1, G2, ...
+INNER_LAYER = re.compile(r"G\d+")
+
+# Pads whose width and height differ by no more than this are drawn round.
+ROUND_PAD_TOLERANCE = 0.1
+
+
+def unique_pairs(first, second, count, symmetric=False):
+    """Return index pairs ordered so ``first < second`` with duplicates removed.
+
+    ``symmetric`` results, where every pair is known to appear in both
+    orders, are reduced by keeping the ``first < second`` half.  Otherwise
+    pairs are reordered and deduplicated.  Self pairs are always dropped.
+    """
+    if symmetric:
+        keep = first < second
+        return first[keep], second[keep]
+    low, high = np.minimum(first, second), np.maximum(first, second)
+    keep = low != high
+    codes = np.unique(low[keep].astype(np.int64) * count + high[keep])
+    return (codes // count).astype(np.intp), (codes % count).astype(np.intp)
+
+
+def box_pairs(lo_x, lo_y, hi_x, hi_y, subset, margin=0.0):
+    """Return index pairs whose boxes overlap, for the indices in ``subset``.
+
+    Each member of ``subset`` is tested against every box with vectorised
+    comparisons, after growing it by ``margin``.  This avoids building a
+    spatial index when only a handful of objects need checking.
+    """
+    firsts = []
+    seconds = []
+    for i in subset.tolist():
+        found = np.flatnonzero(
+            (lo_x <= hi_x[i] + margin)
+            & (hi_x >= lo_x[i] - margin)
+            & (lo_y <= hi_y[i] + margin)
+            & (hi_y >= lo_y[i] - margin)
+        )
+        firsts.append(np.full(len(found), i, dtype=np.intp))
+        seconds.append(found)
+    if not firsts:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate(firsts), np.concatenate(seconds)
+
+
+# Subsets larger than this share of all objects are queried through an STRtree.
+BOX_SCAN_FRACTION = 1 / 64
+
+
+def pad_is_round(pad):
+    """Return ``True`` if ``pad`` is drawn as a circle rather than a rectangle."""
+    return getattr(pad, "castellated", False) or abs(pad.w - pad.h) <= ROUND_PAD_TOLERANCE
+
+
+def copper_layer_names(names):
+    """Return the copper layers among the layer ``names``, top to bottom.
+
+    Copper layers are ``GTL``, the inner layers ``G1``, ``G2``, ... and
+    ``GBL``; other names such as silkscreen are dropped.
+    """
+    inner = sorted((name for name in names if INNER_LAYER.fullmatch(name)), key=lambda name: int(name[1:]))
+    return [name for name in ("GTL",) if name in names] + inner + [name for name in ("GBL",) if name in names]
+
+
+def pad_is_through_hole(pad):
+    """Return ``True`` if ``pad`` is drilled through the board.
+
+    Pads with a ``drill`` and castellated pads, which are plated half
+    holes, have copper on every layer.
+    """
+    return getattr(pad, "drill", None) is not None or getattr(pad, "castellated", False)
+
+
+def pad_layers(pad, copper_layers):
+    """Return the names of the copper layers ``pad`` occupies.
+
+    Through-hole pads span all of ``copper_layers``, as returned by
+    :func:`copper_layer_names`.  Other pads sit on their ``layer``, or on
+    :data:`PAD_LAYER` if they have none.
+    """
+    if pad_is_through_hole(pad) and copper_layers:
+        return tuple(copper_layers)
+    return (getattr(pad, "layer", PAD_LAYER),)
+
+
+def pad_shapes(pads):
+    """Return ``(cores, radii)`` arrays describing the copper of ``pads``.
+
+    Round pads become points with a radius of ``w / 2``.  Other pads are
+    rectangles rotated with their component and a radius of zero.
+    """
+    cores = np.empty(len(pads), dtype=object)
+    radii = np.zeros(len(pads))
+    if not pads:
+        return cores, radii
+    xs = np.array([pad.x for pad in pads], dtype=float)
+    ys = np.array([pad.y for pad in pads], dtype=float)
+    ws = np.array([pad.w for pad in pads], dtype=float)
+    hs = np.array([pad.h for pad in pads], dtype=float)
+    angle = np.radians(
+        [getattr(getattr(pad, "component", None), "rotation", 0) for pad in pads]
+    )
+    round_mask = np.array([pad_is_round(pad) for pad in pads], dtype=bool)
+
+    if round_mask.any():
+        cores[round_mask] = shapely.points(xs[round_mask], ys[round_mask])
+        radii[round_mask] = ws[round_mask] / 2
+    rect = ~round_mask
+    if rect.any():
+        cos, sin = np.cos(angle[rect]), np.sin(angle[rect])
+        half_w, half_h = ws[rect] / 2, hs[rect] / 2
+        corners = np.array([(-1, -1), (1, -1), (1, 1), (-1, 1)], dtype=float)
+        dx = corners[:, 0] * half_w[:, None]
+        dy = corners[:, 1] * half_h[:, None]
+        coords = np.stack(
+            (
+                xs[rect][:, None] + dx * cos[:, None] - dy * sin[:, None],
+                ys[rect][:, None] + dx * sin[:, None] + dy * cos[:, None],
+            ),
+            axis=-1,
+        )
+        cores[rect] = shapely.polygons(coords)
+    return cores, radii
+
+
+class CopperLayer:
+    """Copper shapes on a single layer, indexed in an STRtree.
+
+    Each shape is stored as a core geometry plus a radius: the copper is the
+    core buffered by that radius.  Traces are centre lines with half their
+    width, vias and round pads are points, and rectangular pads and zones
+    are polygons with a radius of zero.  Distances are measured between the
+    cores and reduced by both radii, which is exact for buffered shapes and
+    avoids building round-capped polygons.  The tree indexes the buffered
+    bounding boxes.
+
+    Each shape also has a ``kind`` (``"trace"``, ``"pad"``, ``"via"`` or
+    ``"zone"``), a human readable label for DRC messages and the board
+    object it was built from.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.cores = []
+        self.radii = []
+        self.kinds = []
+        self.labels = []
+        self.sources = []
+        self._tree = None
+
+    def __len__(self):
+        return len(self.cores)
+
+    def add(self, kind, core, radius, label, source=None):
+        self.cores.append(core)
+        self.radii.append(radius)
+        self.kinds.append(kind)
+        self.labels.append(label)
+        self.sources.append(source)
+        self._tree = None
+
+    def shape(self, index):
+        """Return the buffered copper polygon of shape ``index``."""
+        core, radius = self.cores[index], self.radii[index]
+        return shapely.buffer(core, radius) if radius > 0 else core
+
+    def extents(self):
+        """Return ``(lo_x, lo_y, hi_x, hi_y)`` arrays bounding each copper shape."""
+        bounds = shapely.bounds(np.asarray(self.cores, dtype=object))
+        radii = np.asarray(self.radii, dtype=float)
+        return (
+            bounds[:, 0] - radii,
+            bounds[:, 1] - radii,
+            bounds[:, 2] + radii,
+            bounds[:, 3] + radii,
+        )
+
+    def _boxes(self, margin):
+        lo_x, lo_y, hi_x, hi_y = self.extents()
+        return shapely.box(lo_x - margin, lo_y - margin, hi_x + margin, hi_y + margin)
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            self._tree = STRtree(self._boxes(0.0))
+        return self._tree
+
+    def close_pairs(self, distance, subset=None):
+        """Return ``(first, second, gap, candidates)`` for shapes within ``distance``.
+
+        Only pairs with ``first < second`` are returned and ``gap`` holds the
+        exact edge-to-edge distance between the two shapes, or a negative
+        value if they overlap.  ``candidates`` counts the pairs whose
+        distance was measured.  If ``subset`` is given, only pairs with at
+        least one member in that index array are returned.
+        """
+        empty = np.empty(0, dtype=np.intp)
+        if len(self.cores) < 2:
+            return empty, empty, np.empty(0), 0
+        if subset is None:
+            first, second = self.tree.query(self._boxes(distance))
+        elif len(subset) <= BOX_SCAN_FRACTION * len(self.cores):
+            first, second = box_pairs(*self.extents(), subset, margin=distance)
+        else:
+            found, second = self.tree.query(self._boxes(distance)[subset])
+            first = subset[found]
+        first, second = unique_pairs(first, second, len(self.cores), symmetric=subset is None)
+        cores = np.asarray(self.cores, dtype=object)
+        radii = np.asarray(self.radii, dtype=float)
+        gaps = shapely.distance(cores[first], cores[second]) - radii[first] - radii[second]
+        within = gaps <= distance
+        return first[within], second[within], gaps[within], len(first)
+
+
+def close_pairs(cores, radii, distance):
+    """Return :meth:`CopperLayer.close_pairs` for bare ``cores`` and ``radii`` arrays."""
+    layer = CopperLayer("")
+    layer.cores = list(cores)
+    layer.radii = list(radii)
+    return layer.close_pairs(distance)
+
+
+def _trace_shapes(board, name, item):
+    if item[0] == "TRACE":
+        pin1, pin2 = item[1], item[2]
+        width = item[3] if len(item) >= 4 else 1.0
+        x, y = pin1.x, pin1.y
+        core = shapely.linestrings([(pin1.x, pin1.y), (pin2.x, pin2.y)])
+    else:
+        width = item[2] if len(item) >= 3 else 1.0
+        # Shared with the Gerber writer and previews through the cache.
+        flat = flat_trace(board, item[1], getattr(board, "curve_tolerance", DEFAULT_TOLERANCE))
+        x, y = flat.points[0]
+        core = flat.line
+    label = f"trace at ({x:.3f},{y:.3f})"
+    return [(name, "trace", core, width / 2, label)]
+
+
+def _via_shapes(via):
+    core = shapely.points(via.x, via.y)
+    label = f"via at ({via.x},{via.y})"
+    return [
+        (name, "via", core, via.diameter / 2, label)
+        for name in dict.fromkeys((via.from_layer, via.to_layer))
+    ]
+
+
+def _zone_shapes(zone):
+    if zone.geometry is None or zone.geometry.is_empty:
+        return []
+    label = f"zone {zone.net}" if zone.net else "zone"
+    return [(zone.layer, "zone", zone.geometry, 0.0, label)]
+
+
+def build_copper_layers(board, shape_cache=None, dirty=None):
+    """Return a ``{layer: CopperLayer}`` model of all copper on ``board``.
+
+    ``shape_cache`` optionally maps ``id(obj)`` to the shapes built for that
+    object on a previous call.  Entries are reused for objects whose id is
+    not in ``dirty`` and the cache is refreshed in place, so incremental
+    checks only rebuild geometry for changed objects.
+    """
+    previous = dict(shape_cache) if shape_cache is not None else {}
+    dirty = dirty if dirty is not None else ()
+    built = {}
+
+    def reuse(obj):
+        key = id(obj)
+        if key in previous and key not in dirty:
+            built[key] = previous[key]
+            return True
+        return False
+
+    sources = []
+    for name, items in board.layers.items():
+        for item in layer_objects(items):
+            if item[0] not in ("TRACE", "TRACE_PATH"):
+                continue
+            if not reuse(item):
+                built[id(item)] = _trace_shapes(board, name, item)
+            sources.append(item)
+
+    pads = []
+    for comp in board.components:
+        pads.extend(comp.pads)
+    fresh = [pad for pad in pads if not reuse(pad)]
+    cores, radii = pad_shapes(fresh)
+    copper = copper_layer_names(board.layers)
+    for pad, core, radius in zip(fresh, cores, radii):
+        owner = getattr(getattr(pad, "component", None), "ref", "?")
+        label = f"pad {owner}:{pad.name}"
+        built[id(pad)] = [(name, "pad", core, radius, label) for name in pad_layers(pad, copper)]
+    sources.extend(pads)
+
+    for via in board.vias:
+        if not reuse(via):
+            built[id(via)] = _via_shapes(via)
+        sources.append(via)
+
+    for zone in board.zones:
+        if not reuse(zone):
+            built[id(zone)] = _zone_shapes(zone)
+        sources.append(zone)
+
+    layers = {}
+    for source in sources:
+        for name, kind, core, radius, label in built[id(source)]:
+            if name not in layers:
+                layers[name] = CopperLayer(name)
+            layers[name].add(kind, core, radius, label, source)
+
+    if shape_cache is not None:
+        shape_cache.clear()
+        shape_cache.update(built)
+    return layers
+
+
+def connected_groups(count, first, second):
+    """Label ``count`` shapes so that touching shapes share a group id."""
+    parent = list(range(count))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in zip(first.tolist(), second.tolist()):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+    return np.array([find(i) for i in range(count)], dtype=np.intp)
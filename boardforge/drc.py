@@ -1,29 +1,838 @@
-"""Design Rule Checking utilities."""
+"""Design Rule Checking utilities.
+
+Rules report :class:`Violation` objects.  :func:`iter_violations` streams
+them one rule at a time, :func:`check_board` collects them into a list and
+:func:`cluster_violations` groups repeated violations by rule and board
+region for a compact summary.
+"""
+
+import dataclasses
+import itertools
+import math
+import time
+from typing import Iterator, List
+
+import numpy as np
+import shapely
+from shapely import STRtree
+
+from .copper import (
+    BOX_SCAN_FRACTION,
+    box_pairs,
+    build_copper_layers,
+    close_pairs,
+    connected_groups,
+    copper_layer_names,
+    pad_layers,
+    unique_pairs,
+)
+from .flatten import DEFAULT_TOLERANCE
+from .primitives import layer_objects
+from .rules import RuleSet
+from .tiling import TileRunner
+
+# Number of violations quoted in a DRCError message; the rest are counted.
+MESSAGE_LIMIT = 20
+
+# Drills with a radius above this multiple of the median radius are paired
+# through an STRtree rather than sizing the neighbour grid.
+LARGE_DRILL_FACTOR = 2.0
+
+
+class Violation(str):
+    """A single design rule violation.
+
+    A violation is the human readable warning message, so code treating DRC
+    warnings as plain strings keeps working.  The structured fields describe
+    the violation for tools that filter or group them.
+
+    Attributes
+    ----------
+    rule : str
+        Identifier of the broken rule, for example ``"pad_clearance"``.
+    location : tuple of float or None
+        Board coordinates in mm where the violation occurs.
+    objects : tuple of str
+        Labels of the objects involved.
+    value : float or None
+        Measured value in mm.
+    limit : float or None
+        Required minimum in mm.
+    """
+
+    def __new__(cls, message, rule, location=None, objects=(), value=None, limit=None):
+        self = super().__new__(cls, message)
+        self.rule = rule
+        self.location = location
+        self.objects = tuple(objects)
+        self.value = value
+        self.limit = limit
+        return self
+
+    def __getnewargs__(self):
+        return (str(self), self.rule, self.location, self.objects, self.value, self.limit)
+
+
+@dataclasses.dataclass
+class ViolationCluster:
+    """Violations of one rule within one board region.
+
+    ``bounds`` is the ``(minx, miny, maxx, maxy)`` box around the violation
+    locations, or ``None`` for violations without a location.  ``worst`` is
+    the violation with the smallest measured value.
+    """
+
+    rule: str
+    count: int
+    bounds: tuple | None
+    worst: Violation
+
+    def __str__(self):
+        where = ""
+        if self.bounds is not None:
+            minx, miny, maxx, maxy = self.bounds
+            where = f" in ({minx:.2f},{miny:.2f})-({maxx:.2f},{maxy:.2f})"
+        noun = "violation" if self.count == 1 else "violations"
+        return f"{self.rule}: {self.count} {noun}{where}; worst: {self.worst}"
+
+
+def cluster_violations(violations, cell: float = 10.0) -> List[ViolationCluster]:
+    """Group ``violations`` by rule and by ``cell`` x ``cell`` mm board region.
+
+    Plain string warnings are grouped under the ``"other"`` rule.  Clusters
+    are returned largest first.
+    """
+    groups = {}
+    for violation in violations:
+        rule = getattr(violation, "rule", "other")
+        location = getattr(violation, "location", None)
+        if location is None:
+            key = (rule, None)
+        else:
+            key = (rule, (math.floor(location[0] / cell), math.floor(location[1] / cell)))
+        group = groups.get(key)
+        if group is None:
+            bounds = None if location is None else (*location, *location)
+            groups[key] = ViolationCluster(rule, 1, bounds, violation)
+            continue
+        group.count += 1
+        if location is not None:
+            minx, miny, maxx, maxy = group.bounds
+            group.bounds = (
+                min(minx, location[0]),
+                min(miny, location[1]),
+                max(maxx, location[0]),
+                max(maxy, location[1]),
+            )
+        value = getattr(violation, "value", None)
+        worst = getattr(group.worst, "value", None)
+        if value is not None and (worst is None or value < worst):
+            group.worst = violation
+    return sorted(groups.values(), key=lambda group: (-group.count, group.rule))
+
+
+@dataclasses.dataclass
+class RuleStats:
+    """Work done by one rule family during a check.
+
+    ``objects`` counts the board objects examined, ``candidates`` the pairs
+    whose distance was measured by the narrow phase, ``violations`` the
+    violations reported and ``seconds`` the wall time spent in the rule.
+    Objects whose results were reused from an incremental cache are not
+    counted.
+    """
+
+    rule: str
+    objects: int = 0
+    candidates: int = 0
+    violations: int = 0
+    seconds: float = 0.0
+
+
+class DRCProfile:
+    """Per-rule statistics collected by :func:`check_board`.
+
+    Pass an instance as ``profile=`` and it is filled in as the rules run.
+    Statistics accumulate over repeated checks with the same profile.
+    ``str(profile)`` renders a table.
+    """
+
+    COLUMNS = ("objects", "candidates", "violations", "seconds")
+
+    def __init__(self):
+        self.rules = {}
+
+    def stats(self, rule) -> RuleStats:
+        """Return the statistics of ``rule``, creating them on first use."""
+        if rule not in self.rules:
+            self.rules[rule] = RuleStats(rule)
+        return self.rules[rule]
+
+    @property
+    def seconds(self) -> float:
+        return sum(stats.seconds for stats in self.rules.values())
+
+    def as_dict(self) -> dict:
+        """Return ``{rule: {column: value}}`` for serialising the profile."""
+        return {
+            rule: {column: getattr(stats, column) for column in self.COLUMNS}
+            for rule, stats in self.rules.items()
+        }
+
+    def table(self) -> str:
+        """Return the statistics as an aligned text table."""
+        rows = list(self.rules.values())
+        total = RuleStats(
+            "total",
+            sum(row.objects for row in rows),
+            sum(row.candidates for row in rows),
+            sum(row.violations for row in rows),
+            self.seconds,
+        )
+        width = max(len(row.rule) for row in rows + [total])
+        lines = [f"{'rule':<{width}} {'objects':>10} {'candidates':>12} {'violations':>10} {'seconds':>9}"]
+        for row in rows + [total]:
+            lines.append(
+                f"{row.rule:<{width}} {row.objects:>10} {row.candidates:>12} {row.violations:>10} {row.seconds:>9.4f}"
+            )
+        return "\n".join(lines)
+
+    __str__ = table
+
+
+def _profiled(profile, rule, produce):
+    """Yield the rows of ``produce()``, charging the time spent on them to ``rule``.
+
+    ``produce`` is called inside the timed region, so rules whose rows are
+    computed eagerly, such as cached per-object rules, are timed as well.
+    """
+    if profile is None:
+        yield from produce()
+        return
+    stats = profile.stats(rule)
+    start = time.perf_counter()
+    iterator = iter(produce())
+    stats.seconds += time.perf_counter() - start
+    while True:
+        start = time.perf_counter()
+        try:
+            row = next(iterator)
+        except StopIteration:
+            stats.seconds += time.perf_counter() - start
+            return
+        stats.seconds += time.perf_counter() - start
+        stats.violations += 1
+        yield row
+
 
 class DRCError(Exception):
-    """Raised when a design rule violation is detected."""
+    """Raised when a design rule violation is detected.
 
-    def __init__(self, warnings):
-        message = "; ".join(warnings)
+    ``warnings`` holds every collected violation.  The exception message
+    quotes at most :data:`MESSAGE_LIMIT` of them.  ``truncated`` is true when
+    checking stopped early because a violation limit was reached.
+    """
+
+    def __init__(self, warnings, truncated=False):
+        self.warnings = list(warnings)
+        self.truncated = truncated
+        message = "; ".join(self.warnings[:MESSAGE_LIMIT])
+        hidden = len(self.warnings) - MESSAGE_LIMIT
+        if hidden > 0:
+            message += f"; ... and {hidden} more"
+        if truncated:
+            message += f" (stopped after {len(self.warnings)} violations)"
         super().__init__(message)
-        self.warnings = warnings
 
-import math
-from typing import List
+    def summary(self, cell: float = 10.0) -> str:
+        """Return one line per cluster of similar violations."""
+        return "\n".join(str(cluster) for cluster in cluster_violations(self.warnings, cell))
+
+
+_EMPTY_PAIRS = (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0), 0)
+
+
+def _fingerprints(board):
+    """Return ``{id(obj): (family, obj, fingerprint)}`` for checked board objects.
+
+    A fingerprint captures everything about an object that DRC measures, so
+    comparing fingerprints between runs reveals which objects were added,
+    moved or resized.
+    """
+    found = {}
+    for layer_name, items in board.layers.items():
+        for item in layer_objects(items):
+            if item[0] == "TRACE":
+                pin1, pin2 = item[1], item[2]
+                fingerprint = (layer_name, pin1.x, pin1.y, pin2.x, pin2.y, item[3:])
+            elif item[0] == "TRACE_PATH":
+                fingerprint = (layer_name, repr(item[1]), item[2:])
+            else:
+                continue
+            found[id(item)] = ("trace", item, fingerprint)
+    copper = copper_layer_names(board.layers)
+    for comp in board.components:
+        for pad in comp.pads:
+            fingerprint = (
+                pad.x,
+                pad.y,
+                pad.w,
+                pad.h,
+                pad.name,
+                comp.rotation,
+                comp.ref,
+                id(comp),
+                getattr(pad, "castellated", False),
+                getattr(pad, "layer", None),
+                pad_layers(pad, copper),
+            )
+            found[id(pad)] = ("pad", pad, fingerprint)
+    for via in board.vias:
+        fingerprint = (via.x, via.y, via.diameter, via.hole, via.from_layer, via.to_layer)
+        found[id(via)] = ("via", via, fingerprint)
+    for hole in getattr(board, "holes", None) or []:
+        found[id(hole)] = ("hole", hole, hole)
+    for zone in board.zones:
+        geometry = zone.geometry.wkb if zone.geometry is not None else None
+        found[id(zone)] = ("zone", zone, (zone.layer, zone.net, geometry))
+    for call in getattr(board, "_svg_text_calls", None) or []:
+        found[id(call)] = ("text", call, call)
+    return found
+
+
+class DRCCache:
+    """State carried between incremental design rule checks.
+
+    The cache remembers a fingerprint of every trace, pad, via, hole, zone
+    and silkscreen text seen by the previous check, together with the pair
+    results of each pairwise rule.  On the next check only objects whose
+    fingerprint changed are dirty: pairwise rules re-measure pairs near the
+    dirty objects and reuse cached pairs between clean ones, and per-object
+    rules are only re-run when an object of their family changed.  Results
+    are reported in the same order as a full check.
+    """
+
+    def __init__(self):
+        self.settings = None
+        self.snapshot = {}
+        self.pairs = {}
+        self.results = {}
+        self.shapes = {}
+        self.dirty = set()
+        self.dirty_families = set()
+
+    def changes(self, board):
+        """Return ``{family: [objects]}`` added, changed or removed since the last check."""
+        current = _fingerprints(board)
+        changed = {}
+        for key, (family, obj, fingerprint) in current.items():
+            previous = self.snapshot.get(key)
+            if previous is None or previous[2] != fingerprint:
+                changed.setdefault(family, []).append(obj)
+        for key in self.snapshot.keys() - current.keys():
+            family, obj, _ = self.snapshot[key]
+            changed.setdefault(family, []).append(obj)
+        return changed
+
+    def invalidate(self):
+        """Forget cached results so the next check examines every object."""
+        self.settings = None
+        self.pairs.clear()
+        self.results.clear()
+        self.shapes.clear()
+
+    def begin(self, board, settings):
+        """Diff ``board`` against the previous check and mark dirty objects.
+
+        ``settings`` holds everything besides the objects that results depend
+        on, such as the rules and the curve tolerance; when it changes every
+        object is dirty.
+        """
+        current = _fingerprints(board)
+        if settings != self.settings:
+            self.pairs.clear()
+            self.results.clear()
+            self.dirty = set(current)
+            self.dirty_families = {"trace", "pad", "via", "hole", "zone", "text"}
+        else:
+            self.dirty = {
+                key
+                for key, (_, _, fingerprint) in current.items()
+                if key not in self.snapshot or self.snapshot[key][2] != fingerprint
+            }
+            removed = self.snapshot.keys() - current.keys()
+            self.dirty_families = {current[key][0] for key in self.dirty}
+            self.dirty_families.update(self.snapshot[key][0] for key in removed)
+        self.snapshot = current
+        self.settings = settings
+
+
+def _merge_pairs(cache, rule, keys, compute, stats=None):
+    """Return ``(first, second, values)`` for a pairwise rule.
+
+    ``keys`` identifies the object at each index and ``compute(subset)``
+    returns ``(first, second, values, candidates)`` for the rule's pairs
+    (``first < second``) that involve at least one index in ``subset``, or
+    every pair when ``subset`` is ``None``.  With a cache, pairs between
+    clean objects are taken from the previous run and only pairs touching
+    dirty objects are recomputed.  ``stats`` counts the objects and the
+    candidate pairs examined.
+    """
+    previous = cache.pairs.get(rule) if cache is not None else None
+    if previous is None or len(set(keys)) != len(keys):
+        first, second, values, candidates = compute(None)
+        examined = len(keys)
+    else:
+        index = {key: i for i, key in enumerate(keys)}
+        dirty = np.fromiter((key in cache.dirty for key in keys), bool, len(keys))
+        kept = []
+        for (key_a, key_b), value in previous.items():
+            i = index.get(key_a)
+            j = index.get(key_b)
+            if i is None or j is None or dirty[i] or dirty[j]:
+                continue
+            kept.append((min(i, j), max(i, j), value))
+        subset = np.flatnonzero(dirty)
+        fresh = compute(subset) if len(subset) else _EMPTY_PAIRS
+        candidates = fresh[3]
+        examined = len(subset)
+        first = np.concatenate([np.array([k[0] for k in kept], dtype=np.intp), fresh[0]])
+        second = np.concatenate([np.array([k[1] for k in kept], dtype=np.intp), fresh[1]])
+        values = np.concatenate([np.array([k[2] for k in kept], dtype=float), fresh[2]])
+    if cache is not None:
+        cache.pairs[rule] = {
+            (keys[i], keys[j]): value
+            for i, j, value in zip(first.tolist(), second.tolist(), values.tolist())
+        }
+    if stats is not None:
+        stats.objects += examined
+        stats.candidates += candidates
+    return first, second, values
+
+
+def _cached_rows(cache, rule, family, compute):
+    """Return the violations of a per-object rule, reusing them when ``family`` is clean."""
+    if cache is None:
+        return compute()
+    if rule not in cache.results or family in cache.dirty_families:
+        cache.results[rule] = list(compute())
+    return cache.results[rule]
+
+
+def _pad_pairs(xs, ys, radius, owners, lo_x, lo_y, hi_x, hi_y, min_clearance, subset=None):
+    """Return ``(first, second, clearance, candidates)`` for pads closer than ``min_clearance``.
+
+    Candidates are pads whose ``lo``/``hi`` boxes overlap.  Pads sharing an
+    owner are skipped.  With ``subset``, only pairs touching those indices
+    are returned.
+    """
+    count = len(xs)
+    if subset is not None and len(subset) <= BOX_SCAN_FRACTION * count:
+        first, second = box_pairs(lo_x, lo_y, hi_x, hi_y, subset)
+    else:
+        boxes = shapely.box(lo_x, lo_y, hi_x, hi_y)
+        tree = STRtree(boxes)
+        if subset is None:
+            first, second = tree.query(boxes)
+        else:
+            found, second = tree.query(boxes[subset])
+            first = subset[found]
+    first, second = unique_pairs(first, second, count, symmetric=subset is None)
+    keep = owners[first] != owners[second]
+    first, second = first[keep], second[keep]
+    clearance = (
+        np.hypot(xs[first] - xs[second], ys[first] - ys[second])
+        - radius[first]
+        - radius[second]
+    )
+    hits = clearance < min_clearance
+    return first[hits], second[hits], clearance[hits], len(first)
+
+
+def _pad_clearance_violations(
+    board, min_clearance: float, cache=None, tiles=None, stats=None
+) -> Iterator[Violation]:
+    """Yield pad clearance violations using an STRtree broad phase.
+
+    Each pad is approximated by a circle of radius ``max(w, h) / 2``.  Only
+    pads whose bounding boxes, grown by half the clearance, overlap are
+    compared, so the cost grows with the number of nearby pairs rather than
+    with the square of the pad count.  Pads on the same component are never
+    compared with each other.  With a :class:`~boardforge.tiling.TileRunner`
+    large full checks are split across worker processes.
+    """
+    pads = []
+    owners = []
+    for comp in board.components:
+        for pad in comp.pads:
+            pads.append(pad)
+            owners.append(id(comp))
+    if len(pads) < 2:
+        return
+
+    owners = np.asarray(owners, dtype=np.int64)
+    xs = np.fromiter((pad.x for pad in pads), float, len(pads))
+    ys = np.fromiter((pad.y for pad in pads), float, len(pads))
+    radius = np.fromiter((max(pad.w, pad.h) / 2 for pad in pads), float, len(pads))
+
+    reach = radius + max(min_clearance, 0.0) / 2
+    extents = (xs - reach, ys - reach, xs + reach, ys + reach)
+    columns = (xs, ys, radius, owners, *extents)
+
+    def compute(subset):
+        if subset is None and tiles is not None and tiles.wants(len(pads)):
+            return tiles.pairs(_pad_pairs, extents, max(min_clearance, 0.0), columns, (min_clearance,))
+        return _pad_pairs(*columns, min_clearance, subset)
+
+    keys = [id(pad) for pad in pads]
+    first, second, clearance = _merge_pairs(cache, "pad", keys, compute, stats)
+    # Report pairs in the same order as a nested loop over the pad list.
+    order = np.lexsort((second, first))
+
+    for i, j, value in zip(first[order].tolist(), second[order].tolist(), clearance[order].tolist()):
+        yield Violation(
+            f"Pad clearance between {pads[i].name} and {pads[j].name} is {value:.3f}mm; minimum {min_clearance}mm",
+            "pad_clearance",
+            ((xs[i] + xs[j]) / 2, (ys[i] + ys[j]) / 2),
+            (pads[i].name, pads[j].name),
+            value,
+            min_clearance,
+        )
+
+
+def _expand_ranges(starts: np.ndarray, stops: np.ndarray):
+    """Return ``(row, index)`` pairs for every index in ``starts[row]:stops[row]``."""
+    counts = np.maximum(stops - starts, 0)
+    rows = np.repeat(np.arange(len(starts)), counts)
+    base = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return rows, base + np.arange(counts.sum())
+
+
+def _neighbour_pairs(xs: np.ndarray, ys: np.ndarray, cell: float, subset=None):
+    """Return index pairs ``(i, j)`` with ``i < j`` of points in adjacent grid cells.
+
+    Points are hashed into square cells of size ``cell`` and sorted by cell
+    key.  Every point is then matched against its own cell and a half
+    stencil of neighbouring cells, so each unordered pair is produced once.
+    Any two points closer than ``cell`` are guaranteed to be returned.  If
+    ``subset`` is given, only pairs involving those indices are returned.
+    """
+    empty = np.empty(0, dtype=np.intp)
+    if len(xs) < 2 or not cell > 0:
+        return empty, empty
+
+    cx = np.floor((xs - xs.min()) / cell).astype(np.int64) + 1
+    cy = np.floor((ys - ys.min()) / cell).astype(np.int64) + 1
+    stride = int(cy.max()) + 2
+    order = np.argsort(cx * stride + cy, kind="stable")
+    keys = (cx * stride + cy)[order]
+
+    if subset is not None:
+        subset_keys = (cx * stride + cy)[subset]
+        firsts = []
+        seconds = []
+        for offset in (-stride - 1, -stride, -stride + 1, -1, 0, 1, stride - 1, stride, stride + 1):
+            target = subset_keys + offset
+            rows, cols = _expand_ranges(
+                np.searchsorted(keys, target, side="left"),
+                np.searchsorted(keys, target, side="right"),
+            )
+            firsts.append(subset[rows])
+            seconds.append(order[cols])
+        return unique_pairs(np.concatenate(firsts), np.concatenate(seconds), len(xs))
+
+    # Later points in the same cell.
+    rows, cols = _expand_ranges(
+        np.arange(1, len(keys) + 1), np.searchsorted(keys, keys, side="right")
+    )
+    firsts = [rows]
+    seconds = [cols]
+    for offset in (stride - 1, stride, stride + 1, 1):
+        target = keys + offset
+        rows, cols = _expand_ranges(
+            np.searchsorted(keys, target, side="left"),
+            np.searchsorted(keys, target, side="right"),
+        )
+        firsts.append(rows)
+        seconds.append(cols)
+
+    first = order[np.concatenate(firsts)]
+    second = order[np.concatenate(seconds)]
+    swap = first > second
+    first[swap], second[swap] = second[swap], first[swap]
+    return first, second
+
+
+def _drill_pairs(xs, ys, radius, min_clearance, subset=None):
+    """Return ``(first, second, clearance, candidates)`` for drills closer than ``min_clearance``.
+
+    The grid of :func:`_neighbour_pairs` is sized for the ordinary drills.
+    Drills wider than :data:`LARGE_DRILL_FACTOR` times the median radius,
+    such as mounting holes, are paired by a box scan or an STRtree instead,
+    so one large hole does not coarsen the grid for the whole board.
+    """
+    large = radius > LARGE_DRILL_FACTOR * np.median(radius)
+    small = np.flatnonzero(~large)
+    firsts = []
+    seconds = []
+    if len(small) >= 2:
+        local = None if subset is None else np.flatnonzero(np.isin(small, subset))
+        cell = 2 * radius[small].max() + min_clearance
+        first, second = _neighbour_pairs(xs[small], ys[small], cell, local)
+        firsts.append(small[first])
+        seconds.append(small[second])
+    if large.any():
+        big = np.flatnonzero(large)
+        lo_x, lo_y, hi_x, hi_y = xs - radius, ys - radius, xs + radius, ys + radius
+        if len(big) <= BOX_SCAN_FRACTION * len(xs):
+            first, other = box_pairs(lo_x, lo_y, hi_x, hi_y, big, min_clearance)
+        else:
+            tree = STRtree(shapely.box(lo_x, lo_y, hi_x, hi_y))
+            found, other = tree.query(
+                shapely.box(lo_x[big] - min_clearance, lo_y[big] - min_clearance,
+                            hi_x[big] + min_clearance, hi_y[big] + min_clearance)
+            )
+            first = big[found]
+        if subset is not None:
+            wanted = np.zeros(len(xs), dtype=bool)
+            wanted[subset] = True
+            keep = wanted[first] | wanted[other]
+            first, other = first[keep], other[keep]
+        firsts.append(first)
+        seconds.append(other)
+    if not firsts:
+        return _EMPTY_PAIRS
+    first, second = unique_pairs(np.concatenate(firsts), np.concatenate(seconds), len(xs))
+    clearance = (
+        np.hypot(xs[first] - xs[second], ys[first] - ys[second])
+        - radius[first]
+        - radius[second]
+    )
+    hits = clearance < min_clearance
+    return first[hits], second[hits], clearance[hits], len(first)
+
+
+def _drill_clearance_violations(
+    board, min_clearance: float, cache=None, tiles=None, stats=None
+) -> Iterator[Violation]:
+    """Yield edge-to-edge clearance violations between via and hole drills.
+
+    Vias and non-plated holes are packed into coordinate and radius arrays.
+    Candidate pairs come from :func:`_neighbour_pairs`, so dense via
+    stitching is checked in roughly linear time.  Via-to-via warnings are
+    reported first, then via-to-hole, then hole-to-hole.
+    """
+    vias = list(board.vias)
+    holes = list(getattr(board, "holes", None) or [])
+    count = len(vias) + len(holes)
+    if count < 2:
+        return
+
+    xs = np.fromiter([via.x for via in vias] + [h[0] for h in holes], float, count)
+    ys = np.fromiter([via.y for via in vias] + [h[1] for h in holes], float, count)
+    radius = np.fromiter(
+        [via.hole / 2 for via in vias] + [h[2] / 2 for h in holes], float, count
+    )
+
+    def compute(subset):
+        if subset is None and tiles is not None and tiles.wants(count):
+            extents = (xs - radius, ys - radius, xs + radius, ys + radius)
+            return tiles.pairs(_drill_pairs, extents, min_clearance, (xs, ys, radius), (min_clearance,))
+        return _drill_pairs(xs, ys, radius, min_clearance, subset)
+
+    keys = [id(via) for via in vias] + [id(hole) for hole in holes]
+    first, second, clearance = _merge_pairs(cache, "drill", keys, compute, stats)
+    kind = (first >= len(vias)).astype(int) + (second >= len(vias))
+    order = np.lexsort((second, first, kind))
+
+    def _at(index):
+        if index < len(vias):
+            return f"({vias[index].x},{vias[index].y})"
+        hole = holes[index - len(vias)]
+        return f"({hole[0]},{hole[1]})"
+
+    labels = ("Via clearance", "Via to hole clearance", "Hole clearance")
+    for k in order.tolist():
+        i, j, value = int(first[k]), int(second[k]), float(clearance[k])
+        yield Violation(
+            f"{labels[kind[k]]} between {_at(i)} and {_at(j)} is {value:.3f}mm; minimum {min_clearance}mm",
+            "hole_clearance",
+            ((xs[i] + xs[j]) / 2, (ys[i] + ys[j]) / 2),
+            (_at(i), _at(j)),
+            value,
+            min_clearance,
+        )
+
+
+def _copper_clearance_violations(
+    board, min_clearance: float, cache=None, tiles=None, stats=None
+) -> Iterator[Violation]:
+    """Yield edge-to-edge clearance violations between copper shapes.
+
+    Boards carry no net information, so copper shapes that touch or overlap
+    are treated as electrically connected.  A warning is raised for any two
+    shapes from different connected groups whose gap is below
+    ``min_clearance``.  Pad-to-pad pairs are left to the pad clearance check.
+    """
+    if not min_clearance > 0:
+        return
+    if cache is not None:
+        layers = build_copper_layers(board, cache.shapes, cache.dirty)
+    else:
+        layers = build_copper_layers(board)
+    for layer in layers.values():
+
+        def compute(subset):
+            if subset is None and tiles is not None and tiles.wants(len(layer)):
+                columns = (np.asarray(layer.cores, dtype=object), np.asarray(layer.radii, dtype=float))
+                return tiles.pairs(close_pairs, layer.extents(), min_clearance, columns, (min_clearance,))
+            return layer.close_pairs(min_clearance, subset)
+
+        keys = [id(source) for source in layer.sources]
+        first, second, gaps = _merge_pairs(cache, f"copper:{layer.name}", keys, compute, stats)
+        touching = gaps <= 0
+        groups = connected_groups(len(layer), first[touching], second[touching])
+        kinds = np.asarray(layer.kinds)
+        hits = np.flatnonzero(
+            (gaps > 0)
+            & (gaps < min_clearance)
+            & (groups[first] != groups[second])
+            & ~((kinds[first] == "pad") & (kinds[second] == "pad"))
+        )
+        hits = hits[np.lexsort((second[hits], first[hits]))]
+        for k in hits.tolist():
+            i, j, gap = int(first[k]), int(second[k]), float(gaps[k])
+            midpoint = shapely.shortest_line(layer.cores[i], layer.cores[j]).centroid
+            yield Violation(
+                f"Copper clearance on {layer.name} between {layer.labels[i]} and {layer.labels[j]} is {gap:.3f}mm; minimum {min_clearance}mm",
+                "copper_clearance",
+                (midpoint.x, midpoint.y),
+                (layer.labels[i], layer.labels[j]),
+                gap,
+                min_clearance,
+            )
+
+
+def _trace_width_violations(board, min_trace_width: float, stats=None) -> Iterator[Violation]:
+    for layer_name, items in board.layers.items():
+        for item in layer_objects(items):
+            if stats is not None and item[0] in ("TRACE", "TRACE_PATH"):
+                stats.objects += 1
+            if item[0] == "TRACE":
+                width = item[3] if len(item) >= 4 else 1.0
+                if width < min_trace_width:
+                    start = (item[1].x, item[1].y)
+                    yield Violation(
+                        f"Trace on {layer_name} width {width}mm below minimum {min_trace_width}mm",
+                        "trace_width",
+                        start,
+                        (f"trace at ({start[0]:.3f},{start[1]:.3f})",),
+                        width,
+                        min_trace_width,
+                    )
+            elif item[0] == "TRACE_PATH":
+                width = item[2] if len(item) >= 3 else 1.0
+                if width < min_trace_width:
+                    start = tuple(item[1][0][1]) if item[1] else None
+                    label = f"trace path at ({start[0]:.3f},{start[1]:.3f})" if start else "trace path"
+                    yield Violation(
+                        f"Trace path on {layer_name} width {width}mm below minimum {min_trace_width}mm",
+                        "trace_width",
+                        start,
+                        (label,),
+                        width,
+                        min_trace_width,
+                    )
+
+
+def _via_violations(
+    board, min_annular_ring, min_via_diameter, min_through_hole, stats=None
+) -> Iterator[Violation]:
+    if stats is not None:
+        stats.objects += len(board.vias)
+    for via in board.vias:
+        at = f"via at ({via.x},{via.y})"
+        if min_via_diameter and via.diameter < min_via_diameter:
+            yield Violation(
+                f"Via at ({via.x},{via.y}) diameter {via.diameter}mm below minimum {min_via_diameter}mm",
+                "via_diameter",
+                (via.x, via.y),
+                (at,),
+                via.diameter,
+                min_via_diameter,
+            )
+        if min_through_hole and via.hole < min_through_hole:
+            yield Violation(
+                f"Via at ({via.x},{via.y}) hole {via.hole}mm below minimum {min_through_hole}mm",
+                "through_hole",
+                (via.x, via.y),
+                (at,),
+                via.hole,
+                min_through_hole,
+            )
+        if min_annular_ring is not None:
+            annular = (via.diameter - via.hole) / 2.0
+            if annular < min_annular_ring:
+                yield Violation(
+                    f"Via at ({via.x},{via.y}) annular ring {annular:.3f}mm below minimum {min_annular_ring}mm",
+                    "annular_ring",
+                    (via.x, via.y),
+                    (at,),
+                    annular,
+                    min_annular_ring,
+                )
+
+
+def _text_violations(board, min_text_height, min_text_thickness, stats=None) -> Iterator[Violation]:
+    calls = getattr(board, "_svg_text_calls", None) or []
+    if stats is not None:
+        stats.objects += len(calls)
+    for text, at, size, layer in calls:
+        label = f"text '{text}'"
+        if min_text_height and size < min_text_height:
+            yield Violation(
+                f"Silkscreen text '{text}' height {size}mm below minimum {min_text_height}mm",
+                "text_height",
+                tuple(at),
+                (label,),
+                size,
+                min_text_height,
+            )
+        if min_text_thickness:
+            thickness = size * 0.2
+            if thickness < min_text_thickness:
+                yield Violation(
+                    f"Silkscreen text '{text}' thickness {thickness:.3f}mm below minimum {min_text_thickness}mm",
+                    "text_thickness",
+                    tuple(at),
+                    (label,),
+                    thickness,
+                    min_text_thickness,
+                )
 
 
 def check_board(
     board,
-    min_trace_width: float = 0.15,
-    min_clearance: float = 0.15,
+    min_trace_width: float | None = None,
+    min_clearance: float | None = None,
     min_annular_ring: float | None = None,
     min_via_diameter: float | None = None,
     min_through_hole: float | None = None,
     hole_to_hole_clearance: float | None = None,
     min_text_height: float | None = None,
     min_text_thickness: float | None = None,
-) -> List[str]:
-    """Return a list of DRC warnings for a board.
+    copper_clearance: float | None = None,
+    cache: DRCCache | None = None,
+    rules: RuleSet | None = None,
+    max_violations: int | None = None,
+    workers: int | None = None,
+    profile: DRCProfile | None = None,
+) -> List[Violation]:
+    """Return a list of DRC violations for a board.
+
+    Thresholds come from ``rules`` when given.  Any threshold passed as a
+    keyword argument overrides the matching field of ``rules``.  Use
+    :func:`iter_violations` to stream violations instead of collecting them.
 
     Parameters
     ----------
@@ -40,98 +849,149 @@ def check_board(
     min_through_hole : float, optional
         Minimum allowed drill size for vias.
     hole_to_hole_clearance : float, optional
-        Minimum allowed clearance between via holes.
+        Minimum allowed edge-to-edge clearance between drilled holes, covering
+        via-to-via, via-to-hole and hole-to-hole pairs.
     min_text_height : float, optional
         Minimum allowed height for silkscreen text.
     min_text_thickness : float, optional
         Minimum allowed thickness for silkscreen text.
+    copper_clearance : float, optional
+        Minimum allowed edge-to-edge gap between separate copper shapes
+        (traces, pads, vias and filled zones) on the same layer.
+    cache : DRCCache, optional
+        Results of a previous check of the same board.  Only rules touching
+        objects changed since that check are re-evaluated; the returned
+        warnings are identical to a full check.  The cache is updated in
+        place.
+    rules : RuleSet, optional
+        Compiled thresholds, for example from
+        :func:`~boardforge.rules.service_rules` or
+        :func:`~boardforge.rules.load_rules`.
+    max_violations : int, optional
+        Stop checking once this many violations have been found.
+    workers : int, optional
+        Number of worker processes for the pairwise clearance rules.  Large
+        boards are cut into overlapping tiles that are checked in parallel;
+        the result is identical to a serial check.
+    profile : DRCProfile, optional
+        Filled with the objects examined, candidate pairs tested,
+        violations and wall time of each rule family.
     """
+    overrides = {
+        name: value
+        for name, value in (
+            ("min_trace_width", min_trace_width),
+            ("min_clearance", min_clearance),
+            ("min_annular_ring", min_annular_ring),
+            ("min_via_diameter", min_via_diameter),
+            ("min_through_hole", min_through_hole),
+            ("hole_to_hole_clearance", hole_to_hole_clearance),
+            ("min_text_height", min_text_height),
+            ("min_text_thickness", min_text_thickness),
+            ("copper_clearance", copper_clearance),
+        )
+        if value is not None
+    }
+    violations = iter_violations(board, rules, cache, workers, profile, **overrides)
+    return list(itertools.islice(violations, max_violations))
 
-    warnings = []
-
-    # Trace width checks
-    for layer_name, items in board.layers.items():
-        for item in items:
-            if not isinstance(item, tuple):
-                continue
-            if item[0] == "TRACE":
-                width = item[3] if len(item) >= 4 else 1.0
-                if width < min_trace_width:
-                    warnings.append(
-                        f"Trace on {layer_name} width {width}mm below minimum {min_trace_width}mm"
-                    )
-            elif item[0] == "TRACE_PATH":
-                width = item[2] if len(item) >= 3 else 1.0
-                if width < min_trace_width:
-                    warnings.append(
-                        f"Trace path on {layer_name} width {width}mm below minimum {min_trace_width}mm"
-                    )
 
-    # Pad clearance checks
-    pads = []
-    for comp in board.components:
-        for pad in comp.pads:
-            pad.component = comp
-            pads.append(pad)
+def iter_violations(
+    board,
+    rules: RuleSet | None = None,
+    cache: DRCCache | None = None,
+    workers: int | None = None,
+    profile: DRCProfile | None = None,
+    **thresholds,
+) -> Iterator[Violation]:
+    """Yield the DRC violations of ``board`` one at a time.
 
-    for i in range(len(pads)):
-        for j in range(i + 1, len(pads)):
-            p1 = pads[i]
-            p2 = pads[j]
-            if getattr(p1, "component", None) is getattr(p2, "component", None):
-                continue
-            dx = p1.x - p2.x
-            dy = p1.y - p2.y
-            center_dist = math.hypot(dx, dy)
-            clearance = center_dist - (max(p1.w, p1.h) / 2) - (max(p2.w, p2.h) / 2)
-            if clearance < min_clearance:
-                warnings.append(
-                    f"Pad clearance between {p1.name} and {p2.name} is {clearance:.3f}mm; minimum {min_clearance}mm"
-                )
+    Rules run in a fixed order and each rule's violations are produced
+    lazily, so a caller that stops early skips the remaining rules.
+    ``thresholds`` override fields of ``rules`` by name, ``workers``
+    enables tiled parallel checking and ``profile`` collects per-rule
+    statistics, as in :func:`check_board`.  If
+    iteration stops before the end, ``cache`` is invalidated and the next
+    check is a full one.
+    """
+    if "min_clearance" in thresholds and "copper_clearance" not in thresholds:
+        # Copper clearance follows the pad clearance, as in RuleSet.from_mapping.
+        thresholds["copper_clearance"] = thresholds["min_clearance"] or None
+    if rules is None:
+        rules = RuleSet(**thresholds)
+    elif thresholds:
+        rules = rules.replace(**thresholds)
+    if cache is not None:
+        # Copper shapes of curved traces depend on the flattening tolerance.
+        cache.begin(board, (rules, getattr(board, "curve_tolerance", DEFAULT_TOLERANCE)))
 
-    # Via checks
-    for via in board.vias:
-        if min_via_diameter and via.diameter < min_via_diameter:
-            warnings.append(
-                f"Via at ({via.x},{via.y}) diameter {via.diameter}mm below minimum {min_via_diameter}mm"
+    tiles = TileRunner(workers) if workers and workers > 1 else None
+    stats = profile.stats if profile is not None else lambda rule: None
+    finished = False
+    try:
+        yield from _profiled(
+            profile,
+            "trace_width",
+            lambda: _cached_rows(
+                cache,
+                "trace_width",
+                "trace",
+                lambda: _trace_width_violations(board, rules.min_trace_width, stats("trace_width")),
+            ),
+        )
+        yield from _profiled(
+            profile,
+            "pad_clearance",
+            lambda: _pad_clearance_violations(board, rules.min_clearance, cache, tiles, stats("pad_clearance")),
+        )
+        if rules.copper_clearance:
+            yield from _profiled(
+                profile,
+                "copper_clearance",
+                lambda: _copper_clearance_violations(
+                    board, rules.copper_clearance, cache, tiles, stats("copper_clearance")
+                ),
             )
-        if min_through_hole and via.hole < min_through_hole:
-            warnings.append(
-                f"Via at ({via.x},{via.y}) hole {via.hole}mm below minimum {min_through_hole}mm"
+        yield from _profiled(
+            profile,
+            "via",
+            lambda: _cached_rows(
+                cache,
+                "via",
+                "via",
+                lambda: _via_violations(
+                    board,
+                    rules.min_annular_ring,
+                    rules.min_via_diameter,
+                    rules.min_through_hole,
+                    stats("via"),
+                ),
+            ),
+        )
+        if rules.hole_to_hole_clearance:
+            yield from _profiled(
+                profile,
+                "hole_clearance",
+                lambda: _drill_clearance_violations(
+                    board, rules.hole_to_hole_clearance, cache, tiles, stats("hole_clearance")
+                ),
             )
-        if min_annular_ring is not None:
-            annular = (via.diameter - via.hole) / 2.0
-            if annular < min_annular_ring:
-                warnings.append(
-                    f"Via at ({via.x},{via.y}) annular ring {annular:.3f}mm below minimum {min_annular_ring}mm"
-                )
-
-    if hole_to_hole_clearance:
-        for i in range(len(board.vias)):
-            for j in range(i + 1, len(board.vias)):
-                v1 = board.vias[i]
-                v2 = board.vias[j]
-                dx = v1.x - v2.x
-                dy = v1.y - v2.y
-                center_dist = math.hypot(dx, dy)
-                clearance = center_dist - (v1.hole / 2) - (v2.hole / 2)
-                if clearance < hole_to_hole_clearance:
-                    warnings.append(
-                        f"Via clearance between ({v1.x},{v1.y}) and ({v2.x},{v2.y}) is {clearance:.3f}mm; minimum {hole_to_hole_clearance}mm"
-                    )
-
-    if (min_text_height or min_text_thickness) and getattr(board, "_svg_text_calls", None):
-        for text, at, size, layer in board._svg_text_calls:
-            if min_text_height and size < min_text_height:
-                warnings.append(
-                    f"Silkscreen text '{text}' height {size}mm below minimum {min_text_height}mm"
-                )
-            if min_text_thickness:
-                thickness = size * 0.2
-                if thickness < min_text_thickness:
-                    warnings.append(
-                        f"Silkscreen text '{text}' thickness {thickness:.3f}mm below minimum {min_text_thickness}mm"
-                    )
-
-    return warnings
-
+        if rules.min_text_height or rules.min_text_thickness:
+            yield from _profiled(
+                profile,
+                "text",
+                lambda: _cached_rows(
+                    cache,
+                    "text",
+                    "text",
+                    lambda: _text_violations(
+                        board, rules.min_text_height, rules.min_text_thickness, stats("text")
+                    ),
+                ),
+            )
+        finished = True
+    finally:
+        if tiles is not None:
+            tiles.close()
+        if cache is not None and not finished:
+            cache.invalidate()
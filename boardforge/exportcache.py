@@ -0,0 +1,130 @@
+"""Content-addressed cache of generated Gerber files.
+
+Re-exporting a board after editing one layer should not regenerate the
+others.  :class:`ExportCache` fingerprints each Gerber file from everything
+its writer reads: the layer's primitives and trace objects, the pad and via
+flashes, the board outline or holes, and the coordinate format.  A file
+whose fingerprint is already in the cache directory is read back and added
+to the archive through the public :mod:`zipfile` API.
+
+A hit saves rendering the layer, not compressing it.  The cache holds plain
+Gerber text, and the archive compresses it with its own settings on every
+export.  Copying stored deflate data straight into an archive needs
+:class:`zipfile.ZipFile` internals, so it is not done.  In return, one cache
+serves every compression setting and any output stream.
+
+Cache files are named after their fingerprint and written atomically, so
+several processes may share one directory.
+"""
+
+import dataclasses
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+from .GerberExporter import _atomic_file
+from .primitives import OBJECT, RAW, LayerStore
+
+# Bump when the Gerber output or the cache file layout changes so stale
+# entries are not reused.
+CACHE_VERSION = 5
+
+
+@dataclasses.dataclass
+class CacheStats:
+    """Hit and miss counts of an :class:`ExportCache`."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def lookups(self):
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups served from the cache, or 0.0 before any lookup."""
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def __str__(self):
+        return f"{self.hits} hits, {self.misses} misses ({self.hit_rate:.0%} hit rate)"
+
+
+def _update(h, value):
+    """Feed a stable, value-based encoding of ``value`` into the hash ``h``."""
+    if isinstance(value, LayerStore):
+        h.update(b"S")
+        ops = value.column("op")
+        for name in ("op", "x", "y", "i", "j", "width"):
+            h.update(np.ascontiguousarray(value.column(name)).tobytes())
+        # OBJECT and RAW rows only hold a slot number; hash what they point at.
+        _update(h, [value[row] for row in np.flatnonzero((ops == OBJECT) | (ops == RAW)).tolist()])
+    elif isinstance(value, (tuple, list)):
+        h.update(b"(" if isinstance(value, tuple) else b"[")
+        for item in value:
+            _update(h, item)
+        h.update(b")")
+    elif isinstance(value, (str, int, float, bool, type(None))):
+        h.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, type):
+        h.update(f"class:{value.__module__}.{value.__qualname__};".encode())
+    elif hasattr(value, "wkb"):
+        h.update(b"G" + value.wkb)
+    elif hasattr(value, "x") and hasattr(value, "y"):
+        _update(h, ("point", value.x, value.y))
+    else:
+        h.update(f"{type(value).__name__}:{value!r};".encode())
+
+
+class ExportCache:
+    """Directory of generated, uncompressed Gerber files keyed by content fingerprint.
+
+    Parameters
+    ----------
+    directory : str or Path
+        Cache directory; created on first use.
+
+    Attributes
+    ----------
+    stats : CacheStats
+        Hits and misses counted over every export that used this cache.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.stats = CacheStats()
+
+    def key(self, name, writer, args):
+        """Return the fingerprint of the file ``writer(f, *args)`` writes as ``name``."""
+        h = hashlib.sha256()
+        _update(h, (CACHE_VERSION, name, writer.__qualname__))
+        _update(h, list(args))
+        return h.hexdigest()
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.gbr"
+
+    def get(self, key):
+        """Return the file content stored under ``key`` as bytes, or ``None``."""
+        try:
+            content = self._path(key).read_bytes()
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return content
+
+    def put(self, key, content):
+        """Store the file ``content`` under ``key``."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with _atomic_file(path) as handle:
+            handle.write(content)
+
+    def clear(self):
+        """Remove every cached file and reset :attr:`stats`."""
+        for path in self.directory.glob("*/*.gbr"):
+            path.unlink(missing_ok=True)
+        self.stats = CacheStats()
+
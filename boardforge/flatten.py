@@ -0,0 +1,252 @@
+"""Adaptive flattening of curves into polylines.
+
+Every output that cannot draw a curve natively approximates it with line
+segments.  The functions here choose the number of segments per curve
+from a maximum chordal error ``tolerance`` in millimetres, so a small
+curve costs a few points and a large one stays smooth:
+
+* circular arcs of radius ``r`` are split into equal steps whose sagitta
+  ``r * (1 - cos(step / 2))`` stays within the tolerance;
+* Bezier curves are split uniformly into ``n`` steps, with ``n`` from the
+  bound on the distance between a polynomial curve and its chords
+  (Wang's formula), computed for whole arrays of curves at once;
+* straight lines are exact and keep their two end points.
+
+:func:`flat_trace` caches the flattened geometry of ``TRACE_PATH``
+segments, keyed by their content and the tolerance, so the Gerber writer,
+the previews and the design rule checks flatten each curve once.  A trace
+whose segments change gets a new key and is flattened again.
+"""
+
+import functools
+import math
+
+import numpy as np
+import shapely
+from svg.path.path import Arc, CubicBezier, Move, QuadraticBezier
+
+# Default maximum distance in mm between a curve and its flattened polyline.
+DEFAULT_TOLERANCE = 0.01
+
+# Upper bound on the segments of one flattened curve.
+MAX_STEPS = 1024
+
+# Flattened traces kept by flat_trace.
+TRACE_CACHE_SIZE = 8192
+
+
+def arc_steps(radius, sweep, tolerance=DEFAULT_TOLERANCE):
+    """Return the number of chords needed for an arc of ``sweep`` degrees."""
+    radius = abs(radius)
+    if radius <= tolerance:
+        return 1
+    step = 2.0 * math.acos(1.0 - tolerance / radius)
+    return min(MAX_STEPS, max(1, math.ceil(math.radians(abs(sweep)) / step)))
+
+
+def flatten_arc(cx, cy, radius, start_angle, end_angle, tolerance=DEFAULT_TOLERANCE):
+    """Return the ``(n, 2)`` points of an arc between two angles in degrees."""
+    steps = arc_steps(radius, end_angle - start_angle, tolerance)
+    angles = np.radians(np.linspace(start_angle, end_angle, steps + 1))
+    return np.column_stack([cx + radius * np.cos(angles), cy + radius * np.sin(angles)])
+
+
+def flatten_ellipse(cx, cy, rx, ry, tolerance=DEFAULT_TOLERANCE):
+    """Return the points of a closed axis-aligned ellipse.
+
+    The step count is chosen for the largest radius of curvature,
+    ``max(rx, ry) ** 2 / min(rx, ry)``, which bounds the error everywhere.
+    """
+    small, large = sorted((abs(rx), abs(ry)))
+    radius = large * large / small if small > 0 else large
+    steps = max(4, arc_steps(radius, 360.0, tolerance))
+    angles = np.linspace(0.0, 2 * math.pi, steps + 1)
+    return np.column_stack([cx + rx * np.cos(angles), cy + ry * np.sin(angles)])
+
+
+def cubic_steps(curves, tolerance=DEFAULT_TOLERANCE):
+    """Return the uniform step count of each cubic in a ``(n, 4, 2)`` array."""
+    curves = np.asarray(curves, dtype=float).reshape(-1, 4, 2)
+    second = np.maximum(
+        np.hypot(*(curves[:, 0] - 2 * curves[:, 1] + curves[:, 2]).T),
+        np.hypot(*(curves[:, 1] - 2 * curves[:, 2] + curves[:, 3]).T),
+    )
+    steps = np.ceil(np.sqrt(0.75 * second / tolerance))
+    return np.clip(steps, 1, MAX_STEPS).astype(np.intp)
+
+
+def flatten_cubics(curves, tolerance=DEFAULT_TOLERANCE):
+    """Flatten a batch of cubic Bezier curves.
+
+    Parameters
+    ----------
+    curves : array_like
+        ``(n, 4, 2)`` start, control and end points.
+    tolerance : float
+        Maximum chordal error.
+
+    Returns
+    -------
+    points : ndarray
+        ``(m, 2)`` points of all curves, each curve from its start to its
+        end point inclusive.
+    offsets : ndarray
+        ``n + 1`` indices; curve ``k`` is ``points[offsets[k]:offsets[k + 1]]``.
+    """
+    curves = np.asarray(curves, dtype=float).reshape(-1, 4, 2)
+    steps = cubic_steps(curves, tolerance)
+    counts = steps + 1
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    owner = np.repeat(np.arange(len(curves)), counts)
+    t = (np.arange(offsets[-1]) - offsets[owner]) / steps[owner]
+    t = t[:, None]
+    u = 1.0 - t
+    p0, p1, p2, p3 = (curves[owner, k] for k in range(4))
+    points = u**3 * p0 + 3 * u**2 * t * p1 + 3 * u * t**2 * p2 + t**3 * p3
+    return points, offsets
+
+
+def quadratic_to_cubic(curves):
+    """Return ``(n, 3, 2)`` quadratic Bezier curves as equivalent ``(n, 4, 2)`` cubics."""
+    curves = np.asarray(curves, dtype=float).reshape(-1, 3, 2)
+    p0, p1, p2 = curves[:, 0], curves[:, 1], curves[:, 2]
+    return np.stack([p0, p0 + 2.0 / 3.0 * (p1 - p0), p2 + 2.0 / 3.0 * (p1 - p2), p2], axis=1)
+
+
+class FlatTrace:
+    """Flattened geometry of one ``TRACE_PATH``, shared by every output.
+
+    Instances are cached by :func:`flat_trace` and must not be modified;
+    their arrays are read-only.
+
+    Attributes
+    ----------
+    parts : tuple of ndarray
+        ``(n, 2)`` points of each segment from its start to its end.  Arcs
+        that cannot be constructed are a straight chord.
+    points : ndarray
+        The whole path as one polyline, without repeated joints.
+    """
+
+    def __init__(self, parts):
+        for part in parts:
+            part.flags.writeable = False
+        self.parts = tuple(parts)
+        joined = []
+        for part in self.parts:
+            if joined and np.array_equal(joined[-1][-1], part[0]):
+                part = part[1:]
+            joined.append(part)
+        self.points = np.concatenate(joined) if joined else np.empty((0, 2))
+        self.points.flags.writeable = False
+
+    @functools.cached_property
+    def line(self):
+        """The path as a shapely ``LineString``; a single point is doubled."""
+        points = self.points if len(self.points) != 1 else np.repeat(self.points, 2, axis=0)
+        return shapely.linestrings(points)
+
+
+def _freeze(value):
+    """Return ``value`` with lists and arrays turned into tuples, for hashing."""
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def flat_trace(board, segments, tolerance=DEFAULT_TOLERANCE):
+    """Return the cached :class:`FlatTrace` of ``TRACE_PATH`` ``segments``.
+
+    ``board`` is a ``Board`` or its class and provides ``_arc_params``.
+    Entries are keyed by the segment values, the tolerance and the board
+    class, so editing a trace never returns stale geometry.
+    """
+    owner = board if isinstance(board, type) else type(board)
+    key = tuple(segments)
+    try:
+        hash(key)
+    except TypeError:
+        key = _freeze(segments)
+    return _flat_trace(owner, key, float(tolerance))
+
+
+@functools.lru_cache(maxsize=TRACE_CACHE_SIZE)
+def _flat_trace(owner, segments, tolerance):
+    curves = [seg[1:5] for seg in segments if seg[0] == "BEZIER"]
+    if curves:
+        bezier_points, offsets = flatten_cubics(curves, tolerance)
+    parts = []
+    curve = 0
+    for seg in segments:
+        if seg[0] == "ARC":
+            start, end, radius, sweep = seg[1], seg[2], seg[3], seg[4]
+            params = owner._arc_params(start, end, radius, sweep)
+            if params is None:
+                part = np.array([start, end], dtype=float)
+            else:
+                part = flatten_arc(*params[:2], radius, *params[2:], tolerance)
+        elif seg[0] == "BEZIER":
+            part = bezier_points[offsets[curve] : offsets[curve + 1]].copy()
+            curve += 1
+        else:
+            part = np.array([seg[1], seg[2]], dtype=float)
+        parts.append(part)
+    return FlatTrace(parts)
+
+
+def flatten_segments(board, segments, tolerance=DEFAULT_TOLERANCE):
+    """Return the points of a ``TRACE_PATH`` as one read-only ``(n, 2)`` polyline.
+
+    Arcs that cannot be constructed fall back to a straight line between
+    their end points.  See :func:`flat_trace`.
+    """
+    return flat_trace(board, segments, tolerance).points
+
+
+def flatten_svg_path(path, tolerance=DEFAULT_TOLERANCE):
+    """Flatten a parsed ``svg.path`` path.
+
+    Returns the complex points and a parallel list of booleans that are
+    ``True`` where a new subpath starts.  Lines contribute their end point;
+    Bezier segments are flattened in one batch and elliptical arcs by
+    their largest radius of curvature.
+    """
+    def xy(point):
+        return (point.real, point.imag)
+
+    curves = []
+    for segment in path:
+        if isinstance(segment, CubicBezier):
+            curves.append([xy(segment.start), xy(segment.control1), xy(segment.control2), xy(segment.end)])
+        elif isinstance(segment, QuadraticBezier):
+            curves.append(quadratic_to_cubic([xy(segment.start), xy(segment.control), xy(segment.end)])[0])
+    if curves:
+        bezier_points, offsets = flatten_cubics(curves, tolerance)
+        bezier_points = bezier_points[:, 0] + 1j * bezier_points[:, 1]
+
+    points = []
+    starts = []
+    curve = 0
+    for segment in path:
+        if isinstance(segment, Move):
+            points.append(segment.end)
+            starts.append(True)
+            continue
+        if isinstance(segment, (CubicBezier, QuadraticBezier)):
+            part = bezier_points[offsets[curve] + 1 : offsets[curve + 1]].tolist()
+            curve += 1
+        elif isinstance(segment, Arc):
+            radii = segment.radius * segment.radius_scale
+            small, large = sorted((abs(radii.real), abs(radii.imag)))
+            radius = large * large / small if small > 0 else large
+            steps = arc_steps(radius, segment.delta, tolerance)
+            part = [segment.point(k / steps) for k in range(1, steps + 1)]
+        else:
+            part = [segment.end]
+        if not points:
+            # A path that does not open with a move starts at the segment.
+            points.append(segment.start)
+            starts.append(True)
+        points.extend(part)
+        starts.extend([False] * len(part))
+    return points, starts
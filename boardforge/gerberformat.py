@@ -0,0 +1,176 @@
+"""Gerber coordinate format and vectorised command formatting.
+
+A :class:`CoordinateFormat` describes the ``%FS`` coordinate format and
+``%MO`` unit of a Gerber file.  :meth:`CoordinateFormat.commands` turns
+whole coordinate arrays into command text at once: values are scaled and
+rounded to integers with NumPy, split into digit columns of a byte matrix
+and joined with a single ``tobytes`` call, so no Python-level formatting
+runs per coordinate.
+
+Numbers are written with leading zeros omitted from the format point of
+view but zero padded to the full digit count, with a ``-`` sign in front
+of negative values, e.g. ``X-0001500Y0002000D01*`` in the default 4.3
+millimetre format.
+"""
+
+import dataclasses
+
+import numpy as np
+
+MM_PER_INCH = 25.4
+
+# Command codes shared with the primitive store's DRAW, MOVE and FLASH
+# opcodes; ``ARC_CODE`` rows also carry I/J offsets and draw with D01.
+DRAW_CODE = 1
+MOVE_CODE = 2
+FLASH_CODE = 3
+ARC_CODE = 4
+
+_ZERO = ord("0")
+_MINUS = ord("-")
+# Placeholder byte for empty slots, removed before the text is returned.
+_PAD = 0
+
+
+@dataclasses.dataclass(frozen=True)
+class CoordinateFormat:
+    """Coordinate format of a Gerber file.
+
+    Parameters
+    ----------
+    integer_digits : int
+        Digits before the implied decimal point.
+    decimal_digits : int
+        Digits after the implied decimal point.
+    unit : str
+        ``"mm"`` or ``"in"``.  Board coordinates are always millimetres and
+        are converted on output.
+    """
+
+    integer_digits: int = 4
+    decimal_digits: int = 3
+    unit: str = "mm"
+
+    def __post_init__(self):
+        if self.unit not in ("mm", "in"):
+            raise ValueError("unit must be 'mm' or 'in'")
+        if not 1 <= self.integer_digits <= 6 or not 1 <= self.decimal_digits <= 6:
+            raise ValueError("integer and decimal digits must be between 1 and 6")
+
+    @property
+    def digits(self):
+        return self.integer_digits + self.decimal_digits
+
+    @property
+    def unit_scale(self):
+        """Output units per millimetre."""
+        return 1.0 / MM_PER_INCH if self.unit == "in" else 1.0
+
+    def header(self):
+        """Return the ``%FS`` and ``%MO`` lines that declare this format."""
+        spec = f"{self.integer_digits}{self.decimal_digits}"
+        return [f"%FSLAX{spec}Y{spec}*%", f"%MO{self.unit.upper()}*%"]
+
+    def to_int(self, values):
+        """Return millimetre ``values`` as rounded integers in this format.
+
+        Raises
+        ------
+        ValueError
+            If a value needs more integer digits than the format has.
+        """
+        scaled = np.rint(np.asarray(values, dtype=float) * (self.unit_scale * 10**self.decimal_digits))
+        limit = 10**self.digits
+        if scaled.size and np.abs(scaled).max() >= limit:
+            raise ValueError(
+                f"coordinate {np.abs(scaled).max() / 10**self.decimal_digits:g} {self.unit} "
+                f"does not fit the {self.integer_digits}.{self.decimal_digits} format"
+            )
+        return scaled.astype(np.int64)
+
+    def number(self, value):
+        """Return one millimetre ``value`` as a Gerber coordinate number."""
+        value = int(self.to_int(value))
+        sign = "-" if value < 0 else ""
+        return f"{sign}{abs(value):0{self.digits}d}"
+
+    def command(self, x, y, code=DRAW_CODE):
+        """Return a single ``X..Y..D0n*`` command for a point in millimetres."""
+        return f"X{self.number(x)}Y{self.number(y)}D0{code}*"
+
+    def commands(self, x, y, codes, i=None, j=None):
+        """Return the command text for whole coordinate arrays.
+
+        Parameters
+        ----------
+        x, y : array_like
+            Coordinates in millimetres.
+        codes : array_like or int
+            ``DRAW_CODE``, ``MOVE_CODE``, ``FLASH_CODE`` or ``ARC_CODE`` per
+            row, or one code for every row.
+        i, j : array_like, optional
+            Arc centre offsets in millimetres, written for ``ARC_CODE`` rows.
+
+        Returns
+        -------
+        str
+            One newline-terminated command per row.
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        if not len(x):
+            return ""
+        codes = np.broadcast_to(np.asarray(codes, dtype=np.uint8), x.shape)
+        if (codes == ARC_CODE).any():
+            i, j = self.to_int(np.ravel(i)), self.to_int(np.ravel(j))
+        return self.int_commands(self.to_int(x), self.to_int(np.ravel(y)), codes, i, j)
+
+    def int_commands(self, x, y, codes, i=None, j=None):
+        """Return :meth:`commands` text for coordinates already in format units.
+
+        ``x``, ``y``, ``i`` and ``j`` are integers as returned by
+        :meth:`to_int`.
+        """
+        x = np.asarray(x, dtype=np.int64).ravel()
+        rows = len(x)
+        if not rows:
+            return ""
+        codes = np.broadcast_to(np.asarray(codes, dtype=np.uint8), (rows,))
+        arcs = codes == ARC_CODE
+        fields = [(b"X", x), (b"Y", y)]
+        if arcs.any():
+            fields += [(b"I", i), (b"J", j)]
+
+        field_width = 2 + self.digits
+        width = len(fields) * field_width + 5
+        out = np.full((rows, width), _PAD, dtype=np.uint8)
+        powers = 10 ** np.arange(self.digits - 1, -1, -1, dtype=np.int64)
+        for index, (letter, values) in enumerate(fields):
+            start = index * field_width
+            ints = np.asarray(values, dtype=np.int64).ravel()
+            out[:, start] = ord(letter)
+            out[:, start + 1] = np.where(ints < 0, _MINUS, _PAD)
+            out[:, start + 2 : start + field_width] = np.abs(ints)[:, None] // powers % 10 + _ZERO
+        if len(fields) > 2:
+            out[~arcs, 2 * field_width : 4 * field_width] = _PAD
+
+        out[:, -5] = ord("D")
+        out[:, -4] = _ZERO
+        out[:, -3] = np.where(arcs, DRAW_CODE, codes) + _ZERO
+        out[:, -2] = ord("*")
+        out[:, -1] = ord("\n")
+        flat = out.ravel()
+        return flat[flat != _PAD].tobytes().decode("ascii")
+
+    def command_lines(self, x, y, codes, i=None, j=None):
+        """Return :meth:`commands` as a list of strings without newlines."""
+        return self.commands(x, y, codes, i, j).splitlines()
+
+    def path_lines(self, points):
+        """Return a move to the first of ``points`` followed by draws to the rest."""
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        codes = np.full(len(points), DRAW_CODE, dtype=np.uint8)
+        codes[:1] = MOVE_CODE
+        return self.command_lines(points[:, 0], points[:, 1], codes)
+
+
+DEFAULT_FORMAT = CoordinateFormat()
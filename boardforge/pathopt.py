@@ -0,0 +1,240 @@
+"""Stroke path optimisation for Gerber output.
+
+Traces are written as runs of strokes that share one aperture.  Before a
+run is written its segments are turned into as few commands as possible:
+
+* segments that start where the previous one ended are chained into one
+  polyline, so only the first point needs a ``D02`` move;
+* repeated points and zero-length strokes are dropped;
+* interior points of straight runs are removed;
+* the resulting disconnected paths are reordered, and reversed where that
+  helps, with a greedy nearest-neighbour walk that shortens the travel
+  between them.
+
+All work happens on integer coordinates in the units of the output
+:class:`~boardforge.gerberformat.CoordinateFormat`, so "same point" and
+"collinear" are exact at the resolution that is written.
+"""
+
+import numpy as np
+
+from .flatten import DEFAULT_TOLERANCE, flat_trace
+from .gerberformat import ARC_CODE, DRAW_CODE, MOVE_CODE
+
+# Runs with more paths than this are ordered in chunks of this size, which
+# bounds the quadratic cost of the nearest-neighbour walk.
+ORDER_LIMIT = 4096
+
+
+class Arc:
+    """Circular stroke from ``start`` to ``end`` around ``start + offset``."""
+
+    __slots__ = ("start", "end", "offset", "clockwise")
+
+    def __init__(self, start, end, offset, clockwise):
+        self.start = start
+        self.end = end
+        self.offset = offset
+        self.clockwise = clockwise
+
+    def reversed(self):
+        center = (self.start[0] + self.offset[0], self.start[1] + self.offset[1])
+        offset = (center[0] - self.end[0], center[1] - self.end[1])
+        return Arc(self.end, self.start, offset, not self.clockwise)
+
+
+class Path:
+    """Connected strokes: polylines as lists of ``(x, y)`` tuples and :class:`Arc` pieces."""
+
+    __slots__ = ("pieces",)
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+
+    @property
+    def start(self):
+        first = self.pieces[0]
+        return first.start if isinstance(first, Arc) else first[0]
+
+    @property
+    def end(self):
+        last = self.pieces[-1]
+        return last.end if isinstance(last, Arc) else last[-1]
+
+    def reversed(self):
+        return Path([piece.reversed() if isinstance(piece, Arc) else piece[::-1] for piece in reversed(self.pieces)])
+
+
+def trace_pieces(board, items, fmt, tolerance=DEFAULT_TOLERANCE):
+    """Return the strokes of ``TRACE`` and ``TRACE_PATH`` tuples in ``fmt`` units.
+
+    Polylines are returned as lists of ``(x, y)`` tuples and arcs as
+    :class:`Arc` objects, in drawing order.  ``board`` provides
+    ``_arc_params`` for arc segments; arcs whose radius cannot span their
+    chord are skipped, as before.  Bezier segments come from the shared
+    :func:`~boardforge.flatten.flat_trace` cache at ``tolerance`` mm and all
+    coordinates are rounded in one
+    :meth:`~boardforge.gerberformat.CoordinateFormat.to_int` call.
+    """
+    coords = []
+    # (clockwise, point count) per piece; ``clockwise`` is None for polylines.
+    layout = []
+    for item in items:
+        if item[0] == "TRACE":
+            pin1, pin2 = item[1], item[2]
+            coords += [(pin1.x, pin1.y), (pin2.x, pin2.y)]
+            layout.append((None, 2))
+            continue
+        flat = None
+        for index, seg in enumerate(item[1]):
+            if seg[0] == "LINE":
+                coords += [seg[1], seg[2]]
+                layout.append((None, 2))
+            elif seg[0] == "ARC":
+                s, e, r, ang = seg[1], seg[2], seg[3], seg[4]
+                params = board._arc_params(s, e, r, ang)
+                if params is not None:
+                    cx, cy = params[0], params[1]
+                    coords += [s, e, (cx - s[0], cy - s[1])]
+                    layout.append((ang < 0, 3))
+            elif seg[0] == "BEZIER":
+                if flat is None:
+                    flat = flat_trace(board, item[1], tolerance)
+                coords += flat.parts[index].tolist()
+                layout.append((None, len(flat.parts[index])))
+    if not coords:
+        return []
+    points = list(map(tuple, fmt.to_int(np.asarray(coords, dtype=float).reshape(-1, 2)).tolist()))
+    pieces = []
+    index = 0
+    for clockwise, count in layout:
+        chunk = points[index : index + count]
+        index += count
+        pieces.append(chunk if clockwise is None else Arc(chunk[0], chunk[1], chunk[2], clockwise))
+    return pieces
+
+
+def simplify_polyline(points):
+    """Drop repeated points and the interior points of straight runs.
+
+    Returns a new list of ``(x, y)`` tuples, or ``None`` for a polyline of
+    zero length.  A point where the path doubles back on itself is kept.
+    """
+    out = []
+    for point in points:
+        if out and point == out[-1]:
+            continue
+        if len(out) >= 2:
+            (ax, ay), (bx, by) = out[-2], out[-1]
+            ux, uy, vx, vy = bx - ax, by - ay, point[0] - bx, point[1] - by
+            if ux * vy == uy * vx and ux * vx + uy * vy > 0:
+                out[-1] = point
+                continue
+        out.append(point)
+    return out if len(out) >= 2 else None
+
+
+def chain_paths(pieces):
+    """Chain strokes that continue from the previous end point into :class:`Path` objects.
+
+    Polylines are simplified with :func:`simplify_polyline` once chained;
+    zero-length ones are dropped.
+    """
+    paths = []
+    for piece in pieces:
+        start = piece.start if isinstance(piece, Arc) else piece[0]
+        if not paths or paths[-1].end != start:
+            paths.append(Path([piece if isinstance(piece, Arc) else list(piece)]))
+            continue
+        last = paths[-1].pieces[-1]
+        if isinstance(piece, Arc) or isinstance(last, Arc):
+            paths[-1].pieces.append(piece if isinstance(piece, Arc) else list(piece))
+        else:
+            last.extend(piece[1:])
+    kept = []
+    for path in paths:
+        pieces = [piece if isinstance(piece, Arc) else simplify_polyline(piece) for piece in path.pieces]
+        pieces = [piece for piece in pieces if piece is not None]
+        if pieces:
+            kept.append(Path(pieces))
+    return kept
+
+
+def order_paths(paths, pen=None):
+    """Return ``paths`` reordered, and some reversed, to shorten pen travel.
+
+    Starting from ``pen`` (or the first path), the nearest unused path end
+    point is visited next; reaching a path at its end draws it reversed.
+    """
+    if len(paths) > ORDER_LIMIT:
+        ordered = []
+        for first in range(0, len(paths), ORDER_LIMIT):
+            ordered += order_paths(paths[first : first + ORDER_LIMIT], ordered[-1].end if ordered else pen)
+        return ordered
+    if len(paths) < 2:
+        return list(paths)
+    starts = np.array([path.start for path in paths], dtype=float)
+    ends = np.array([path.end for path in paths], dtype=float)
+    used = np.zeros(len(paths), dtype=bool)
+    position = starts[0] if pen is None else np.asarray(pen, dtype=float)
+    ordered = []
+    for _ in range(len(paths)):
+        to_start = np.where(used, np.inf, ((starts - position) ** 2).sum(axis=1))
+        to_end = np.where(used, np.inf, ((ends - position) ** 2).sum(axis=1))
+        forward, backward = int(np.argmin(to_start)), int(np.argmin(to_end))
+        if to_end[backward] < to_start[forward]:
+            used[backward] = True
+            ordered.append(paths[backward].reversed())
+            position = starts[backward]
+        else:
+            used[forward] = True
+            ordered.append(paths[forward])
+            position = ends[forward]
+    return ordered
+
+
+def write_paths(f, paths, fmt):
+    """Write ``paths`` to ``f`` as Gerber strokes in ``fmt``.
+
+    The stream must be in linear (``G01``) mode and is left in it.  A
+    ``D02`` move is only written where the pen is not already at the
+    start of the next stroke.
+    """
+    # (x, y, code, i, j) rows, formatted in one batch at the end, and the
+    # mode statements to insert before given rows.
+    rows = []
+    statements = []
+    pen = None
+    mode = "G01*"
+
+    def switch(wanted):
+        nonlocal mode
+        if wanted != mode:
+            statements.append((len(rows), f"{wanted}\n"))
+            mode = wanted
+
+    for path in paths:
+        for piece in path.pieces:
+            start = piece.start if isinstance(piece, Arc) else piece[0]
+            if pen != start:
+                rows.append((start[0], start[1], MOVE_CODE, 0, 0))
+            if isinstance(piece, Arc):
+                switch("G02*" if piece.clockwise else "G03*")
+                rows.append((piece.end[0], piece.end[1], ARC_CODE, piece.offset[0], piece.offset[1]))
+                pen = piece.end
+            else:
+                switch("G01*")
+                rows.extend((x, y, DRAW_CODE, 0, 0) for x, y in piece[1:])
+                pen = piece[-1]
+    switch("G01*")
+    text = fmt.int_commands(*np.array(rows, dtype=np.int64).reshape(-1, 5).T) if rows else ""
+    if not statements:
+        f.write(text)
+        return
+    lines = text.splitlines(keepends=True)
+    done = 0
+    for row, statement in statements:
+        f.write("".join(lines[done:row]))
+        f.write(statement)
+        done = row
+    f.write("".join(lines[done:]))
@@ -0,0 +1,356 @@
+"""Compact per-layer store for Gerber primitives.
+
+A :class:`LayerStore` keeps one row per layer entry in parallel NumPy
+columns: an opcode, ``x``/``y`` coordinates and ``i``/``j`` arc centre
+offsets in millimetres, and a stroke width.  Geometry is appended as
+arrays with :meth:`~LayerStore.add_paths`, :meth:`~LayerStore.add_regions`
+and :meth:`~LayerStore.add_circle` and stays numeric until the layer is
+written, so every coordinate is rounded once, in the output format.
+Command strings such as ``"X0012000Y0034000D01*"`` (in the default 4.3
+millimetre format) are still accepted and parsed into rows.  Trace tuples
+and any other objects are kept as they are and occupy an :data:`OBJECT`
+row that points at them.
+
+The store behaves like the list it replaces: entries can be appended,
+indexed, replaced and removed, and reading a primitive row returns its
+command string in the default format.
+"""
+
+import math
+import re
+from collections.abc import MutableSequence
+
+import numpy as np
+
+from .gerberformat import DEFAULT_FORMAT
+
+# Row opcodes.  OBJECT and RAW rows hold an index into the object list in
+# ``x``; STATEMENT rows hold an index into STATEMENTS.  DRAW to ARC match
+# the command codes of :mod:`boardforge.gerberformat`.
+OBJECT = 0
+DRAW = 1
+MOVE = 2
+FLASH = 3
+ARC = 4
+STATEMENT = 5
+RAW = 6
+
+# Coordinate-free commands stored as STATEMENT rows.
+STATEMENTS = ("G01*", "G02*", "G03*", "G36*", "G37*", "G75*", "%LPC*%", "%LPD*%")
+_STATEMENT_INDEX = {text: index for index, text in enumerate(STATEMENTS)}
+
+_COMMAND = re.compile(r"X(-?\d+)Y(-?\d+)(?:I(-?\d+)J(-?\d+))?D0([123])\*")
+_OPCODES = {"1": DRAW, "2": MOVE, "3": FLASH}
+# Command strings added to a store use the default millimetre format.
+_SCALE = 10**DEFAULT_FORMAT.decimal_digits
+
+_COLUMNS = (
+    ("op", np.uint8),
+    ("x", np.float64),
+    ("y", np.float64),
+    ("i", np.float64),
+    ("j", np.float64),
+    ("width", np.float64),
+)
+
+_INITIAL_CAPACITY = 16
+
+
+def object_width(item):
+    """Return the stroke width of a ``TRACE`` or ``TRACE_PATH`` tuple, or NaN."""
+    if isinstance(item, tuple) and item and item[0] in ("TRACE", "TRACE_PATH"):
+        index = 3 if item[0] == "TRACE" else 2
+        width = item[index] if len(item) > index else None
+        return 1.0 if width is None else width
+    return math.nan
+
+
+def format_row(op, x, y, i=0.0, j=0.0, fmt=DEFAULT_FORMAT):
+    """Return the Gerber command string of a DRAW, MOVE, FLASH or ARC row."""
+    if op == ARC:
+        return f"X{fmt.number(x)}Y{fmt.number(y)}I{fmt.number(i)}J{fmt.number(j)}D01*"
+    return fmt.command(x, y, op)
+
+
+def layer_objects(items):
+    """Yield the tuple entries of a layer, skipping primitive rows.
+
+    ``items`` may be a :class:`LayerStore` or a plain list.
+    """
+    if isinstance(items, LayerStore):
+        return items.objects()
+    return (item for item in items if isinstance(item, tuple))
+
+
+class LayerStore(MutableSequence):
+    """List-like store of one layer's entries backed by NumPy columns.
+
+    Parameters
+    ----------
+    items : iterable, optional
+        Initial entries: Gerber command strings, trace tuples or other
+        objects.
+    """
+
+    def __init__(self, items=()):
+        self._size = 0
+        self._columns = {name: np.zeros(_INITIAL_CAPACITY, dtype) for name, dtype in _COLUMNS}
+        self._objects = []
+        self.extend(items)
+
+    # -- storage --------------------------------------------------------
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        capacity = len(self._columns["op"])
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2)
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, column.dtype)
+            grown[: self._size] = column[: self._size]
+            self._columns[name] = grown
+
+    def _parse(self, item):
+        """Return the column values ``(op, x, y, i, j, width)`` of ``item``."""
+        if isinstance(item, str):
+            statement = _STATEMENT_INDEX.get(item)
+            if statement is not None:
+                return (STATEMENT, statement, 0, 0, 0, math.nan)
+            match = _COMMAND.fullmatch(item)
+            if match is not None:
+                x, y, i, j, code = match.groups()
+                if i is not None:
+                    return (ARC, int(x) / _SCALE, int(y) / _SCALE, int(i) / _SCALE, int(j) / _SCALE, math.nan)
+                return (_OPCODES[code], int(x) / _SCALE, int(y) / _SCALE, 0, 0, math.nan)
+            self._objects.append(item)
+            return (RAW, len(self._objects) - 1, 0, 0, 0, math.nan)
+        self._objects.append(item)
+        return (OBJECT, len(self._objects) - 1, 0, 0, 0, object_width(item))
+
+    def _store(self, start, rows):
+        for (name, _), values in zip(_COLUMNS, zip(*rows)):
+            self._columns[name][start : start + len(values)] = values
+
+    def _entry(self, index):
+        op = int(self._columns["op"][index])
+        x = float(self._columns["x"][index])
+        if op in (OBJECT, RAW):
+            return self._objects[int(x)]
+        if op == STATEMENT:
+            return STATEMENTS[int(x)]
+        y = float(self._columns["y"][index])
+        return format_row(op, x, y, float(self._columns["i"][index]), float(self._columns["j"][index]))
+
+    def _release(self, index):
+        """Drop the object referenced by row ``index``, if any."""
+        if self._columns["op"][index] in (OBJECT, RAW):
+            self._objects[int(self._columns["x"][index])] = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_columns"] = {name: column[: self._size].copy() for name, column in self._columns.items()}
+        return state
+
+    # -- sequence protocol ----------------------------------------------
+
+    def __len__(self):
+        return self._size
+
+    def _index(self, index):
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("layer index out of range")
+        return index
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._entry(i) for i in range(*index.indices(self._size))]
+        return self._entry(self._index(index))
+
+    def __setitem__(self, index, item):
+        if isinstance(index, slice):
+            raise TypeError("LayerStore does not support slice assignment")
+        index = self._index(index)
+        self._release(index)
+        self._store(index, [self._parse(item)])
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            rows = range(*index.indices(self._size))
+        else:
+            rows = [self._index(index)]
+        for row in rows:
+            self._release(row)
+        keep = np.ones(self._size, dtype=bool)
+        keep[list(rows)] = False
+        for name, column in self._columns.items():
+            kept = column[: self._size][keep]
+            column[: len(kept)] = kept
+        self._size = int(keep.sum())
+
+    def insert(self, index, item):
+        index = min(max(index + self._size if index < 0 else index, 0), self._size)
+        self._reserve(1)
+        for column in self._columns.values():
+            column[index + 1 : self._size + 1] = column[index : self._size]
+        self._size += 1
+        self._store(index, [self._parse(item)])
+
+    def append(self, item):
+        self._reserve(1)
+        self._store(self._size, [self._parse(item)])
+        self._size += 1
+
+    def extend(self, items):
+        rows = [self._parse(item) for item in items]
+        if not rows:
+            return
+        self._reserve(len(rows))
+        self._store(self._size, rows)
+        self._size += len(rows)
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield self._entry(index)
+
+    def __repr__(self):
+        return f"LayerStore({self._size} rows, {sum(o is not None for o in self._objects)} objects)"
+
+    # -- bulk access ----------------------------------------------------
+
+    def column(self, name):
+        """Return a read-only view of column ``name`` for the stored rows."""
+        view = self._columns[name][: self._size]
+        view.flags.writeable = False
+        return view
+
+    def objects(self):
+        """Yield the tuple entries in row order."""
+        ops = self._columns["op"][: self._size]
+        for slot in self._columns["x"][: self._size][ops == OBJECT].tolist():
+            item = self._objects[int(slot)]
+            if isinstance(item, tuple):
+                yield item
+
+    def _append_rows(self, ops, x, y, i=0.0, j=0.0, width=math.nan):
+        """Append rows given as whole columns; scalars apply to every row."""
+        count = len(ops)
+        if not count:
+            return
+        self._reserve(count)
+        end = self._size + count
+        for name, values in (("op", ops), ("x", x), ("y", y), ("i", i), ("j", j), ("width", width)):
+            self._columns[name][self._size : end] = values
+        self._size = end
+
+    def add_paths(self, paths, width=None):
+        """Append stroked polylines, each a sequence of ``(x, y)`` points in mm.
+
+        Every polyline is a move to its first point followed by draws to
+        the rest.  ``width`` selects the stroke aperture; ``None`` uses the
+        exporter's default line width.
+        """
+        paths = [np.asarray(points, dtype=float).reshape(-1, 2) for points in paths]
+        paths = [points for points in paths if len(points)]
+        if not paths:
+            return
+        coords = np.concatenate(paths)
+        ops = np.full(len(coords), DRAW, dtype=np.uint8)
+        ops[np.cumsum([0] + [len(points) for points in paths[:-1]])] = MOVE
+        self._append_rows(ops, coords[:, 0], coords[:, 1], width=math.nan if width is None else width)
+
+    def add_path(self, points, width=None, closed=False):
+        """Append one stroked polyline; see :meth:`add_paths`.
+
+        ``closed`` draws back to the first point at the end.
+        """
+        coords = np.asarray(points, dtype=float).reshape(-1, 2)
+        if closed and len(coords):
+            coords = np.vstack([coords, coords[:1]])
+        self.add_paths([coords], width)
+
+    def add_regions(self, contours):
+        """Append one ``G36``/``G37`` filled region per closed contour of ``(x, y)`` points in mm."""
+        contours = [np.asarray(points, dtype=float).reshape(-1, 2) for points in contours]
+        contours = [points for points in contours if len(points)]
+        if not contours:
+            return
+        # Each contour becomes G36, a move, its draws and G37.
+        sizes = np.array([len(points) + 2 for points in contours])
+        starts = np.cumsum(sizes) - sizes
+        ops = np.full(sizes.sum(), DRAW, dtype=np.uint8)
+        x = np.zeros(sizes.sum())
+        y = np.zeros(sizes.sum())
+        ops[starts] = ops[starts + sizes - 1] = STATEMENT
+        ops[starts + 1] = MOVE
+        x[starts] = _STATEMENT_INDEX["G36*"]
+        x[starts + sizes - 1] = _STATEMENT_INDEX["G37*"]
+        inside = ops != STATEMENT
+        coords = np.concatenate(contours)
+        x[inside] = coords[:, 0]
+        y[inside] = coords[:, 1]
+        self._append_rows(ops, x, y)
+
+    def add_circle(self, cx, cy, radius, width=None):
+        """Append a full circle of ``radius`` mm stroked with one native arc.
+
+        The circle starts on its +X side and is drawn counter-clockwise;
+        linear mode is restored after it.
+        """
+        start = cx + radius
+        self._append_rows(
+            np.array([MOVE, STATEMENT, ARC, STATEMENT], dtype=np.uint8),
+            [start, _STATEMENT_INDEX["G03*"], start, _STATEMENT_INDEX["G01*"]],
+            [cy, 0.0, cy, 0.0],
+            [0.0, 0.0, -radius, 0.0],
+            0.0,
+            [math.nan if width is None else width, math.nan, math.nan, math.nan],
+        )
+
+    def write(self, f, codes, write_objects, fmt=DEFAULT_FORMAT):
+        """Write every row to the text stream ``f`` as Gerber commands.
+
+        ``codes[row]`` is the aperture D code selected before the row is
+        written; a ``D`` command is emitted whenever it changes.  Runs of
+        coordinate rows sharing an aperture are formatted in bulk with
+        ``fmt``.  Runs of OBJECT rows sharing an aperture are written by
+        ``write_objects(f, items)`` with the list of their objects.
+        """
+        size = self._size
+        if not size:
+            return
+        columns = {name: column[:size] for name, column in self._columns.items()}
+        ops = columns["op"]
+        codes = np.asarray(codes)
+        coordinate = (ops >= DRAW) & (ops <= ARC)
+        # Coordinate rows and OBJECT rows form runs; other rows stand alone.
+        kind = np.where(coordinate, 1, np.where(ops == OBJECT, 2, 0))
+        breaks = np.ones(size, dtype=bool)
+        breaks[1:] = (codes[1:] != codes[:-1]) | (kind[1:] != kind[:-1]) | (kind[1:] == 0)
+        starts = np.flatnonzero(breaks).tolist()
+        current = None
+        for start, end in zip(starts, starts[1:] + [size]):
+            code = int(codes[start])
+            if code != current:
+                f.write(f"D{code}*\n")
+                current = code
+            op = ops[start]
+            if coordinate[start]:
+                f.write(
+                    fmt.commands(
+                        columns["x"][start:end],
+                        columns["y"][start:end],
+                        ops[start:end],
+                        columns["i"][start:end],
+                        columns["j"][start:end],
+                    )
+                )
+            elif op == STATEMENT:
+                f.write(STATEMENTS[int(columns["x"][start])] + "\n")
+            elif op == RAW:
+                f.write(f"{self._objects[int(columns['x'][start])]}\n")
+            else:
+                slots = columns["x"][start:end].astype(np.int64).tolist()
+                write_objects(f, [self._objects[slot] for slot in slots])
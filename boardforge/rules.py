@@ -1,3 +1,19 @@
+"""Fabrication design rules.
+
+:data:`LAYER_SERVICE_RULES` lists the published limits of each layer service
+as human readable strings.  :func:`service_rules` compiles them once into an
+immutable :class:`RuleSet` of millimetre values that can be handed straight
+to :func:`~boardforge.drc.check_board`.  Custom fab profiles are loaded from
+JSON or TOML files with :func:`load_rules`.
+"""
+
+import dataclasses
+import functools
+import json
+import re
+import tomllib
+from pathlib import Path
+
 LAYER_SERVICE_RULES = {
     "2 Layer": {
         "Minimum Clearance": "6mil (0.1524mm)",
@@ -45,3 +61,167 @@ LAYER_SERVICE_RULES = {
         "Silkscreen Min Text Thickness": "5mil (0.127mm)",
     },
 }
+
+
+@dataclasses.dataclass(frozen=True)
+class RuleSet:
+    """Compiled design rule thresholds in millimetres.
+
+    ``None`` disables the corresponding check.  Instances are immutable and
+    hashable, so a rule set can be shared between boards and used as a cache
+    key; ``name`` is descriptive only and ignored when comparing.  Use
+    :meth:`replace` to derive a modified copy.
+    """
+
+    name: str = dataclasses.field(default="custom", compare=False)
+    min_trace_width: float = 0.15
+    min_clearance: float = 0.15
+    min_annular_ring: float | None = None
+    min_via_diameter: float | None = None
+    min_through_hole: float | None = None
+    hole_to_hole_clearance: float | None = None
+    min_text_height: float | None = None
+    min_text_thickness: float | None = None
+    copper_clearance: float | None = 0.15
+
+    def replace(self, **changes):
+        """Return a copy with the given fields changed."""
+        return dataclasses.replace(self, **changes)
+
+    @classmethod
+    def from_mapping(cls, mapping, name=None, base=None):
+        """Compile a mapping of rule values into a :class:`RuleSet`.
+
+        Keys may be field names or the labels used in
+        :data:`LAYER_SERVICE_RULES`; labels without a matching check are
+        ignored.  Values are numbers in millimetres or strings such as
+        ``"0.127mm"``, ``"5mil"`` or ``"5mil (0.127mm)"``.  ``"any"``, ``"user
+        preference"`` and zero disable optional checks.  Fields missing from
+        ``mapping`` are taken from ``base``.
+        """
+        base = base if base is not None else cls()
+        fields = {field.name for field in dataclasses.fields(cls)} - {"name"}
+        changes = {}
+        for key, value in mapping.items():
+            field = key if key in fields else _SERVICE_LABELS.get(key)
+            if field is None:
+                if key in _IGNORED_LABELS:
+                    continue
+                raise ValueError(f"Unknown design rule: {key}")
+            length = parse_length(value)
+            if field in ("min_trace_width", "min_clearance"):
+                changes[field] = length
+            else:
+                changes[field] = length or None
+        # Copper clearance follows the pad clearance unless given explicitly.
+        if "min_clearance" in changes and "copper_clearance" not in changes:
+            changes["copper_clearance"] = changes["min_clearance"] or None
+        return dataclasses.replace(base, name=name or base.name, **changes)
+
+
+_SERVICE_LABELS = {
+    "Minimum track Width": "min_trace_width",
+    "Minimum Clearance": "min_clearance",
+    "Minimum Annular Ring": "min_annular_ring",
+    "Minimum Via Diameter": "min_via_diameter",
+    "Minimum Through Hole": "min_through_hole",
+    "Hole to hole clearance": "hole_to_hole_clearance",
+    "Silkscreen Min Text Height": "min_text_height",
+    "Silkscreen Min Text Thickness": "min_text_thickness",
+}
+
+# Published limits that no check currently enforces.
+_IGNORED_LABELS = {
+    "Minimum Connection Width",
+    "Copper to hole clearance",
+    "Minimum uVia diameter",
+    "minimum uVia Hole",
+    "Silkscreen Min Item Clearance",
+}
+
+_MM = re.compile(r"(-?[0-9.]+)\s*mm")
+_MIL = re.compile(r"(-?[0-9.]+)\s*mil")
+
+
+def parse_length(value):
+    """Return ``value`` in millimetres.
+
+    Numbers are taken as millimetres.  Strings may give the length in ``mm``
+    or ``mil``; a millimetre value wins when both are present.  ``"any"`` and
+    ``"user preference"`` mean no limit and return ``0.0``.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid length: {value!r}")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in {"", "any", "user preference"}:
+            return 0.0
+        match = _MM.search(text)
+        if match:
+            return float(match.group(1))
+        match = _MIL.search(text)
+        if match:
+            return float(match.group(1)) * 0.0254
+        try:
+            return float(text)
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid length: {value!r}")
+
+
+# Rules used for boards whose layer service has no published limits.
+DEFAULT_RULES = RuleSet(name="default")
+
+
+@functools.lru_cache(maxsize=None)
+def service_rules(layer_service):
+    """Return the compiled :class:`RuleSet` for ``layer_service``.
+
+    Each service is compiled once and cached.  Services missing from
+    :data:`LAYER_SERVICE_RULES` get :data:`DEFAULT_RULES`.  Call
+    ``service_rules.cache_clear()`` after editing
+    :data:`LAYER_SERVICE_RULES` at runtime.
+    """
+    rules = LAYER_SERVICE_RULES.get(layer_service)
+    if rules is None:
+        return DEFAULT_RULES
+    return RuleSet.from_mapping(rules, name=layer_service, base=DEFAULT_RULES)
+
+
+def load_rules(path):
+    """Load a custom fab profile from a JSON or TOML file.
+
+    The file holds a flat table of rule values as accepted by
+    :meth:`RuleSet.from_mapping`, plus optional ``name`` and ``extends``
+    keys.  ``extends`` names a layer service whose rules fill in any value
+    the profile leaves out.  TOML files use a ``.toml`` suffix; anything
+    else is read as JSON.
+
+    Parameters
+    ----------
+    path : str or Path
+        Profile file to read.
+
+    Returns
+    -------
+    RuleSet
+        The compiled rules.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".toml":
+        with open(path, "rb") as handle:
+            data = tomllib.load(handle)
+    else:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a table of design rules")
+    data = dict(data)
+    name = data.pop("name", path.stem)
+    extends = data.pop("extends", None)
+    if extends is not None and extends not in LAYER_SERVICE_RULES:
+        raise ValueError(f"{path}: unknown layer service {extends!r}")
+    base = service_rules(extends) if extends is not None else RuleSet()
+    return RuleSet.from_mapping(data, name=name, base=base)
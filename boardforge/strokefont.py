@@ -0,0 +1,145 @@
+"""Built-in single-stroke vector font.
+
+Reference designators and annotations do not need outline fonts.  This
+module draws text from a small Hershey-style table of centre-line strokes,
+so each character is a few stroked polylines instead of filled regions, and
+no font file or FreeType call is needed.  A character takes about seven
+Gerber commands, against 24 to 32 for the filled RobotoMono outline: a 3.5
+to 4 times reduction, not an order of magnitude, since single-stroke
+capitals still need 2 to 16 points each.
+
+Glyphs are designed on a half-unit grid four units wide with the baseline
+at 0 and capitals six units tall.  Lowercase letters are drawn as capitals
+and characters outside printable ASCII as ``?``.  The table is decoded
+once at import into the NumPy arrays :data:`POINTS`, :data:`STROKES` and
+:data:`GLYPHS`.
+"""
+
+import numpy as np
+
+# Metrics of the bundled RobotoMono font at the size render_text_ttf loads
+# it, in font pixels, so both text backends lay out a ``size`` alike.
+CAP_HEIGHT = 34.125
+ADVANCE = 29.0
+
+# Height of capitals in glyph grid units.
+GRID_CAP_HEIGHT = 6.0
+
+# Default stroke width as a fraction of the capital height.
+STROKE_RATIO = 0.12
+
+# Strokes per character, as runs of two-letter points.  A point ``"XY"``
+# is at ``((ord(X) - 65) / 2, (ord(Y) - 67) / 2)`` grid units.
+_TABLE = {
+    ' ': '',
+    '!': 'EOEG EDEC',
+    '"': 'COCL GOGL',
+    '#': 'DOCC GOFC AKIK AGIG',
+    '$': 'IMGOCOAMAKCIGIIGIEGCCCAE EPEB',
+    '%': 'ACIO AOAMCMCOAO GCGEIEICGC',
+    '&': 'ICCLCNDOFOGNGLAGAECCFCIG',
+    "'": 'EOEL',
+    '(': 'GPEMEEGB',
+    ')': 'CPEMEECB',
+    '*': 'EMEE BKHG BGHK',
+    '+': 'EMEE AIII',
+    ',': 'EDECDA',
+    '-': 'BIHI',
+    '.': 'EDEC',
+    '/': 'ACIO',
+    '0': 'CCAEAMCOGOIMIEGCCC IMAE',
+    '1': 'CMEOEC CCGC',
+    '2': 'AMCOGOIMIKACIC',
+    '3': 'AMCOGOIMIKGIIGIEGCCCAE DIGI',
+    '4': 'GCGOAGIG',
+    '5': 'IOAOAJGJIHIEGCCCAE',
+    '6': 'IMGOCOAMAECCGCIEIHGJAJ',
+    '7': 'AOIODC',
+    '8': 'CIAKAMCOGOIMIKGICIAGAECCGCIEIGGI',
+    '9': 'AECCGCIEIMGOCOAMAJCHIH',
+    ':': 'ELEK EDEC',
+    ';': 'ELEK EDECDA',
+    '<': 'INAIID',
+    '=': 'AKIK AGIG',
+    '>': 'ANIIAD',
+    '?': 'AMCOGOIMIKEHEF EDEC',
+    '@': 'GGGKDKCJCHDGGGIHIMGOCOAMAECCIC',
+    'A': 'ACEOIC CIGI',
+    'B': 'ACAOGOIMIKGIAI GIIGIEGCAC',
+    'C': 'IMGOCOAMAECCGCIE',
+    'D': 'ACAOFOILIFFCAC',
+    'E': 'IOAOACIC AIGI',
+    'F': 'IOAOAC AIGI',
+    'G': 'IMGOCOAMAECCGCIEIIEI',
+    'H': 'ACAO ICIO AIII',
+    'I': 'COGO EOEC CCGC',
+    'J': 'IOIEGCCCAE',
+    'K': 'ACAO IOAG DJIC',
+    'L': 'AOACIC',
+    'M': 'ACAOEIIOIC',
+    'N': 'ACAOICIO',
+    'O': 'CCAEAMCOGOIMIEGCCC',
+    'P': 'ACAOGOIMIKGIAI',
+    'Q': 'CCAEAMCOGOIMIEGCCC FFIC',
+    'R': 'ACAOGOIMIKGIAI EIIC',
+    'S': 'IMGOCOAMAKCIGIIGIEGCCCAE',
+    'T': 'AOIO EOEC',
+    'U': 'AOAECCGCIEIO',
+    'V': 'AOECIO',
+    'W': 'AOCCEKGCIO',
+    'X': 'ACIO AOIC',
+    'Y': 'AOEIIO EIEC',
+    'Z': 'AOIOACIC',
+    '[': 'GPDPDBGB',
+    '\\': 'AOIC',
+    ']': 'CPFPFBCB',
+    '^': 'CLEOGL',
+    '_': 'AAIA',
+    '`': 'DOFM',
+    '{': 'GPEOEJCIEHECGB',
+    '|': 'EPEB',
+    '}': 'CPEOEJGIEHECCB',
+    '~': 'AICKGGII',
+}
+
+
+def _decode(table):
+    points = []
+    strokes = [0]
+    glyphs = np.zeros(129, dtype=np.int32)
+    for code in range(128):
+        char = chr(code)
+        for stroke in table.get(char.upper() if char.upper() in table else "?", "").split():
+            points.extend((ord(stroke[k]) - 65, ord(stroke[k + 1]) - 67) for k in range(0, len(stroke), 2))
+            strokes.append(len(points))
+        glyphs[code + 1] = len(strokes) - 1
+    return np.array(points, dtype=np.int8).reshape(-1, 2), np.array(strokes, dtype=np.int32), glyphs
+
+
+# POINTS holds every stroke point in half grid units; stroke ``k`` is
+# ``POINTS[STROKES[k]:STROKES[k + 1]]`` and the strokes of ASCII code ``c``
+# are ``STROKES[GLYPHS[c]:GLYPHS[c + 1]]``.
+POINTS, STROKES, GLYPHS = _decode(_TABLE)
+
+
+def stroke_width(size):
+    """Return the default stroke width in mm for text of ``size``."""
+    return STROKE_RATIO * CAP_HEIGHT * abs(size)
+
+
+def text_strokes(text, at=(0, 0), size=1.0):
+    """Return the strokes of ``text`` as a list of ``(n, 2)`` arrays in mm.
+
+    ``at`` is the left end of the baseline and ``size`` scales the text
+    like :func:`~boardforge.svgtools.render_text_ttf` with the bundled
+    font.  As there, y grows downwards from the baseline.
+    """
+    unit = size * CAP_HEIGHT / GRID_CAP_HEIGHT / 2
+    strokes = []
+    for index, char in enumerate(text):
+        code = ord(char) if ord(char) < 128 else ord("?")
+        origin = (at[0] + index * ADVANCE * size, at[1])
+        for k in range(GLYPHS[code], GLYPHS[code + 1]):
+            points = POINTS[STROKES[k] : STROKES[k + 1]] * (unit, -unit) + origin
+            strokes.append(points)
+    return strokes
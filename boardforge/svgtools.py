@@ -1,63 +1,94 @@
+import functools
 import math
 import re
+import threading
+from typing import NamedTuple
 from svg.path import parse_path
 from svg.path.path import Line, Move, CubicBezier, QuadraticBezier, Arc
 import freetype
+import numpy as np
 
-def render_ellipse(el, scale, sx, sy):
+import shapely
+from shapely.geometry import Polygon
+from shapely.ops import unary_union
+
+from .GerberExporter import circle_commands, region_contours
+from .flatten import DEFAULT_TOLERANCE, flatten_cubics, flatten_ellipse, flatten_svg_path, quadratic_to_cubic
+from .gerberformat import DEFAULT_FORMAT
+
+class Circle(NamedTuple):
+    """Full circle, stroked with one native arc rather than a polyline."""
+
+    cx: float
+    cy: float
+    radius: float
+
+
+def stroke_commands(strokes, fmt=DEFAULT_FORMAT):
+    """Return Gerber commands drawing ``strokes`` from the ``*_strokes`` functions.
+
+    Polylines are ``(n, 2)`` point arrays in mm and become a move followed
+    by draws; :class:`Circle` strokes become native arcs.
+    """
+    cmds = []
+    for stroke in strokes:
+        if isinstance(stroke, Circle):
+            cmds.extend(circle_commands(*stroke, fmt=fmt))
+        else:
+            cmds.extend(fmt.path_lines(stroke))
+    return cmds
+
+
+def add_strokes(store, strokes, width=None):
+    """Append ``strokes`` to the :class:`~boardforge.primitives.LayerStore` ``store`` in order.
+
+    Coordinates stay numeric and are only formatted when the layer is
+    written.
+    """
+    paths = []
+    for stroke in strokes:
+        if isinstance(stroke, Circle):
+            store.add_paths(paths, width)
+            paths = []
+            store.add_circle(*stroke, width=width)
+        else:
+            paths.append(stroke)
+    store.add_paths(paths, width)
+
+
+def ellipse_strokes(el, scale, sx, sy, tolerance=DEFAULT_TOLERANCE):
     cx = float(el.attrib.get("cx", 0)) * scale + sx
     cy = float(el.attrib.get("cy", 0)) * scale + sy
     rx = float(el.attrib.get("rx", 0)) * scale
     ry = float(el.attrib.get("ry", 0)) * scale
-    cmds = []
-    for i in range(13):
-        a1 = 2 * math.pi * i / 12
-        x = cx + rx * math.cos(a1)
-        y = cy + ry * math.sin(a1)
-        cmd = f"X{int(x*1000):07d}Y{int(y*1000):07d}"
-        cmd += "D02*" if i == 0 else "D01*"
-        cmds.append(cmd)
-    return cmds
+    if math.isclose(rx, ry):
+        return [Circle(cx, cy, rx)]
+    # Gerber has no elliptical interpolation, so ellipses stay polylines.
+    return [flatten_ellipse(cx, cy, rx, ry, tolerance)]
 
-def render_rect(el, scale, sx, sy):
+def rect_strokes(el, scale, sx, sy):
     x = float(el.attrib.get("x", 0)) * scale + sx
     y = float(el.attrib.get("y", 0)) * scale + sy
     width = float(el.attrib.get("width", 0)) * scale
     height = float(el.attrib.get("height", 0)) * scale
-    cmds = [
-        f"X{int(x*1000):07d}Y{int(y*1000):07d}D02*",
-        f"X{int((x+width)*1000):07d}Y{int(y*1000):07d}D01*",
-        f"X{int((x+width)*1000):07d}Y{int((y+height)*1000):07d}D01*",
-        f"X{int(x*1000):07d}Y{int((y+height)*1000):07d}D01*",
-        f"X{int(x*1000):07d}Y{int(y*1000):07d}D01*",
-    ]
-    return cmds
+    return [np.array([(x, y), (x + width, y), (x + width, y + height), (x, y + height), (x, y)])]
 
-def render_circle(el, scale, sx, sy):
+def circle_strokes(el, scale, sx, sy, tolerance=DEFAULT_TOLERANCE):
     el.attrib["rx"] = el.attrib.get("r", "0")
     el.attrib["ry"] = el.attrib.get("r", "0")
-    return render_ellipse(el, scale, sx, sy)
+    return ellipse_strokes(el, scale, sx, sy, tolerance)
 
-def render_path(el, scale, sx, sy):
+def path_strokes(el, scale, sx, sy, tolerance=DEFAULT_TOLERANCE):
     d = el.attrib.get("d", "")
     path = parse_path(d)
-    cmds = []
+    # Curves are flattened in SVG units, so scale the tolerance to match.
+    points, starts = flatten_svg_path(path, tolerance / scale if scale else tolerance)
+    points = np.asarray(points, dtype=complex) * scale + complex(sx, sy)
+    points = np.column_stack([points.real, points.imag])
+    # Each subpath starts with a move.
+    return [part for part in np.split(points, np.flatnonzero(starts)[1:]) if len(part)]
 
-    for segment in path:
-        if isinstance(segment, Move):
-            end = segment.end
-            cmds.append(f"X{int((end.real * scale + sx) * 1000):07d}Y{int((end.imag * scale + sy) * 1000):07d}D02*")
-        else:
-            # Approximate all segments using straight lines
-            steps = 20
-            for i in range(1, steps + 1):
-                point = segment.point(i / steps)
-                x = point.real * scale + sx
-                y = point.imag * scale + sy
-                cmds.append(f"X{int(x * 1000):07d}Y{int(y * 1000):07d}D01*")
-    return cmds
-
-def render_polyline(el, scale, sx, sy):
+def polyline_strokes(el, scale, sx, sy):
     points_str = el.attrib.get("points", "")
     points = []
     for pt in points_str.strip().split():
@@ -68,82 +99,261 @@ def render_polyline(el, scale, sx, sy):
             points.append((x, y))
         except ValueError:
             continue
-    cmds = []
-    for i, (x, y) in enumerate(points):
-        dcode = "D02*" if i == 0 else "D01*"
-        cmds.append(f"X{int(x * 1000):07d}Y{int(y * 1000):07d}{dcode}")
-    return cmds
+    return [np.array(points)] if points else []
 
-def render_polygon(el, scale, sx, sy):
-    cmds = render_polyline(el, scale, sx, sy)
-    if cmds:
-        cmds.append(cmds[0].replace("D02*", "D01*"))  # Close path
-    return cmds
+def polygon_strokes(el, scale, sx, sy):
+    # Close the path by drawing back to the first point.
+    return [np.vstack([points, points[:1]]) for points in polyline_strokes(el, scale, sx, sy)]
 
-def render_line(el, scale, sx, sy):
+def line_strokes(el, scale, sx, sy):
     x1 = float(el.attrib.get("x1", 0)) * scale + sx
     y1 = float(el.attrib.get("y1", 0)) * scale + sy
     x2 = float(el.attrib.get("x2", 0)) * scale + sx
     y2 = float(el.attrib.get("y2", 0)) * scale + sy
-    cmds = [
-        f"X{int(x1 * 1000):07d}Y{int(y1 * 1000):07d}D02*",
-        f"X{int(x2 * 1000):07d}Y{int(y2 * 1000):07d}D01*",
-    ]
-    return cmds
+    return [np.array([(x1, y1), (x2, y2)])]
+
+def render_ellipse(el, scale, sx, sy, tolerance=DEFAULT_TOLERANCE):
+    return stroke_commands(ellipse_strokes(el, scale, sx, sy, tolerance))
+
+def render_rect(el, scale, sx, sy):
+    return stroke_commands(rect_strokes(el, scale, sx, sy))
+
+def render_circle(el, scale, sx, sy, tolerance=DEFAULT_TOLERANCE):
+    return stroke_commands(circle_strokes(el, scale, sx, sy, tolerance))
+
+def render_path(el, scale, sx, sy, tolerance=DEFAULT_TOLERANCE):
+    return stroke_commands(path_strokes(el, scale, sx, sy, tolerance))
+
+def render_polyline(el, scale, sx, sy):
+    return stroke_commands(polyline_strokes(el, scale, sx, sy))
+
+def render_polygon(el, scale, sx, sy):
+    return stroke_commands(polygon_strokes(el, scale, sx, sy))
+
+def render_line(el, scale, sx, sy):
+    return stroke_commands(line_strokes(el, scale, sx, sy))
+
+# FreeType character size at which glyph outlines are loaded, in 1/64 pt.
+CHAR_SIZE = 48 * 64
+
+# Open font faces and loaded glyphs kept for reuse.
+FACE_CACHE_SIZE = 16
+GLYPH_CACHE_SIZE = 4096
+
+# Maximum chordal error in mm of glyph outlines; finer than silkscreen
+# printing resolves.
+TEXT_TOLERANCE = 0.025
+
+# FreeType faces are not thread safe.
+_face_lock = threading.Lock()
+
+
+# FreeType outline point tags: bit 0 marks on-curve points; off-curve
+# points are cubic controls if bit 1 is set and quadratic ones otherwise.
+_TAG_ON = 1
+_TAG_CUBIC = 2
+
+
+class Glyph(NamedTuple):
+    """Outline of one character in font pixels at :data:`CHAR_SIZE`.
+
+    ``contours`` are closed ``(n, 2)`` polylines with y pointing down, as
+    on the board, and ``shape`` is their even-odd combination, so placing
+    a glyph only needs a scale and a translation.
+    """
+
+    contours: tuple
+    advance: float
+    shape: object
+
+
+def contour_cubics(points, tags):
+    """Decode one closed TrueType/CFF outline contour into cubic Bezier curves.
+
+    Parameters
+    ----------
+    points : ndarray
+        ``(n, 2)`` outline points.
+    tags : array_like
+        FreeType tags of ``points``.
+
+    Returns
+    -------
+    ndarray
+        ``(m, 4, 2)`` cubics from the first on-curve point around the
+        contour and back.  Straight edges become cubics with evenly spaced
+        controls and quadratic arcs are degree-elevated; consecutive
+        quadratic controls imply the on-curve point midway between them.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    tags = np.asarray(tags, dtype=np.uint8)
+    on = (tags & _TAG_ON).astype(bool)
+    cubic = (tags & _TAG_CUBIC).astype(bool)
+    if on.any():
+        first = int(np.argmax(on))
+        points, on, cubic = (np.roll(a, -first, axis=0) for a in (points, on, cubic))
+    else:
+        # A contour of quadratic controls only starts between the last and first.
+        points = np.vstack([(points[-1] + points[0]) / 2, points])
+        on = np.concatenate([[True], on])
+        cubic = np.concatenate([[False], cubic])
+    # Close the contour by returning to its first point.
+    points = np.vstack([points, points[:1]])
+    on = np.append(on, True)
+    count = len(points)
+
+    curves = []
+    current = points[0]
+    j = 1
+    while j < count:
+        if on[j]:
+            end = points[j]
+            curves.append((current, (2 * current + end) / 3, (current + 2 * end) / 3, end))
+            j += 1
+        elif cubic[j] and j + 2 < count:
+            end = points[j + 2]
+            curves.append((current, points[j], points[j + 1], end))
+            j += 3
+        else:
+            control = points[j]
+            if j + 1 >= count:
+                break
+            if on[j + 1]:
+                end = points[j + 1]
+                j += 2
+            else:
+                end = (control + points[j + 1]) / 2
+                j += 1
+            curves.append(tuple(quadratic_to_cubic([current, control, end])[0]))
+        current = end
+    return np.array(curves, dtype=float).reshape(-1, 4, 2)
+
+
+def flatten_contour(points, tags, tolerance):
+    """Return a decoded outline contour as a closed polyline within ``tolerance``."""
+    return _flatten_cubics_closed(contour_cubics(points, tags), tolerance)
+
+
+def _flatten_cubics_closed(curves, tolerance):
+    if not len(curves):
+        return np.empty((0, 2))
+    flat, offsets = flatten_cubics(curves, tolerance)
+    # Drop each curve's start, which repeats the previous curve's end.
+    keep = np.ones(len(flat), dtype=bool)
+    keep[offsets[1:-1]] = False
+    return flat[keep]
+
+@functools.lru_cache(maxsize=FACE_CACHE_SIZE)
+def font_face(font_path):
+    """Return the cached ``freetype.Face`` of ``font_path`` at :data:`CHAR_SIZE`."""
+    face = freetype.Face(font_path)
+    face.set_char_size(CHAR_SIZE)
+    return face
+
+
+@functools.lru_cache(maxsize=GLYPH_CACHE_SIZE)
+def _outline(font_path, char, char_size):
+    """Return the decoded cubics of each contour of ``char`` and its advance.
+
+    This is the only step that needs FreeType, so each character is read
+    once whatever sizes and tolerances it is later drawn at.
+    """
+    face = font_face(font_path)
+    with _face_lock:
+        face.load_char(char, freetype.FT_LOAD_NO_BITMAP)
+        outline = face.glyph.outline
+        points = np.array(outline.points, dtype=float).reshape(-1, 2) * (1 / 64.0, -1 / 64.0)
+        tags = np.array(outline.tags, dtype=np.uint8)
+        ends = list(outline.contours)
+        advance = face.glyph.advance.x / 64.0
+    contours = []
+    start = 0
+    for end in ends:
+        curves = contour_cubics(points[start : end + 1], tags[start : end + 1])
+        start = end + 1
+        curves.flags.writeable = False
+        contours.append(curves)
+    return tuple(contours), advance
+
 
-def render_text_ttf(text, font_path, at=(0, 0), size=1.0):
+@functools.lru_cache(maxsize=GLYPH_CACHE_SIZE)
+def _glyph(font_path, char, char_size, tolerance):
+    outline, advance = _outline(font_path, char, char_size)
+    contours = []
+    for curves in outline:
+        contour = _flatten_cubics_closed(curves, tolerance)
+        if len(contour) >= 4:
+            contour.flags.writeable = False
+            contours.append(contour)
+    # Contours combine even-odd, so inner contours cut the counters.
+    shape = Polygon()
+    for contour in contours:
+        shape = shape.symmetric_difference(Polygon(contour).buffer(0))
+    return Glyph(tuple(contours), advance, shape)
+
+
+def load_glyph(font_path, char, tolerance=DEFAULT_TOLERANCE):
+    """Return the cached :class:`Glyph` of ``char`` in the font at ``font_path``.
+
+    Curves are flattened to within ``tolerance`` font pixels.  The decoded
+    outline is cached per character, so a new tolerance only re-flattens it.
+    """
+    return _glyph(font_path, char, CHAR_SIZE, tolerance)
+
+
+def text_contours(text, font_path, at=(0, 0), size=1.0, tolerance=TEXT_TOLERANCE):
+    """Return the filled region contours of ``text`` in the TTF font at ``font_path``.
+
+    Glyph curves are flattened to within ``tolerance`` mm and letter
+    counters, such as the holes in "O" and "B", are left open.  The
+    contours are those of :func:`~boardforge.GerberExporter.region_contours`,
+    ready for :meth:`~boardforge.primitives.LayerStore.add_regions`.
+    """
+    glyphs = []
+    x_cursor = 0
+    # Glyphs are cached in font pixels, which are ``size`` mm each.
+    glyph_tolerance = tolerance / abs(size) if size else tolerance
+    for char in text:
+        glyph = load_glyph(font_path, char, glyph_tolerance)
+        if not glyph.shape.is_empty:
+            shift = (x_cursor, 0.0)
+            glyphs.append(shapely.transform(glyph.shape, lambda pts: (pts + shift) * size + at))
+        x_cursor += glyph.advance
+    return region_contours(unary_union(glyphs))
+
+
+def render_text_ttf(text, font_path, at=(0, 0), size=1.0, tolerance=TEXT_TOLERANCE):
+    """Return region commands filling ``text``; see :func:`text_contours`."""
     try:
-        face = freetype.Face(font_path)
-        face.set_char_size(48 * 64)
-        scale_x, scale_y = size, size
-        x_cursor = 0
-        y_cursor = 0
-        paths = []
-
-        for char in text:
-            face.load_char(char, freetype.FT_LOAD_NO_BITMAP)
-            outline = face.glyph.outline
-            pts = outline.points
-            tags = outline.tags
-            contours = outline.contours
-
-            start = 0
-            for end in contours:
-                contour = pts[start:end+1]
-                if len(contour) < 2:
-                    continue
-                # Convert each contour to a series of line segments
-                gerber = []
-                for i, pt in enumerate(contour):
-                    x = at[0] + (x_cursor + pt[0] / 64.0) * scale_x
-                    y = at[1] - (pt[1] / 64.0) * scale_y
-                    cmd = "D01*" if i > 0 else "D02*"
-                    gerber.append(f"X{int(x * 1000):07d}Y{int(y * 1000):07d}{cmd}")
-                paths.append(gerber)
-                start = end + 1
-
-            x_cursor += face.glyph.advance.x / 64.0
-
-        return [item for sublist in paths for item in sublist]
+        cmds = []
+        for contour in text_contours(text, font_path, at, size, tolerance):
+            cmds.append("G36*")
+            cmds.extend(DEFAULT_FORMAT.path_lines(contour))
+            cmds.append("G37*")
+        return cmds
     except Exception as e:
         print(f"TTF render error: {e}")
         return []
 
-def render_svg_element(el, scale, sx, sy):
+def svg_element_strokes(el, scale, sx, sy, tolerance=DEFAULT_TOLERANCE):
+    """Return the strokes of one SVG element; unknown elements have none."""
     tag = el.tag.lower()
     if tag.endswith("ellipse"):
-        return render_ellipse(el, scale, sx, sy)
+        return ellipse_strokes(el, scale, sx, sy, tolerance)
     elif tag.endswith("rect"):
-        return render_rect(el, scale, sx, sy)
+        return rect_strokes(el, scale, sx, sy)
     elif tag.endswith("circle"):
-        return render_circle(el, scale, sx, sy)
+        return circle_strokes(el, scale, sx, sy, tolerance)
     elif tag.endswith("path"):
-        return render_path(el, scale, sx, sy)
+        return path_strokes(el, scale, sx, sy, tolerance)
     elif tag.endswith("polyline"):
-        return render_polyline(el, scale, sx, sy)
+        return polyline_strokes(el, scale, sx, sy)
     elif tag.endswith("polygon"):
-        return render_polygon(el, scale, sx, sy)
+        return polygon_strokes(el, scale, sx, sy)
     elif tag.endswith("line"):
-        return render_line(el, scale, sx, sy)
+        return line_strokes(el, scale, sx, sy)
     else:
         return []
+
+def render_svg_element(el, scale, sx, sy, tolerance=DEFAULT_TOLERANCE):
+    return stroke_commands(svg_element_strokes(el, scale, sx, sy, tolerance))
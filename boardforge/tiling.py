@@ -0,0 +1,123 @@
+"""Overlapping tiles for running pairwise DRC searches in parallel.
+
+The board is cut into a grid of tiles.  Each tile is widened by an overlap
+equal to the largest clearance being checked, so every pair of objects
+closer than that clearance lies entirely inside at least one widened tile.
+Pair searches run independently per tile in a
+:class:`~concurrent.futures.ProcessPoolExecutor` and pairs found by more
+than one tile are merged.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Pair searches over fewer objects than this run in the calling process.
+PARALLEL_MIN_OBJECTS = 5000
+
+# Tiles per worker; more tiles even out the load of unevenly filled boards.
+TILES_PER_WORKER = 2
+
+
+def tile_grid(bounds, count):
+    """Return about ``count`` ``(minx, miny, maxx, maxy)`` tiles covering ``bounds``.
+
+    Tiles are laid out in a grid whose cells are close to square.
+    """
+    minx, miny, maxx, maxy = bounds
+    width = max(maxx - minx, 1e-9)
+    height = max(maxy - miny, 1e-9)
+    columns = max(1, round(math.sqrt(count * width / height)))
+    rows = max(1, math.ceil(count / columns))
+    xs = np.linspace(minx, maxx, columns + 1)
+    ys = np.linspace(miny, maxy, rows + 1)
+    return [
+        (xs[i], ys[j], xs[i + 1], ys[j + 1])
+        for j in range(rows)
+        for i in range(columns)
+    ]
+
+
+class TileRunner:
+    """Run pair searches over overlapping board tiles in worker processes.
+
+    The process pool is started on first use and shut down by
+    :meth:`close` or when used as a context manager.
+
+    Parameters
+    ----------
+    workers : int
+        Number of worker processes.
+    min_objects : int, optional
+        Smaller searches run in the calling process.
+    """
+
+    def __init__(self, workers, min_objects=None):
+        self.workers = workers
+        self.min_objects = PARALLEL_MIN_OBJECTS if min_objects is None else min_objects
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def wants(self, count):
+        """Return ``True`` if a search over ``count`` objects should be tiled."""
+        return self.workers > 1 and count >= self.min_objects
+
+    def pairs(self, func, extents, overlap, columns, args=()):
+        """Return ``(first, second, values, candidates)`` found by ``func`` across all tiles.
+
+        ``extents`` holds ``(lo_x, lo_y, hi_x, hi_y)`` arrays bounding each
+        object and ``columns`` the per-object arrays that ``func`` needs.  Each
+        tile calls ``func(*columns_in_tile, *args)``, which must return
+        ``(first, second, values, candidates)`` with indices into the tile's
+        objects and the number of candidate pairs it tested.  The merged
+        pairs use global indices, have ``first < second``, hold each pair
+        once and are sorted by ``(first, second)``; ``candidates`` is summed
+        over all tiles.
+        """
+        lo_x, lo_y, hi_x, hi_y = extents
+        count = len(lo_x)
+        bounds = (lo_x.min(), lo_y.min(), hi_x.max(), hi_y.max())
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers)
+
+        jobs = []
+        for x0, y0, x1, y1 in tile_grid(bounds, self.workers * TILES_PER_WORKER):
+            members = np.flatnonzero(
+                (lo_x <= x1 + overlap)
+                & (hi_x >= x0 - overlap)
+                & (lo_y <= y1 + overlap)
+                & (hi_y >= y0 - overlap)
+            )
+            if len(members) < 2:
+                continue
+            sliced = [column[members] for column in columns]
+            jobs.append((members, self._executor.submit(func, *sliced, *args)))
+
+        codes = [np.empty(0, dtype=np.int64)]
+        values = [np.empty(0)]
+        candidates = 0
+        for members, job in jobs:
+            first, second, found, tested = job.result()
+            candidates += tested
+            first, second = members[first], members[second]
+            low, high = np.minimum(first, second), np.maximum(first, second)
+            codes.append(low.astype(np.int64) * count + high)
+            values.append(np.asarray(found, dtype=float))
+        codes, keep = np.unique(np.concatenate(codes), return_index=True)
+        return (
+            (codes // count).astype(np.intp),
+            (codes % count).astype(np.intp),
+            np.concatenate(values)[keep],
+            candidates,
+        )
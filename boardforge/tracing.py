@@ -0,0 +1,261 @@
+"""Level-gated tracing for BoardForge.
+
+Board methods report ``ENTER``/``EXIT`` events through the ``boardforge``
+logger at the :data:`TRACE` level.  Messages use lazy ``%`` formatting, so a
+disabled level costs a single level check.  Full board state is only
+serialised at the :data:`DUMP` level, which is off by default.
+
+The default sink appends to ``boardforge.log`` in the current working
+directory.  :func:`configure` can change the level, buffer records in memory
+or hand all file I/O to a background thread.  The initial level may also be
+set with the ``BOARDFORGE_LOG_LEVEL`` environment variable (for example
+``DUMP``, ``TRACE``, ``WARNING`` or ``OFF``).
+"""
+
+import atexit
+import functools
+import logging
+import logging.handlers
+import os
+import pprint
+import queue
+import warnings
+
+DUMP = 5
+TRACE = 15
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+OFF = logging.CRITICAL + 10
+
+logging.addLevelName(DUMP, "DUMP")
+logging.addLevelName(TRACE, "TRACE")
+
+DEFAULT_PATH = "boardforge.log"
+DEFAULT_FORMAT = "%(asctime)s %(levelname)s %(message)s"
+
+_LEVEL_NAMES = {
+    "DUMP": DUMP,
+    "TRACE": TRACE,
+    "INFO": INFO,
+    "WARNING": WARNING,
+    "ERROR": ERROR,
+    "OFF": OFF,
+}
+
+logger = logging.getLogger("boardforge")
+logger.propagate = False
+
+_listener = None
+
+
+class FileSink(logging.Handler):
+    """Append formatted records to ``path``.
+
+    Relative paths are resolved against the working directory at write time,
+    matching the historical behaviour of ``Board.log``.  The file handle is
+    kept open between records and only reopened when the resolved path
+    changes.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, autoflush=True):
+        super().__init__()
+        self.path = path
+        self.autoflush = autoflush
+        self._resolved = None
+        self._stream = None
+        self.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+
+    def _get_stream(self):
+        resolved = os.path.abspath(self.path)
+        if resolved != self._resolved:
+            self._close_stream()
+            self._stream = open(resolved, "a", encoding="utf-8")
+            self._resolved = resolved
+        return self._stream
+
+    def _close_stream(self):
+        if self._stream is not None:
+            self._stream.close()
+        self._stream = None
+        self._resolved = None
+
+    def emit(self, record):
+        try:
+            stream = self._get_stream()
+            stream.write(self.format(record) + "\n")
+            if self.autoflush:
+                stream.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        with self.lock:
+            if self._stream is not None:
+                self._stream.flush()
+
+    def close(self):
+        with self.lock:
+            self._close_stream()
+        super().close()
+
+
+class BufferedSink(logging.handlers.MemoryHandler):
+    """Hold up to ``capacity`` records in memory before writing them out."""
+
+    def flush(self):
+        super().flush()
+        if self.target is not None:
+            self.target.flush()
+
+
+class _LazyDump:
+    """Defer ``pprint.pformat`` of ``func()`` until the record is formatted."""
+
+    __slots__ = ("func",)
+
+    def __init__(self, func):
+        self.func = func
+
+    def __str__(self):
+        return pprint.pformat(self.func())
+
+
+def _parse_level(level):
+    if isinstance(level, int):
+        return level
+    if str(level).isdigit():
+        return int(level)
+    try:
+        return _LEVEL_NAMES[str(level).upper()]
+    except KeyError:
+        raise ValueError(f"Unknown trace level: {level}")
+
+
+def configure(level=None, path=DEFAULT_PATH, buffer_size=0, background=False):
+    """Install a fresh sink on the ``boardforge`` logger.
+
+    Parameters
+    ----------
+    level : int or str, optional
+        Minimum level to record.  Leave as ``None`` to keep the current level.
+    path : str
+        Log file path.  Relative paths follow the working directory.
+    buffer_size : int
+        Number of records to hold in memory before writing.  ``0`` writes
+        every record immediately.
+    background : bool
+        Format and write records on a background thread.
+    """
+    global _listener
+    shutdown()
+    if level is not None:
+        logger.setLevel(_parse_level(level))
+
+    sink = FileSink(path, autoflush=buffer_size <= 0)
+    if buffer_size > 0:
+        sink = BufferedSink(buffer_size, flushLevel=ERROR, target=sink)
+
+    if background:
+        records = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(records, sink)
+        _listener.start()
+        logger.addHandler(logging.handlers.QueueHandler(records))
+    else:
+        logger.addHandler(sink)
+
+
+def flush():
+    """Write out any buffered records."""
+    if _listener is not None:
+        # Restarting the listener drains the queue into the sinks.
+        _listener.stop()
+        _listener.start()
+        handlers = _listener.handlers
+    else:
+        handlers = logger.handlers
+    for handler in handlers:
+        handler.flush()
+
+
+def shutdown():
+    """Flush and detach every sink from the ``boardforge`` logger."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        handlers = list(_listener.handlers)
+        _listener = None
+    else:
+        handlers = []
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handlers.append(handler)
+    for handler in handlers:
+        handler.flush()
+        handler.close()
+
+
+def set_level(level):
+    """Change the minimum recorded level without replacing the sink."""
+    logger.setLevel(_parse_level(level))
+
+
+def enabled(level):
+    """Return ``True`` if records at ``level`` would be written."""
+    return logger.isEnabledFor(level)
+
+
+def log(level, msg, *args):
+    """Record ``msg % args`` at ``level``; formatting happens only if enabled."""
+    if logger.isEnabledFor(level):
+        logger.log(level, msg, *args)
+
+
+def dump(msg, func):
+    """Record ``pprint.pformat(func())`` at :data:`DUMP` level."""
+    if logger.isEnabledFor(DUMP):
+        logger.log(DUMP, "%s\n%s", msg, _LazyDump(func))
+
+
+def traced(method=None, *, unless=None):
+    """Decorate a ``Board`` method to emit ``ENTER``/``EXIT`` trace events.
+
+    When :data:`DUMP` is enabled the call arguments and the resulting object
+    state are recorded as well.  Calls for which ``unless(*args, **kwargs)``
+    is true are not traced; use ``@traced(unless=...)`` to pass it.
+    """
+    if method is None:
+        return functools.partial(traced, unless=unless)
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not logger.isEnabledFor(TRACE) or (unless is not None and unless(*args, **kwargs)):
+            return method(self, *args, **kwargs)
+        logger.log(TRACE, "ENTER %s", name)
+        dump(f"ARGS {name}", lambda: {"args": args, "kwargs": kwargs})
+        result = method(self, *args, **kwargs)
+        logger.log(TRACE, "EXIT %s", name)
+        dump(f"STATE {name}", lambda: {"self": self.__dict__})
+        return result
+
+    return wrapper
+
+
+def _initial_level():
+    """Return the level named by ``BOARDFORGE_LOG_LEVEL``, or :data:`TRACE`.
+
+    An unknown name only warns, so a bad variable never stops the package
+    from importing.
+    """
+    value = os.environ.get("BOARDFORGE_LOG_LEVEL", TRACE)
+    try:
+        return _parse_level(value)
+    except ValueError:
+        warnings.warn(f"Ignoring BOARDFORGE_LOG_LEVEL={value!r}: unknown trace level, using TRACE")
+        return TRACE
+
+
+set_level(_initial_level())
+configure()
+atexit.register(shutdown)
@@ -123,8 +123,8 @@ def build_board():
     ])
     board.trace_path([
         ch340.pin("RXD"),
-        (40, 14),
-        (28, 14),
+        (40, 13.5),
+        (28, 13.5),
         esp32.pin("TX"),
     ])
     board.trace_path([
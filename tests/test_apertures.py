@@ -0,0 +1,114 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from boardforge import PCB, Layer, Pin
+from boardforge.apertures import ApertureTable
+from boardforge.GerberExporter import gerber_layers, render_layer
+
+
+def _layer_text(board, name):
+    for filename, writer, args in gerber_layers(board):
+        if filename == name:
+            return render_layer(writer, args)
+    raise KeyError(name)
+
+
+def test_identical_pads_share_one_flashed_aperture():
+    board = PCB(width=60, height=10)
+    board.set_layer_stack([Layer.TOP_COPPER.value, Layer.BOTTOM_COPPER.value])
+    comp = board.add_component("HDR", ref="J1", at=(5, 5))
+    for i in range(20):
+        comp.add_pad(str(i + 1), dx=2.54 * i, dy=0, w=1.2, h=1.7)
+
+    lines = _layer_text(board, "GTL.gbr").splitlines()
+    assert lines[:6] == ["G04 GTL *", "%FSLAX43Y43*%", "%MOMM*%", "G75*", "G01*", "%ADD10R,1.2X1.7*%"]
+    assert lines[6] == "D10*"
+    assert sum(l.endswith("D03*") for l in lines) == 20
+    assert lines[-1] == "M02*"
+
+
+def test_traces_keep_their_width():
+    board = PCB(width=20, height=20)
+    board.set_layer_stack([Layer.TOP_COPPER.value, Layer.BOTTOM_COPPER.value])
+    board.trace(Pin("A", (1, 1), 0, 0), Pin("B", (5, 1), 0, 0), width=0.25)
+    board.trace(Pin("C", (1, 5), 0, 0), Pin("D", (5, 5), 0, 0), width=0.5)
+
+    text = _layer_text(board, "GTL.gbr")
+    assert "%ADD10C,0.25*%" in text and "%ADD11C,0.5*%" in text
+    assert text.index("D10*\nX0001000Y0001000D02*") < text.index("D11*\nX0001000Y0005000D02*")
+
+
+def test_rotated_shapes_use_macros():
+    table = ApertureTable()
+    assert table.rect(1, 2, 90) == table.rect(2, 1)
+    table.rect(1, 2, 45)
+    table.obround(1, 3, 30)
+    defs = table.definitions()
+    assert defs[0].startswith("%AMROTRECT*") and defs[1].startswith("%AMROTOBROUND*")
+    assert "%ADD11ROTRECT,1X2X45*%" in defs
+    assert any(d.startswith("%ADD12ROTOBROUND,1X") for d in defs)
+    assert len(table) == 3
+
+
+def test_arcs_and_holes_use_circular_interpolation():
+    board = PCB(width=20, height=20)
+    board.set_layer_stack([Layer.TOP_COPPER.value, Layer.BOTTOM_COPPER.value])
+    board.trace_path([(2, 2), {"arc": (2, 90)}, (4, 4)], width=0.3)
+    board.trace_path([(10, 2), {"arc": (2, -90)}, (12, 4)], width=0.3)
+    board.hole((5, 5), 1.0)
+
+    gtl = _layer_text(board, "GTL.gbr").splitlines()
+    ccw = gtl.index("G03*")
+    assert gtl[ccw - 1] == "X0002000Y0002000D02*"
+    assert gtl[ccw + 1] == "X0004000Y0004000I0000000J0002000D01*"
+    # Consecutive arcs switch interpolation mode directly; linear mode is
+    # restored once, after the run of strokes.
+    cw = gtl.index("G02*")
+    assert gtl[cw - 1] == "X0010000Y0002000D02*"
+    assert gtl[cw + 1] == "X0012000Y0004000I0002000J0000000D01*"
+    assert gtl[cw + 2] == "G01*"
+
+    holes = _layer_text(board, "holes.gbr").splitlines()
+    assert holes[-4:] == [
+        "X0005500Y0005000D02*",
+        "X0005500Y0005000I-0000500J0000000D01*",
+        "G01*",
+        "M02*",
+    ]
+
+
+def test_regions_keep_holes_open_with_cut_ins():
+    from shapely.geometry import Polygon
+    from boardforge.GerberExporter import region_commands
+
+    ring = Polygon([(0, 0), (4, 0), (4, 4), (0, 4)], [[(1, 1), (3, 1), (3, 3), (1, 3)]])
+    cmds = region_commands(ring)
+    assert cmds[0] == "G36*" and cmds[-1] == "G37*"
+    assert cmds.count("G36*") == 1 and "%LPC*%" not in cmds
+    # In along the cut-in, around the hole and back out the same way.
+    assert cmds[3:10] == [
+        "X0004000Y0003000D01*",
+        "X0003000Y0003000D01*",
+        "X0003000Y0001000D01*",
+        "X0001000Y0001000D01*",
+        "X0001000Y0003000D01*",
+        "X0003000Y0003000D01*",
+        "X0004000Y0003000D01*",
+    ]
+
+
+def test_logo_pixels_merge_into_one_region():
+    from PIL import Image
+
+    board = PCB(width=10, height=10)
+    board.set_layer_stack([Layer.TOP_SILK.value])
+    img = Image.new("RGB", (3, 3), "black")
+    img.putpixel((1, 1), (255, 255, 255))
+    board.logo(0, 0, img, scale=1.0, layer=Layer.TOP_SILK)
+
+    cmds = board.layers[Layer.TOP_SILK.value]
+    assert cmds.count("G36*") == 1
+    assert "%LPC*%" not in cmds
@@ -21,7 +21,8 @@ def test_chamfer_outline(tmp_path):
     with zipfile.ZipFile(zip_path) as z:
         lines = z.read("GKO.gbr").decode().splitlines()
 
-    coords = lines[1:]
+    assert lines[-1] == "M02*"
+    coords = [l for l in lines if l.startswith("X")]
     assert len(coords) == 9  # 8 vertices + closing point
 
     pts = []
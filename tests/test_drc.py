@@ -1,11 +1,29 @@
+import math
+import pickle
+import random
 import sys
+import time
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
 import pytest
-from boardforge import Board, DRCError
+from boardforge import (
+    Board,
+    DRCCache,
+    DRCError,
+    DRCProfile,
+    Violation,
+    check_board,
+    cluster_violations,
+    drc,
+    iter_violations,
+    tiling,
+)
+from boardforge.GerberExporter import layer_flashes
+from boardforge.rules import service_rules
+from boardforge.tiling import tile_grid
 
 
 def test_drc_pad_clearance_warning():
@@ -83,3 +101,353 @@ def test_via_rules_enforced():
         board.design_rule_check()
     assert any("Via" in w for w in excinfo.value.warnings)
 
+
+
+def test_pad_clearance_matches_all_pairs_reference():
+    rng = random.Random(1234)
+    board = Board(width=40, height=40)
+    for i in range(60):
+        comp = board.add_component("X", ref=f"U{i}", at=(rng.uniform(0, 40), rng.uniform(0, 40)))
+        for j in range(3):
+            comp.add_pad(f"P{i}_{j}", dx=j * 0.8, dy=0, w=rng.uniform(0.3, 1.5), h=rng.uniform(0.3, 1.5))
+
+    pads = [pad for comp in board.components for pad in comp.pads]
+    expected = []
+    for i in range(len(pads)):
+        for j in range(i + 1, len(pads)):
+            p1, p2 = pads[i], pads[j]
+            if p1.component is p2.component:
+                continue
+            clearance = math.hypot(p1.x - p2.x, p1.y - p2.y) - max(p1.w, p1.h) / 2 - max(p2.w, p2.h) / 2
+            if clearance < 0.5:
+                expected.append(
+                    f"Pad clearance between {p1.name} and {p2.name} is {clearance:.3f}mm; minimum 0.5mm"
+                )
+
+    assert expected
+    assert check_board(board, min_clearance=0.5) == expected
+
+
+def test_drill_clearance_matches_all_pairs_reference():
+    rng = random.Random(99)
+    board = Board(width=20, height=20)
+    for _ in range(150):
+        board.add_via(rng.uniform(0, 20), rng.uniform(0, 20), hole=rng.uniform(0.2, 0.4))
+    for _ in range(30):
+        board.hole((rng.uniform(0, 20), rng.uniform(0, 20)), diameter=rng.uniform(0.5, 3.0))
+
+    drills = [(v.x, v.y, v.hole / 2, "via") for v in board.vias]
+    drills += [(h[0], h[1], h[2] / 2, "hole") for h in board.holes]
+    expected = {"Via clearance": [], "Via to hole clearance": [], "Hole clearance": []}
+    for i in range(len(drills)):
+        for j in range(i + 1, len(drills)):
+            x1, y1, r1, k1 = drills[i]
+            x2, y2, r2, k2 = drills[j]
+            clearance = math.hypot(x1 - x2, y1 - y2) - r1 - r2
+            if clearance < 0.3:
+                label = {
+                    ("via", "via"): "Via clearance",
+                    ("via", "hole"): "Via to hole clearance",
+                    ("hole", "hole"): "Hole clearance",
+                }[(k1, k2)]
+                expected[label].append(
+                    f"{label} between ({x1},{y1}) and ({x2},{y2}) is {clearance:.3f}mm; minimum 0.3mm"
+                )
+
+    warnings = check_board(board, min_clearance=0, hole_to_hole_clearance=0.3)
+    assert all(expected.values())
+    assert warnings == [w for group in expected.values() for w in group]
+
+
+def test_one_large_hole_does_not_coarsen_drill_grid():
+    board = Board(width=40, height=40)
+    for i in range(2500):
+        board.add_via((i % 50) * 0.8, (i // 50) * 0.8, hole=0.3)
+    board.hole((20.4, 20.4), diameter=10.0)
+    rules = dict(min_clearance=0, hole_to_hole_clearance=0.127)
+    profile = DRCProfile()
+    cache = DRCCache()
+    warnings = check_board(board, cache=cache, profile=profile, **rules)
+    assert len([w for w in warnings if w.startswith("Via to hole")]) > 100
+    assert profile.rules["hole_clearance"].candidates < 4 * 2500
+
+    board.holes[0] = (5.2, 5.2) + board.holes[0][2:]
+    assert check_board(board, cache=cache, **rules) == check_board(board, **rules)
+
+
+def test_hole_to_hole_clearance_includes_board_holes():
+    board = Board(width=10, height=10)
+    board.add_via(1, 1, hole=0.3)
+    board.hole((1.5, 1), diameter=0.5)
+    board.hole((2.0, 1), diameter=0.5)
+    with pytest.raises(DRCError) as excinfo:
+        board.design_rule_check()
+    messages = excinfo.value.warnings
+    assert any(w.startswith("Via to hole clearance") for w in messages)
+    assert any(w.startswith("Hole clearance") for w in messages)
+
+
+def _copper_warnings(board, clearance=0.2):
+    return [w for w in check_board(board, copper_clearance=clearance) if w.startswith("Copper")]
+
+
+def test_copper_clearance_between_parallel_traces():
+    board = Board(width=10, height=10)
+    board.set_layer_stack(["GTL", "GBL"])
+    board.trace_path([(1, 1), (9, 1)], width=0.5)
+    board.trace_path([(1, 1.6), (9, 1.6)], width=0.5)
+    board.trace_path([(1, 1.6), (9, 1.6)], layer="GBL", width=0.5)
+    warnings = _copper_warnings(board)
+    assert len(warnings) == 1
+    assert "on GTL" in warnings[0] and "is 0.100mm" in warnings[0]
+
+
+def test_copper_clearance_ignores_connected_copper():
+    board = Board(width=10, height=10)
+    board.set_layer_stack(["GTL", "GBL"])
+    comp = board.add_component("R", ref="R1", at=(2, 2))
+    comp.add_pin("A", dx=0, dy=0)
+    comp.add_pad("A", dx=0, dy=0, w=1, h=1)
+    board.route_trace("R1:A", "R1:A", bends=[(6, 2), (6, 2.5)], width=0.3)
+    board.trace_path([comp.pin("A"), (2, 6)], width=0.3)
+    assert _copper_warnings(board) == []
+
+
+def test_copper_clearance_pad_to_trace_and_zone():
+    board = Board(width=10, height=10)
+    board.set_layer_stack(["GTL", "GBL"])
+    comp = board.add_component("R", ref="R1", at=(5, 5))
+    comp.add_pad("A", dx=0, dy=0, w=1, h=2)
+    board.trace_path([(5.65, 1), (5.65, 9)], width=0.2)
+    board.fill([(3, 3), (4.4, 3), (4.4, 7), (3, 7)], layer="GTL", net="GND")
+    warnings = _copper_warnings(board)
+    assert any("pad R1:A" in w and "trace" in w for w in warnings)
+    assert any("pad R1:A" in w and "zone GND" in w for w in warnings)
+
+
+def test_copper_clearance_through_hole_pads_on_every_layer():
+    board = Board(width=10, height=10)
+    board.set_layer_stack(["GTL", "GBL"])
+    header = board.add_component("J", ref="J1", at=(5, 5))
+    header.add_pad("1", dx=0, dy=0, w=1.6, h=1.6, drill=0.8)
+    header.add_pad("2", dx=2.54, dy=0, w=1.6, h=1.6, drill=0.8)
+    smd = board.add_component("R", ref="R1", at=(5, 8))
+    smd.add_pad("A", dx=0, dy=0, w=1, h=1)
+    # The bottom zone covers J1:1 and stops 0.1mm short of J1:2 and R1:A.
+    board.fill([(3, 3), (6.64, 3), (6.64, 7.4), (3, 7.4)], layer="GBL", net="GND")
+    warnings = _copper_warnings(board)
+    assert len(warnings) == 1
+    assert "on GBL" in warnings[0] and "pad J1:2" in warnings[0] and "zone GND" in warnings[0]
+    flashes = layer_flashes(board)
+    assert len(flashes["GTL"]) == 3 and len(flashes["GBL"]) == 2
+
+
+def test_copper_clearance_uses_flattened_arcs():
+    board = Board(width=10, height=10)
+    board.set_layer_stack(["GTL", "GBL"])
+    board.trace_path([(2, 5), {"arc": (3.0, 180)}, (8, 5)], width=0.2)
+    board.add_via(5, 1.65, diameter=0.4)
+    warnings = _copper_warnings(board)
+    assert len(warnings) == 1 and "via at (5,1.65)" in warnings[0]
+
+
+def _random_board(rng):
+    board = Board(width=30, height=30)
+    board.set_layer_stack(["GTL", "GBL"])
+    for i in range(40):
+        comp = board.add_component("X", ref=f"U{i}", at=(rng.uniform(0, 30), rng.uniform(0, 30)))
+        for j in range(2):
+            comp.add_pin(f"{j}", dx=j * 1.2, dy=0)
+            comp.add_pad(f"{j}", dx=j * 1.2, dy=0, w=rng.uniform(0.4, 1.2), h=rng.uniform(0.4, 1.2))
+    for _ in range(25):
+        board.trace_path(
+            [(rng.uniform(0, 30), rng.uniform(0, 30)), (rng.uniform(0, 30), rng.uniform(0, 30))],
+            layer=rng.choice(["GTL", "GBL"]),
+            width=rng.uniform(0.1, 0.4),
+        )
+    for _ in range(40):
+        board.add_via(rng.uniform(0, 30), rng.uniform(0, 30), diameter=0.6, hole=0.3)
+    for _ in range(5):
+        board.hole((rng.uniform(0, 30), rng.uniform(0, 30)), diameter=1.0)
+    board.fill([(2, 2), (8, 2), (8, 8), (2, 8)], layer="GBL", net="GND")
+    return board
+
+
+def test_incremental_drc_matches_full_check():
+    rng = random.Random(7)
+    board = _random_board(rng)
+    rules = dict(
+        min_trace_width=0.15,
+        min_clearance=0.3,
+        min_annular_ring=0.1,
+        hole_to_hole_clearance=0.5,
+        copper_clearance=0.3,
+    )
+    cache = DRCCache()
+    assert check_board(board, cache=cache, **rules) == check_board(board, **rules)
+
+    pads = [pad for comp in board.components for pad in comp.pads]
+    tweaks = [
+        lambda: setattr(pads[3], "x", pads[3].x + 2.0),
+        lambda: setattr(pads[10], "w", 2.5),
+        lambda: board.add_via(rng.uniform(0, 30), rng.uniform(0, 30)),
+        lambda: board.vias.pop(5),
+        lambda: setattr(board.vias[0], "y", board.vias[1].y),
+        lambda: board.trace_path([(1, 1), (29, 29)], width=0.1),
+        lambda: board.layers["GTL"].pop(0),
+        lambda: board.hole((board.vias[2].x + 0.4, board.vias[2].y), diameter=0.8),
+        lambda: setattr(board.zones[0], "geometry", board.zones[0].geometry.buffer(3)),
+        lambda: None,
+    ]
+    for tweak in tweaks:
+        tweak()
+        incremental = check_board(board, cache=cache, **rules)
+        assert incremental == check_board(board, **rules)
+        assert cache.changes(board) == {}
+    assert incremental
+
+
+def test_incremental_drc_follows_curve_tolerance():
+    board = Board(width=10, height=10)
+    board.set_layer_stack(["GTL", "GBL"])
+    board.trace_path([(2, 5), {"arc": (3.0, 180)}, (8, 5)], width=0.2)
+    board.add_via(5, 1.7, diameter=0.4)
+    cache = DRCCache()
+    board.curve_tolerance = 1.0
+    coarse = check_board(board, cache=cache, copper_clearance=0.2)
+    board.curve_tolerance = 0.001
+    fine = check_board(board, cache=cache, copper_clearance=0.2)
+    assert fine == check_board(board, copper_clearance=0.2)
+    assert coarse != fine
+
+
+def test_board_design_rule_check_incremental_and_full():
+    board = _random_board(random.Random(3))
+
+    def run(**kwargs):
+        try:
+            board.design_rule_check(**kwargs)
+        except DRCError as exc:
+            return exc.warnings
+        return []
+
+    run()
+    assert board.changes_since_check() == {}
+    board.components[0].pads[0].x += 1.5
+    assert board.changes_since_check() == {"pad": [board.components[0].pads[0]]}
+    assert run() == run(full=True)
+
+
+def test_violations_are_structured_and_picklable():
+    board = _random_board(random.Random(7))
+    violations = check_board(board, min_clearance=0.3, copper_clearance=0.3, hole_to_hole_clearance=0.5)
+    rules = {v.rule for v in violations}
+    assert {"pad_clearance", "copper_clearance", "hole_clearance"} <= rules
+    for violation in violations:
+        assert isinstance(violation, Violation)
+        assert violation.value < violation.limit
+        assert violation.location is not None and violation.objects
+    copy = pickle.loads(pickle.dumps(violations[0]))
+    assert copy == violations[0] and copy.rule == violations[0].rule
+
+
+def test_streaming_stops_early_and_keeps_cache_consistent():
+    board = _random_board(random.Random(7))
+    rules = dict(min_clearance=0.3, copper_clearance=0.3, hole_to_hole_clearance=0.5)
+    full = check_board(board, **rules)
+    stream = iter_violations(board, **rules)
+    assert next(stream) == full[0]
+
+    cache = DRCCache()
+    assert check_board(board, cache=cache, max_violations=2, **rules) == full[:2]
+    board.components[0].pads[0].x += 1.5
+    assert check_board(board, cache=cache, **rules) == check_board(board, **rules)
+
+
+def test_max_violations_fails_fast_with_bounded_message(tmp_path):
+    board = _random_board(random.Random(7))
+    with pytest.raises(DRCError) as excinfo:
+        board.export_gerbers(tmp_path / "out.zip", max_violations=1)
+    assert len(excinfo.value.warnings) == 1
+    assert excinfo.value.truncated
+    assert not (tmp_path / "out.zip").exists()
+
+    count = len(check_board(board, rules=service_rules(board.layer_service)))
+    with pytest.raises(DRCError) as excinfo:
+        board.design_rule_check(max_violations=count, full=True)
+    assert len(excinfo.value.warnings) == count
+    assert not excinfo.value.truncated
+    with pytest.raises(DRCError) as excinfo:
+        board.design_rule_check(max_violations=count - 1)
+    assert len(excinfo.value.warnings) == count - 1
+    assert excinfo.value.truncated
+
+    with pytest.raises(DRCError) as excinfo:
+        board.design_rule_check(min_clearance=5.0, full=True)
+    warnings = excinfo.value.warnings
+    assert len(warnings) > 20
+    assert str(excinfo.value).endswith(f"and {len(warnings) - 20} more")
+
+    clusters = cluster_violations(warnings, cell=10.0)
+    assert sum(cluster.count for cluster in clusters) == len(warnings)
+    assert len(clusters) < len(warnings)
+    assert clusters[0].count == max(cluster.count for cluster in clusters)
+    assert excinfo.value.summary().splitlines()[0].startswith(clusters[0].rule)
+
+
+def test_parallel_tiled_check_matches_serial(monkeypatch):
+    monkeypatch.setattr(tiling, "PARALLEL_MIN_OBJECTS", 0)
+    board = _random_board(random.Random(7))
+    rules = dict(min_clearance=0.3, copper_clearance=0.3, hole_to_hole_clearance=0.5)
+    serial = check_board(board, **rules)
+    assert serial
+    assert check_board(board, workers=3, **rules) == serial
+
+
+def test_tile_grid_covers_bounds():
+    tiles = tile_grid((0, 0, 40, 10), 8)
+    assert len(tiles) >= 8
+    assert min(t[0] for t in tiles) == 0 and max(t[2] for t in tiles) == 40
+    assert min(t[1] for t in tiles) == 0 and max(t[3] for t in tiles) == 10
+
+
+def test_profile_reports_work_per_rule():
+    board = _random_board(random.Random(7))
+    profile = DRCProfile()
+    warnings = check_board(
+        board,
+        min_clearance=0.3,
+        copper_clearance=0.3,
+        min_annular_ring=0.1,
+        hole_to_hole_clearance=0.5,
+        profile=profile,
+    )
+    stats = profile.rules
+    assert list(stats) == ["trace_width", "pad_clearance", "copper_clearance", "via", "hole_clearance"]
+    assert stats["pad_clearance"].objects == 80
+    assert stats["via"].objects == 40
+    assert stats["hole_clearance"].objects == 45
+    assert stats["pad_clearance"].candidates >= stats["pad_clearance"].violations
+    assert sum(s.violations for s in stats.values()) == len(warnings)
+    assert all(s.seconds >= 0 for s in stats.values())
+
+    table = profile.table().splitlines()
+    assert table[0].split() == ["rule", "objects", "candidates", "violations", "seconds"]
+    assert table[-1].startswith("total")
+    assert profile.as_dict()["via"]["objects"] == 40
+
+
+def test_profile_times_cached_rules_through_board(monkeypatch):
+    slow = drc._trace_width_violations
+
+    def trace_width_violations(*args):
+        time.sleep(0.05)
+        return slow(*args)
+
+    monkeypatch.setattr(drc, "_trace_width_violations", trace_width_violations)
+    board = _random_board(random.Random(7))
+    profile = DRCProfile()
+    with pytest.raises(DRCError):
+        board.design_rule_check(profile=profile)
+    assert profile.rules["trace_width"].objects > 0
+    assert profile.rules["trace_width"].seconds >= 0.05
@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+import io
+import zipfile
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from boardforge import ExportCache, create_bent_trace
+
+
+def _entries(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        assert z.testzip() is None
+        return {name: z.read(name) for name in z.namelist()}
+
+
+def test_unchanged_layers_are_reused(tmp_path):
+    cache = ExportCache(tmp_path / "cache")
+    board = create_bent_trace()
+    layers = len([n for n in _export(board) if n.endswith(".gbr")])
+
+    first = _export(board, cache)
+    assert (cache.stats.hits, cache.stats.misses) == (0, layers)
+    assert first == _export(board)
+
+    second = _export(board, cache)
+    assert (cache.stats.hits, cache.stats.misses) == (layers, layers)
+    assert second == first
+
+    board.trace_path([(1, 1), (3, 1)], layer="GBL", width=0.3)
+    third = _export(board, cache)
+    assert (cache.stats.hits, cache.stats.misses) == (2 * layers - 1, layers + 1)
+    assert third["GBL.gbr"] != first["GBL.gbr"]
+    assert third["GTL.gbr"] == first["GTL.gbr"]
+
+
+def test_cache_is_shared_across_compression_settings(tmp_path):
+    cache = ExportCache(tmp_path / "cache")
+    board = create_bent_trace()
+    stored = io.BytesIO()
+    board.export_gerbers(stored, exploded=tmp_path / "loose", cache=cache)
+    layers = cache.stats.misses
+    exported = io.BytesIO()
+    from boardforge.GerberExporter import export_gerbers
+
+    export_gerbers(board, exported, exploded=False, compression=zipfile.ZIP_STORED, cache=cache)
+    assert cache.stats.hits == layers
+    with zipfile.ZipFile(exported) as z:
+        assert {info.compress_type for info in z.infolist() if info.filename.endswith(".gbr")} == {
+            zipfile.ZIP_STORED
+        }
+    assert _entries(exported.getvalue()) == _entries(stored.getvalue())
+    for name, data in _entries(stored.getvalue()).items():
+        assert (tmp_path / "loose" / name).read_bytes() == data
+
+
+class _Unseekable(io.RawIOBase):
+    """Write-only stream that cannot seek or tell, like a pipe or socket."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+
+def test_cached_entries_stream_into_unseekable_output(tmp_path):
+    cache = ExportCache(tmp_path / "cache")
+    board = create_bent_trace()
+    expected = _export(board, cache)
+    stream = _Unseekable()
+    board.export_gerbers(stream, exploded=False, cache=cache)
+    assert cache.stats.hits == cache.stats.misses
+    assert _entries(b"".join(stream.chunks)) == expected
+
+
+def _export(board, cache=None):
+    buffer = io.BytesIO()
+    board.export_gerbers(buffer, exploded=False, cache=cache)
+    return _entries(buffer.getvalue())
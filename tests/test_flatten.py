@@ -0,0 +1,77 @@
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import numpy as np
+import shapely
+from svg.path import parse_path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from boardforge import svgtools
+from boardforge.Board import Board
+from boardforge.flatten import flatten_arc, flatten_cubics, flatten_segments, flatten_svg_path
+
+
+def _deviation(points, exact):
+    """Largest distance from the densely sampled ``exact`` curve to the polyline."""
+    return shapely.distance(shapely.linestrings(points), shapely.points(exact)).max()
+
+
+def test_arcs_meet_tolerance_with_few_points():
+    for radius, tolerance in [(0.2, 0.01), (50.0, 0.01), (50.0, 0.001)]:
+        points = flatten_arc(0, 0, radius, 0, 90, tolerance)
+        angles = np.radians(np.linspace(0, 90, 2001))
+        exact = np.column_stack([radius * np.cos(angles), radius * np.sin(angles)])
+        assert _deviation(points, exact) <= tolerance
+    assert len(flatten_arc(0, 0, 0.2, 0, 90, 0.01)) < len(flatten_arc(0, 0, 50, 0, 90, 0.01))
+
+
+def test_cubics_are_flattened_in_one_batch_within_tolerance():
+    curves = np.array([[(0, 0), (0.1, 0.2), (0.2, 0.2), (0.3, 0)], [(0, 0), (10, 30), (40, 30), (50, 0)]])
+    points, offsets = flatten_cubics(curves, 0.01)
+    assert offsets[-1] == len(points)
+    small, large = np.diff(offsets)
+    assert small < 10 < large
+    t = np.linspace(0, 1, 4001)[:, None]
+    for curve, start, end in zip(curves, offsets[:-1], offsets[1:]):
+        p0, p1, p2, p3 = curve
+        exact = (1 - t) ** 3 * p0 + 3 * (1 - t) ** 2 * t * p1 + 3 * (1 - t) * t**2 * p2 + t**3 * p3
+        assert _deviation(points[start:end], exact) <= 0.01
+        assert np.allclose(points[[start, end - 1]], [p0, p3])
+
+
+def test_lines_stay_exact():
+    points, starts = flatten_svg_path(parse_path("M0,0 L10,0 L10,5 Z"))
+    assert points == [0j, 10 + 0j, 10 + 5j, 0j]
+    assert starts == [True, False, False, False]
+    path = [("LINE", (0, 0), (5, 0)), ("LINE", (5, 0), (5, 5))]
+    assert flatten_segments(Board, path).tolist() == [[0, 0], [5, 0], [5, 5]]
+
+
+def test_svg_path_tolerance_is_in_board_millimetres():
+    element = ET.Element("path", d="M0,0 C0,10 10,10 10,0")
+    small = svgtools.render_path(element, 0.1, 0, 0)
+    large = svgtools.render_path(element, 10, 0, 0)
+    assert len(small) < len(large)
+
+
+def test_flattened_traces_are_shared_and_follow_edits():
+    from boardforge.flatten import _flat_trace, flat_trace
+
+    board = Board(width=40, height=40)
+    board.set_layer_stack(["GTL", "GBL"])
+    board.trace_path([(3, 3), {"bezier": ((10, 30), (25, 30))}, (33, 3)], width=0.3)
+    segments = board.layers["GTL"][-1][1]
+    misses = _flat_trace.cache_info().misses
+    board.export_gerbers_bytes()
+    board.export_gerbers_bytes()
+    assert flat_trace(board, segments, board.curve_tolerance).line.length > 0
+    assert _flat_trace.cache_info().misses == misses + 1
+
+    before = flat_trace(board, segments).points
+    segments[0] = ("BEZIER", (3, 3), (10, 20), (25, 20), (33, 3))
+    after = flat_trace(board, segments).points
+    assert not np.array_equal(before, after)
+    assert after.max(axis=0)[1] < before.max(axis=0)[1]
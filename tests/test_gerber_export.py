@@ -0,0 +1,125 @@
+import sys
+from pathlib import Path
+import io
+import zipfile
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from boardforge import create_bent_trace
+
+EXPECTED_DIR = Path(__file__).resolve().parent / "expected"
+
+
+def test_export_streams_into_bytesio(tmp_path, monkeypatch):
+    board = create_bent_trace()
+    monkeypatch.chdir(tmp_path)
+    buffer = io.BytesIO()
+    board.export_gerbers(buffer)
+
+    with zipfile.ZipFile(io.BytesIO(buffer.getvalue())) as z:
+        names = z.namelist()
+        gtl_data = z.read("GTL.gbr").decode()
+    assert names[:4] == ["GTO.gbr", "GBO.gbr", "GTL.gbr", "GBL.gbr"]
+    assert "preview_top.svg" in names
+    assert gtl_data == (EXPECTED_DIR / "bent_trace_GTL.gbr").read_text()
+    # Nothing is staged on disk
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_exploded_copy_is_optional(tmp_path):
+    board = create_bent_trace()
+    board.export_gerbers(tmp_path / "plain.zip", exploded=False)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["plain.zip"]
+
+    board.export_gerbers(tmp_path / "full.zip")
+    with zipfile.ZipFile(tmp_path / "full.zip") as z:
+        for name in z.namelist():
+            assert (tmp_path / "full" / name).read_bytes() == z.read(name)
+    assert not (tmp_path / "temp_gerbers").exists()
+
+
+@pytest.mark.timeout(60)
+def test_parallel_exports_into_one_directory(tmp_path):
+    from boardforge.GerberExporter import export_gerbers_batch
+
+    boards = [create_bent_trace() for _ in range(16)]
+    jobs = [(board, tmp_path / f"board{i}.zip") for i, board in enumerate(boards)]
+    results = export_gerbers_batch(jobs, workers=16)
+
+    expected_gtl = (EXPECTED_DIR / "bent_trace_GTL.gbr").read_bytes()
+    assert [result.path for result in results] == [path for _, path in jobs]
+    assert all(result.error is None for result in results)
+    for _, path in jobs:
+        with zipfile.ZipFile(path) as z:
+            assert z.testzip() is None
+            assert z.read("GTL.gbr") == expected_gtl
+        assert (path.parent / path.stem / "GTL.gbr").read_bytes() == expected_gtl
+    assert not [p for p in tmp_path.iterdir() if p.name.endswith(".tmp")]
+
+
+def test_batch_export_in_processes_reports_errors(tmp_path):
+    from boardforge.GerberExporter import export_gerbers_batch
+
+    good = create_bent_trace()
+    bad = create_bent_trace()
+    bad.layers["GTL"][0] = ("TRACE", None, None)
+    jobs = [(good, tmp_path / "good.zip"), (bad, tmp_path / "bad.zip")]
+    results = export_gerbers_batch(jobs, workers=2, processes=True, exploded=False)
+
+    assert results[0].error is None and (tmp_path / "good.zip").exists()
+    assert results[1].error is not None
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["good.zip"]
+
+
+def test_parallel_layer_rendering_is_byte_identical(tmp_path):
+    from boardforge.GerberExporter import export_gerbers
+
+    board = create_bent_trace()
+    board.hole((1.0, 1.0), diameter=0.8)
+
+    def entries(**kwargs):
+        buffer = io.BytesIO()
+        export_gerbers(board, buffer, **kwargs)
+        with zipfile.ZipFile(buffer) as z:
+            return [(name, z.read(name)) for name in z.namelist()]
+
+    serial = entries()
+    assert "holes.gbr" in dict(serial)
+    assert entries(workers=3) == serial
+    assert entries(workers=3, processes=False) == serial
+
+
+class _Unseekable(io.RawIOBase):
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+
+def test_export_gerbers_bytes_in_memory(tmp_path, monkeypatch):
+    board = create_bent_trace()
+    monkeypatch.chdir(tmp_path)
+    stored = board.export_gerbers_bytes(compression=zipfile.ZIP_STORED)
+    fast = board.export_gerbers_bytes(compresslevel=1)
+    best = board.export_gerbers_bytes(compresslevel=9)
+    assert list(tmp_path.iterdir()) == []
+
+    contents = []
+    for data in (stored, fast, best):
+        with zipfile.ZipFile(io.BytesIO(data)) as z:
+            contents.append({name: z.read(name) for name in z.namelist()})
+    assert contents[0] == contents[1] == contents[2]
+    assert len(best) <= len(fast) < len(stored)
+
+    sink = _Unseekable()
+    board.export_gerbers(sink)
+    with zipfile.ZipFile(io.BytesIO(b"".join(sink.chunks))) as z:
+        assert z.read("GTL.gbr") == contents[0]["GTL.gbr"]
@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+import io
+import re
+import zipfile
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from boardforge import CoordinateFormat, PCB, Layer, Pin
+from boardforge.gerberformat import ARC_CODE, DEFAULT_FORMAT, DRAW_CODE, MOVE_CODE
+
+
+def test_bulk_formatting_matches_scalar_and_keeps_signs():
+    xs = [0.0, 1.5, -1.5, -0.0004, 123.4566]
+    ys = [2.0, -0.001, 0.0, 9999.9994, -12.5]
+    text = DEFAULT_FORMAT.commands(xs, ys, [MOVE_CODE] + [DRAW_CODE] * 4)
+    assert text.splitlines() == [
+        "X0000000Y0002000D02*",
+        "X0001500Y-0000001D01*",
+        "X-0001500Y0000000D01*",
+        "X0000000Y9999999D01*",
+        "X0123457Y-0012500D01*",
+    ]
+    assert [DEFAULT_FORMAT.command(x, y) for x, y in zip(xs[1:], ys[1:])] == text.splitlines()[1:]
+
+    arc = DEFAULT_FORMAT.commands([1, 2], [0, 0], [MOVE_CODE, ARC_CODE], [0, -1], [0, 0.5])
+    assert arc == "X0001000Y0000000D02*\nX0002000Y0000000I-0001000J0000500D01*\n"
+
+
+def test_format_spec_and_overflow():
+    fmt = CoordinateFormat(integer_digits=3, decimal_digits=5, unit="in")
+    assert fmt.header() == ["%FSLAX35Y35*%", "%MOIN*%"]
+    assert fmt.command(25.4, -2.54) == "X00100000Y-00010000D01*"
+    with pytest.raises(ValueError):
+        DEFAULT_FORMAT.number(10000.0)
+    with pytest.raises(ValueError):
+        CoordinateFormat(unit="cm")
+
+
+def test_export_in_inches():
+    board = PCB(width=10, height=10)
+    board.set_layer_stack([Layer.TOP_COPPER.value, Layer.BOTTOM_COPPER.value])
+    board.trace(Pin("A", (0, 0), 0, 0), Pin("B", (25.4, 0), 0, 0), width=0.254)
+    buffer = io.BytesIO()
+    board.export_gerbers(buffer, exploded=False, coordinate_format=CoordinateFormat(2, 6, "in"))
+    with zipfile.ZipFile(buffer) as z:
+        gtl = z.read("GTL.gbr").decode().splitlines()
+    assert gtl[1:3] == ["%FSLAX26Y26*%", "%MOIN*%"]
+    assert "%ADD10C,0.01*%" in gtl
+    assert "X01000000Y00000000D01*" in gtl
+
+
+def test_stored_geometry_keeps_full_precision(tmp_path):
+    from PIL import Image
+
+    svg = tmp_path / "dot.svg"
+    svg.write_text('<svg xmlns="http://www.w3.org/2000/svg"><circle cx="1.2345678" cy="2.3456789" r="0.5"/></svg>')
+    font_path = str(ROOT / "fonts" / "RobotoMono.ttf")
+    fmt = CoordinateFormat(4, 6)
+    add = {
+        "fill": lambda b: b.fill([(1.2345678, 1.0), (4.0001234, 1.0), (4.0001234, 3.7654321)], layer="GTL"),
+        "logo": lambda b: b.logo(1.0000004, 1.0000004, Image.new("RGBA", (2, 2), "black"), scale=0.1234567),
+        "text": lambda b: b.add_text_ttf("L", font_path, at=(2.0004321, 3.0004321), size=1.0),
+        "svg": lambda b: b.add_svg_graphic(str(svg), "GTO"),
+    }
+    for name, draw in add.items():
+        board = PCB(width=10, height=10)
+        draw(board)
+        buffer = io.BytesIO()
+        board.export_gerbers(buffer, exploded=False, coordinate_format=fmt)
+        with zipfile.ZipFile(buffer) as z:
+            text = z.read("GTL.gbr" if name == "fill" else "GTO.gbr").decode()
+        numbers = [int(n) for xy in re.findall(r"^X(-?\d+)Y(-?\d+)", text, re.M) for n in xy]
+        assert numbers, name
+        # Formatting at write time keeps digits beyond the default 4.3 grid.
+        assert any(n % 1000 for n in numbers), name
+        if name == "fill":
+            assert "X0001234568Y0001000000D02*" in text
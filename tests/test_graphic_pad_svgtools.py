@@ -2,6 +2,9 @@ import xml.etree.ElementTree as ET
 import sys
 from pathlib import Path
 
+import numpy as np
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
@@ -49,7 +52,17 @@ def test_svgtools_basic_renderers():
 
     assert rect_cmds[0].endswith("D02*")
     assert rect_cmds[-1].endswith("D01*")
-    assert len(circle_cmds) == 13
+    assert circle_cmds == [
+        "X0001000Y0000000D02*",
+        "G03*",
+        "X0001000Y0000000I-0001000J0000000D01*",
+        "G01*",
+    ]
+    ellipse = element("ellipse", rx=2, ry=1, cx=0, cy=0)
+    ellipse_cmds = svgtools.render_ellipse(ellipse, 1, 0, 0)
+    assert ellipse_cmds[-1] == ellipse_cmds[0].replace("D02*", "D01*")
+    # Coarser tolerances need fewer points.
+    assert len(svgtools.render_ellipse(ellipse, 1, 0, 0, tolerance=0.1)) < len(ellipse_cmds)
     assert poly_cmds[0].endswith("D02*") and poly_cmds[-1].endswith("D01*")
     assert poly_closed[-1] == poly_closed[0].replace("D02*", "D01*")
     assert line_cmds == [
@@ -72,3 +85,81 @@ def test_render_text_ttf_handles_missing_font(tmp_path):
     font_path = tmp_path / "missing.ttf"
     cmds = svgtools.render_text_ttf("A", str(font_path))
     assert cmds == []
+
+
+def test_render_text_ttf_reuses_faces_and_glyphs():
+    font_path = str(ROOT / "fonts" / "RobotoMono.ttf")
+    svgtools.render_text_ttf("B", font_path)
+    faces = svgtools.font_face.cache_info().misses
+    glyph = svgtools.load_glyph(font_path, "B")
+    assert svgtools.load_glyph(font_path, "B") is glyph
+    assert all(not contour.flags.writeable for contour in glyph.contours)
+
+    near = svgtools.render_text_ttf("BB", font_path, at=(0, 0), size=0.1)
+    far = svgtools.render_text_ttf("BB", font_path, at=(10, 0), size=0.1)
+    assert svgtools.font_face.cache_info().misses == faces
+    assert len(near) == len(far) and near != far
+
+    outlines = svgtools._outline.cache_info().misses
+    for size in (0.11, 0.12, 0.13):
+        svgtools.render_text_ttf("BB", font_path, size=size)
+    assert svgtools._outline.cache_info().misses == outlines
+
+
+def test_contour_decoding_follows_on_and_off_curve_tags():
+    square = svgtools.contour_cubics([(0, 0), (1, 0), (1, 1), (0, 1)], [1, 1, 1, 1])
+    assert len(square) == 4
+    assert np.allclose(square[:, 1], (2 * square[:, 0] + square[:, 3]) / 3)
+
+    # Two quadratic controls in a row imply an on-curve point between them.
+    curves = svgtools.contour_cubics([(0, 0), (1, 1), (3, 1), (4, 0)], [1, 0, 0, 1])
+    assert np.allclose(curves[:, 3], [(2, 1), (4, 0), (0, 0)])
+    assert np.allclose(curves[0, 1], (2 / 3, 2 / 3))
+
+    cubic = svgtools.contour_cubics([(0, 0), (0, 1), (1, 1), (1, 0)], [1, 2, 2, 1])
+    assert np.allclose(cubic[0], [(0, 0), (0, 1), (1, 1), (1, 0)])
+
+
+def test_ttf_glyphs_keep_counters_and_tolerance():
+    font_path = str(ROOT / "fonts" / "RobotoMono.ttf")
+    coarse = svgtools.load_glyph(font_path, "O", 0.5)
+    fine = svgtools.load_glyph(font_path, "O", 0.01)
+    assert len(coarse.contours) == 2
+    assert coarse.shape.geom_type == "Polygon" and len(coarse.shape.interiors) == 1
+    assert sum(map(len, coarse.contours)) < sum(map(len, fine.contours))
+    assert coarse.shape.hausdorff_distance(fine.shape) <= 0.5 + 0.01
+
+    cmds = svgtools.render_text_ttf("B", font_path, size=0.05)
+    assert "%LPC*%" not in cmds and cmds.count("G36*") == 1
+
+
+def test_text_counters_do_not_erase_earlier_strokes():
+    import io
+    import re
+    import zipfile
+    from shapely import affinity
+    from boardforge import Board
+    from boardforge.GerberExporter import export_gerbers
+
+    font_path = str(ROOT / "fonts" / "RobotoMono.ttf")
+    size, at = 0.05, (2.0, 3.0)
+    glyph = svgtools.load_glyph(font_path, "O", svgtools.TEXT_TOLERANCE / size).shape
+    glyph = affinity.affine_transform(glyph, [size, 0, 0, size, *at])
+    counter = glyph.interiors[0].centroid
+    xmin, _, xmax, _ = glyph.bounds
+
+    board = Board(width=10, height=10)
+    board.layers["GTO"].add_path([(xmin - 1, counter.y), (xmax + 1, counter.y)], width=0.2)
+    board.add_text_ttf("O", font_path, at=at, size=size)
+    # Export directly; the text is below the silkscreen DRC limits.
+    buffer = io.BytesIO()
+    export_gerbers(board, buffer, exploded=False)
+    with zipfile.ZipFile(buffer) as z:
+        gto = z.read("GTO.gbr").decode()
+
+    assert "%LPC*%" not in gto
+    assert gto.index("D01*") < gto.index("G36*")
+    region = gto[gto.index("G36*") : gto.index("G37*")]
+    xy = np.array([(int(x), int(y)) for x, y in re.findall(r"X(-?\d+)Y(-?\d+)", region)]) / 1000.0
+    area = 0.5 * np.sum(xy[:-1, 0] * xy[1:, 1] - xy[1:, 0] * xy[:-1, 1])
+    assert abs(area) == pytest.approx(glyph.area, rel=1e-3)
@@ -29,6 +29,9 @@ def test_hole_export_and_preview(tmp_path):
         assert "holes.gbr" in names
         data = z.read("holes.gbr").decode()
         assert "holes" in data.splitlines()[0].lower()
+        # The annular ring is one dark region with a cut-in to the hole.
+        assert "%LPC*%" not in data and data.count("G36*") == 1
+        assert "G02*\nX0006000Y0005000I-0001000J0000000D01*" in data
         png = z.read("preview_top.png") if "preview_top.png" in names else b""
 
     if png:
@@ -23,3 +23,100 @@ def test_add_component_logging(tmp_path):
         assert "EXIT add_component" in log_contents
     finally:
         os.chdir(cwd)
+
+
+@pytest.fixture
+def restore_tracing():
+    from boardforge import tracing
+    level = tracing.logger.level
+    yield tracing
+    tracing.configure(level=level)
+
+
+def test_board_state_not_dumped_by_default(tmp_path, restore_tracing):
+    tracing = restore_tracing
+    log_path = tmp_path / "trace.log"
+    tracing.configure(level=tracing.TRACE, path=str(log_path))
+    board = PCB(width=5, height=5)
+    board.add_component("RES", ref="R1", at=(0, 0))
+    tracing.flush()
+    contents = log_path.read_text()
+    assert "ENTER add_component" in contents
+    assert "STATE" not in contents
+    assert "_ref_map" not in contents
+
+
+def test_dump_level_records_board_state(tmp_path, restore_tracing):
+    tracing = restore_tracing
+    log_path = tmp_path / "trace.log"
+    tracing.configure(level=tracing.DUMP, path=str(log_path))
+    board = PCB(width=5, height=5)
+    board.add_component("RES", ref="R1", at=(0, 0))
+    tracing.flush()
+    contents = log_path.read_text()
+    assert "STATE add_component" in contents
+    assert "_ref_map" in contents
+
+
+def test_disabled_tracing_skips_formatting(tmp_path, restore_tracing):
+    tracing = restore_tracing
+    log_path = tmp_path / "trace.log"
+    tracing.configure(level=tracing.OFF, path=str(log_path))
+
+    class Exploding:
+        def __str__(self):
+            raise AssertionError("formatted while disabled")
+
+    tracing.log(tracing.TRACE, "%s", Exploding())
+    board = PCB(width=5, height=5)
+    board.add_component("RES", ref="R1", at=(0, 0))
+    tracing.flush()
+    assert not log_path.exists()
+
+
+@pytest.mark.parametrize("options", [{"buffer_size": 100}, {"background": True}])
+def test_buffered_and_background_sinks(tmp_path, restore_tracing, options):
+    tracing = restore_tracing
+    log_path = tmp_path / "trace.log"
+    tracing.configure(level=tracing.TRACE, path=str(log_path), **options)
+    board = PCB(width=5, height=5)
+    board.add_component("RES", ref="R1", at=(0, 0))
+    tracing.flush()
+    contents = log_path.read_text()
+    assert "ENTER add_component" in contents
+    assert "EXIT add_component" in contents
+
+
+def test_unknown_env_level_warns_and_falls_back(monkeypatch, restore_tracing):
+    tracing = restore_tracing
+    monkeypatch.setenv("BOARDFORGE_LOG_LEVEL", "bogus")
+    with pytest.warns(UserWarning, match="BOARDFORGE_LOG_LEVEL"):
+        assert tracing._initial_level() == tracing.TRACE
+
+
+def test_unknown_env_level_does_not_break_import(tmp_path):
+    import subprocess
+    env = dict(os.environ, BOARDFORGE_LOG_LEVEL="bogus")
+    result = subprocess.run(
+        [sys.executable, "-c", "import boardforge, logging; print(logging.getLogger('boardforge').level)"],
+        cwd=tmp_path, env=dict(env, PYTHONPATH=str(ROOT)), capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "15"
+    assert "BOARDFORGE_LOG_LEVEL" in result.stderr
+
+
+def test_stream_exports_are_not_traced(tmp_path, restore_tracing):
+    import io
+    tracing = restore_tracing
+    log_path = tmp_path / "trace.log"
+    tracing.configure(level=tracing.TRACE, path=str(log_path))
+    board = PCB(width=5, height=5)
+    board.export_gerbers(io.BytesIO())
+    board.export_gerbers_bytes()
+    tracing.flush()
+    assert "export_gerbers" not in log_path.read_text()
+
+    board.export_gerbers(tmp_path / "board.zip", exploded=False)
+    tracing.flush()
+    assert "ENTER export_gerbers" in log_path.read_text()
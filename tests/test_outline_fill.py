@@ -31,12 +31,15 @@ def test_outline_and_fill(tmp_path):
         assert "GKO.gbr" in names
         outline_lines = z.read("GKO.gbr").decode().splitlines()
         assert outline_lines[0].startswith("G04 GKO")
-        assert outline_lines[1] == "X0000000Y0000000D02*"
-        assert outline_lines[-1] == "X0000000Y0000000D01*"
+        assert outline_lines[-1] == "M02*"
+        outline_coords = [l for l in outline_lines if l.startswith("X")]
+        assert outline_coords[0] == "X0000000Y0000000D02*"
+        assert outline_coords[-1] == "X0000000Y0000000D01*"
 
         gtl_lines = z.read("GTL.gbr").decode().splitlines()
         assert any(l.startswith("X0001000Y0001000D02*") for l in gtl_lines)
-        assert gtl_lines[-1] == "X0001000Y0001000D01*"
+        assert gtl_lines[-3:] == ["X0001000Y0001000D01*", "G37*", "M02*"]
+        assert "G36*" in gtl_lines
         png = z.read("preview_top.png")
 
     if png:
@@ -0,0 +1,69 @@
+import io
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from boardforge.GerberExporter import _write_layer
+from boardforge.gerberformat import DEFAULT_FORMAT
+from boardforge.pathopt import Arc, Path as StrokePath, chain_paths, order_paths, simplify_polyline, write_paths
+
+
+def test_simplify_drops_duplicates_and_collinear_points():
+    points = [(0, 0), (0, 0), (10, 0), (20, 0), (20, 10), (20, 10)]
+    assert simplify_polyline(points) == [(0, 0), (20, 0), (20, 10)]
+    assert simplify_polyline([(5, 5), (5, 5)]) is None
+    # Doubling back is not a straight run.
+    assert simplify_polyline([(0, 0), (10, 0), (5, 0)]) == [(0, 0), (10, 0), (5, 0)]
+
+
+def test_chain_joins_contiguous_segments():
+    pieces = [[(0, 0), (10, 0)], [(10, 0), (20, 0)], [(20, 0), (20, 10)], [(50, 50), (50, 50)]]
+    paths = chain_paths(pieces)
+    assert len(paths) == 1
+    assert paths[0].pieces == [[(0, 0), (20, 0), (20, 10)]]
+
+
+def test_order_reverses_paths_to_shorten_travel():
+    first = StrokePath([[(0, 0), (10, 0)]])
+    far = StrokePath([[(100, 0), (200, 0)]])
+    near = StrokePath([[(20, 0), (11, 0)]])
+    ordered = order_paths([first, far, near])
+    assert [(path.start, path.end) for path in ordered] == [
+        ((0, 0), (10, 0)),
+        ((11, 0), (20, 0)),
+        ((100, 0), (200, 0)),
+    ]
+
+
+def test_reversed_arc_keeps_its_centre():
+    arc = Arc((2000, 0), (0, 2000), (-2000, 0), False).reversed()
+    assert (arc.start, arc.end, arc.offset, arc.clockwise) == ((0, 2000), (2000, 0), (0, -2000), True)
+
+
+def test_write_skips_moves_to_the_current_point():
+    paths = [StrokePath([[(0, 0), (1000, 0)], Arc((1000, 0), (2000, 0), (500, 0), True)])]
+    f = io.StringIO()
+    write_paths(f, paths, DEFAULT_FORMAT)
+    assert f.getvalue().splitlines() == [
+        "X0000000Y0000000D02*",
+        "X0001000Y0000000D01*",
+        "G02*",
+        "X0002000Y0000000I0000500J0000000D01*",
+        "G01*",
+    ]
+
+
+def test_layer_chains_segment_traces():
+    class Pin:
+        def __init__(self, x, y):
+            self.x, self.y = x, y
+
+    corners = [Pin(0, 0), Pin(5, 0), Pin(10, 0), Pin(10, 5)]
+    traces = [("TRACE", a, b, 0.2) for a, b in zip(corners, corners[1:])]
+    f = io.StringIO()
+    _write_layer(f, None, "GTL", traces)
+    lines = f.getvalue().splitlines()
+    start = lines.index("D10*")
+    assert lines[start + 1 : -1] == ["X0000000Y0000000D02*", "X0010000Y0000000D01*", "X0010000Y0005000D01*"]
@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+import pickle
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from boardforge import PCB, Layer, Pin
+from boardforge.primitives import ARC, DRAW, MOVE, OBJECT, STATEMENT, LayerStore
+
+
+def test_layer_store_round_trips_commands_and_tuples():
+    trace = ("TRACE", Pin("A", (0, 0), 0, 0), Pin("B", (1, 0), 0, 0), 0.25)
+    commands = [
+        "X0001000Y0002000D02*",
+        "G03*",
+        "X0001000Y0002000I-0000500J0000000D01*",
+        "%LPC*%",
+        "G04 free text*",
+    ]
+    store = LayerStore(commands)
+    store.append(trace)
+
+    assert len(store) == 6
+    assert list(store) == commands + [trace]
+    assert store[-1] is trace
+    assert store.column("op").tolist() == [MOVE, STATEMENT, ARC, STATEMENT, 6, OBJECT]
+    assert store.column("x")[0] == 1.0 and store.column("width")[-1] == 0.25
+    assert list(store.objects()) == [trace]
+
+    store[0] = "X0000000Y0000000D01*"
+    assert store.column("op")[0] == DRAW
+    assert store.pop(0) == "X0000000Y0000000D01*"
+    store.insert(0, "X0000001Y0000002D03*")
+    assert store[0] == "X0000001Y0000002D03*"
+    assert list(pickle.loads(pickle.dumps(store)))[1:4] == commands[1:4]
+
+
+def test_board_layers_are_stores_and_export_from_arrays():
+    board = PCB(width=10, height=10)
+    board.set_layer_stack([Layer.TOP_COPPER.value, Layer.BOTTOM_COPPER.value])
+    assert isinstance(board.layers["GTL"], LayerStore)
+
+    board.layers["GTL"].add_path([(1, 1), (2, 1), (2, 2)], width=0.2, closed=True)
+    assert board.layers["GTL"][:2] == ["X0001000Y0001000D02*", "X0002000Y0001000D01*"]
+
+    from boardforge.GerberExporter import gerber_layers, render_layer
+
+    name, writer, args = next(layer for layer in gerber_layers(board) if layer[0] == "GTL.gbr")
+    text = render_layer(writer, args)
+    assert "%ADD10C,0.2*%\nD10*\nX0001000Y0001000D02*\n" in text
+    assert text.count("D01*") == 3
+
+
+def test_array_appends_keep_geometry_numeric(monkeypatch):
+    from boardforge.primitives import STATEMENTS
+
+    def no_parsing(self, item):
+        assert not isinstance(item, str), f"parsed command string {item!r}"
+        return original(self, item)
+
+    original = LayerStore._parse
+    monkeypatch.setattr(LayerStore, "_parse", no_parsing)
+
+    store = LayerStore()
+    store.add_paths([[(0, 0), (1, 0)], [], [(2, 2), (3, 3), (4, 2)]], width=0.15)
+    store.add_regions([[(0, 0), (1, 0), (0, 1), (0, 0)]])
+    store.add_circle(5, 5, 0.5)
+    ops = store.column("op").tolist()
+    assert ops == [MOVE, DRAW, MOVE, DRAW, DRAW] + [STATEMENT, MOVE, DRAW, DRAW, DRAW, STATEMENT] + [
+        MOVE,
+        STATEMENT,
+        ARC,
+        STATEMENT,
+    ]
+    assert [STATEMENTS[int(x)] for x in store.column("x")[[5, 10, 12, 14]]] == ["G36*", "G37*", "G03*", "G01*"]
+    assert store.column("width")[0] == 0.15
+    assert store[13] == "X0005500Y0005000I-0000500J0000000D01*"
+
+    board = PCB(width=10, height=10)
+    board.set_layer_stack([Layer.TOP_SILK.value, Layer.BOTTOM_COPPER.value])
+    board.fill([(1, 1), (4, 1), (4, 4)], layer="GBL")
+    board.annotate(1, 1, "B8", size=0.05)
+    assert list(board.layers["GBL"])[:2] == ["G36*", "X0001000Y0001000D02*"]
+    assert list(board.layers[Layer.TOP_SILK.value]).count("G36*") == 2
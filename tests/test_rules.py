@@ -0,0 +1,82 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import dataclasses
+import json
+
+import pytest
+from boardforge import Board, DRCError, RuleSet, check_board, load_rules, service_rules
+
+
+def _narrow_trace_board():
+    board = Board(width=5, height=5)
+    board.set_layer_stack(["GTL", "GBL"])
+    c1 = board.add_component("A", ref="U1", at=(0, 0))
+    c1.add_pin("P", dx=0, dy=0)
+    c1.add_pad("P", dx=0, dy=0, w=1, h=1)
+    c2 = board.add_component("B", ref="U2", at=(4, 0))
+    c2.add_pin("P", dx=0, dy=0)
+    c2.add_pad("P", dx=0, dy=0, w=1, h=1)
+    board.trace(c1.pin("P"), c2.pin("P"), width=0.14)
+    return board
+
+
+def test_service_rules_are_compiled_once():
+    rules = service_rules("2 Layer")
+    assert rules is service_rules("2 Layer")
+    assert rules.min_trace_width == pytest.approx(0.1524)
+    assert rules.min_annular_ring == pytest.approx(0.127)
+    assert rules.min_text_height is None
+    assert rules.copper_clearance == rules.min_clearance
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        rules.min_clearance = 1.0
+
+
+def test_load_rules_from_json_and_toml(tmp_path):
+    json_path = tmp_path / "fab.json"
+    json_path.write_text(json.dumps({"extends": "4 Layer", "min_trace_width": "6mil"}))
+    toml_path = tmp_path / "fab.toml"
+    toml_path.write_text('name = "cheap fab"\nmin_trace_width = 0.2\n"Minimum Clearance" = "0.25mm"\n')
+
+    from_json = load_rules(json_path)
+    assert from_json.name == "fab"
+    assert from_json.min_trace_width == pytest.approx(0.1524)
+    assert from_json.min_via_diameter == service_rules("4 Layer").min_via_diameter
+
+    from_toml = load_rules(toml_path)
+    assert from_toml.name == "cheap fab"
+    assert from_toml.min_trace_width == 0.2
+    assert from_toml.copper_clearance == 0.25
+
+    bad = tmp_path / "bad.json"
+    bad.write_text(json.dumps({"min_wiggle": 1}))
+    with pytest.raises(ValueError):
+        load_rules(bad)
+
+
+def test_check_board_accepts_rule_set():
+    board = _narrow_trace_board()
+    strict = RuleSet(min_trace_width=0.2)
+    assert any("below minimum" in w for w in check_board(board, rules=strict))
+    assert check_board(board, rules=strict, min_trace_width=0.1) == []
+    assert check_board(board, rules=strict) == check_board(board, min_trace_width=0.2)
+
+    board.design_rule_check(rules=RuleSet(min_trace_width=0.1))
+    with pytest.raises(DRCError):
+        board.design_rule_check(rules=strict)
+
+
+def test_default_rule_sets_agree(tmp_path):
+    from boardforge.rules import DEFAULT_RULES
+
+    assert RuleSet() == DEFAULT_RULES
+    assert RuleSet().copper_clearance == 0.15
+    assert service_rules("unknown service") == RuleSet()
+
+    profile = tmp_path / "plain.json"
+    profile.write_text(json.dumps({"min_trace_width": 0.2}))
+    assert load_rules(profile) == DEFAULT_RULES.replace(min_trace_width=0.2)
+    assert RuleSet.from_mapping({}) == DEFAULT_RULES
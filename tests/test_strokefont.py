@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from boardforge import strokefont
+from boardforge.Board import Board
+from boardforge.GerberExporter import gerber_layers, render_layer
+
+
+def _gto(board):
+    return next(render_layer(writer, args) for name, writer, args in gerber_layers(board) if name == "GTO.gbr")
+
+
+def test_table_is_decoded_once_into_arrays():
+    assert strokefont.POINTS.dtype == np.int8
+    assert strokefont.GLYPHS[-1] == len(strokefont.STROKES) - 1
+    # Lowercase letters use the capitals; unknown characters draw "?".
+    assert strokefont.text_strokes("a")[0].tolist() == strokefont.text_strokes("A")[0].tolist()
+    assert len(strokefont.text_strokes("é")) == len(strokefont.text_strokes("?"))
+    assert strokefont.text_strokes(" ") == []
+
+
+def test_text_strokes_match_ttf_layout():
+    size = 0.1
+    strokes = strokefont.text_strokes("HI", at=(5, 10), size=size)
+    points = np.concatenate(strokes)
+    cap = strokefont.CAP_HEIGHT * size
+    assert np.isclose(points[:, 1].min(), 10 - cap) and np.isclose(points[:, 1].max(), 10)
+    assert np.isclose(points[:, 0].min(), 5)
+    assert points[:, 0].max() < 5 + 2 * strokefont.ADVANCE * size
+
+
+def test_stroke_backend_writes_few_stroked_lines():
+    ttf = Board(width=50, height=50)
+    stroke = Board(width=50, height=50)
+    ttf.annotate(5, 5, "R12", size=0.05)
+    stroke.annotate(5, 5, "R12", size=0.05, backend="stroke")
+
+    text = _gto(stroke)
+    assert "G36*" not in text
+    # Every stroke uses one round line aperture of the stroke width.
+    assert text.count("%ADD") == 1 and "%ADD10C,0.204" in text
+    # About seven commands per character, 3.5x fewer than the TTF outline;
+    # single strokes cannot reach 10x.
+    assert text.count("D0") <= 7 * len("R12")
+    assert text.count("D0") * 3 < _gto(ttf).count("D0")
+    assert stroke._svg_text_calls == [("R12", (5, 5), 0.05, "GTO")]
+
+    with pytest.raises(ValueError):
+        stroke.annotate(5, 5, "R1", backend="bitmap")